@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from apps.accounting.models import Account, NumberSequence
+from apps.accounting.models import Account, ExchangeRate, NumberSequence, TaxCode
 
 
 @admin.register(Account)
@@ -14,3 +14,16 @@ class AccountAdmin(admin.ModelAdmin):
 class NumberSequenceAdmin(admin.ModelAdmin):
     list_display = ("company", "key", "next_value", "updated_at")
     search_fields = ("key",)
+
+
+@admin.register(TaxCode)
+class TaxCodeAdmin(admin.ModelAdmin):
+    list_display = ("company", "code", "name", "rate", "tax_account", "is_active")
+    list_filter = ("is_active",)
+    search_fields = ("code", "name")
+
+
+@admin.register(ExchangeRate)
+class ExchangeRateAdmin(admin.ModelAdmin):
+    list_display = ("company", "currency_code", "rate_date", "rate")
+    list_filter = ("currency_code",)
@@ -0,0 +1,82 @@
+from bisect import bisect_right
+from decimal import ROUND_HALF_UP, Decimal
+
+from apps.accounting.models import ExchangeRate
+from apps.common.compiled_cache import CompanyCompiledCache
+
+MONEY_QUANT = Decimal("0.0001")
+ONE = Decimal("1")
+REALIZED_FX_DESCRIPTION = "Realized FX gain/loss"
+
+
+class FxRateError(ValueError):
+    pass
+
+
+class FxRateTable:
+    """Date-indexed rates per currency; a lookup returns the latest rate on or before the date."""
+
+    def __init__(self, rows):
+        self._dates = {}
+        self._rates = {}
+        for currency_code, rate_date, rate in rows:
+            self._dates.setdefault(currency_code, []).append(rate_date)
+            self._rates.setdefault(currency_code, []).append(rate)
+
+    def rate_on(self, currency_code, on_date) -> Decimal:
+        currency_code = currency_code.upper()
+        dates = self._dates.get(currency_code)
+        position = bisect_right(dates, on_date) if dates else 0
+        if not position:
+            raise FxRateError(f"No {currency_code} exchange rate on or before {on_date}.")
+        return self._rates[currency_code][position - 1]
+
+
+def _build_fx_table(company_id):
+    rows = (
+        ExchangeRate.objects.filter(company_id=company_id)
+        .order_by("currency_code", "rate_date")
+        .values_list("currency_code", "rate_date", "rate")
+    )
+    return FxRateTable(rows)
+
+
+_fx_tables = CompanyCompiledCache(model=ExchangeRate, build=_build_fx_table)
+
+
+def get_fx_table(company) -> FxRateTable:
+    return _fx_tables.get(company)
+
+
+def invalidate_fx_table(company) -> None:
+    _fx_tables.invalidate(company)
+
+
+def rate_for(*, company, currency_code, on_date) -> Decimal:
+    currency_code = (currency_code or company.base_currency).upper()
+    if currency_code == company.base_currency.upper():
+        return ONE
+    return get_fx_table(company).rate_on(currency_code, on_date)
+
+
+def to_base(amount, rate) -> Decimal:
+    if rate == ONE:
+        return amount
+    return (amount * rate).quantize(MONEY_QUANT, rounding=ROUND_HALF_UP)
+
+
+def fx_difference_line(*, company, difference, description):
+    """Journal payload line that absorbs ``difference`` (debits minus credits) into FX gain/loss."""
+    if not difference:
+        return None
+    account = company.fx_gain_loss_account
+    if account is None:
+        raise FxRateError("Set an FX gain/loss account on the company before settling foreign-currency documents.")
+    if difference > 0:
+        return {"account": account, "debit": Decimal("0"), "credit": difference, "description": description}
+    return {"account": account, "debit": -difference, "credit": Decimal("0"), "description": description}
+
+
+def realized_fx_line(*, company, difference):
+    """FX gain/loss line for the gap between a settlement and the carrying value it relieves."""
+    return fx_difference_line(company=company, difference=difference, description=REALIZED_FX_DESCRIPTION)
@@ -0,0 +1,57 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.accounting.fx import FxRateError
+from apps.accounting.revaluation import revalue_foreign_balances
+from apps.companies.models import Company
+from apps.journals.services import JournalValidationError
+
+
+class Command(BaseCommand):
+    help = "Revalue open foreign-currency receivables and payables and post one adjustment entry per company."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--as-of",
+            type=str,
+            default="",
+            help="Revaluation date (YYYY-MM-DD), usually the last day of the month. Defaults to today.",
+        )
+        parser.add_argument(
+            "--company",
+            type=str,
+            default="",
+            help="Restrict revaluation to one company id.",
+        )
+
+    def handle(self, *args, **options):
+        as_of = self._resolve_as_of(options["as_of"])
+        if options["company"]:
+            companies = Company.objects.filter(id=options["company"])
+            if not companies.exists():
+                raise CommandError(f"Company not found: {options['company']}")
+        else:
+            companies = Company.objects.filter(is_active=True, fx_gain_loss_account__isnull=False)
+
+        for company in companies.select_related("fx_gain_loss_account"):
+            try:
+                summary = revalue_foreign_balances(company=company, as_of=as_of)
+            except (FxRateError, JournalValidationError) as exc:
+                self.stderr.write(self.style.ERROR(f"{company.name}: {exc}"))
+                continue
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{company.name} as of {as_of}: documents={summary['documents_revalued']} "
+                    f"entry_no={summary['entry_no'] or '-'}"
+                )
+            )
+
+    def _resolve_as_of(self, raw: str) -> date:
+        if not raw:
+            return timezone.now().date()
+        try:
+            return date.fromisoformat(raw)
+        except ValueError as exc:
+            raise CommandError(f"Invalid --as-of value '{raw}'. Expected YYYY-MM-DD.") from exc
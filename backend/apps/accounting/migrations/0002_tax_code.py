@@ -0,0 +1,36 @@
+# Generated by Django 5.2.11 on 2026-10-19 01:42
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0001_initial'),
+        ('companies', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaxCode',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('code', models.CharField(max_length=32)),
+                ('name', models.CharField(max_length=255)),
+                ('rate', models.DecimalField(decimal_places=4, max_digits=7)),
+                ('is_active', models.BooleanField(default=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tax_codes', to='companies.company')),
+                ('tax_account', models.ForeignKey(on_delete=django.db.models.deletion.RESTRICT, related_name='tax_codes', to='accounting.account')),
+            ],
+            options={
+                'db_table': 'tax_code',
+                'ordering': ['code'],
+                'constraints': [models.CheckConstraint(condition=models.Q(('rate__gte', 0), ('rate__lte', 100)), name='tax_code_rate_between_0_and_100')],
+                'unique_together': {('company', 'code')},
+            },
+        ),
+    ]
@@ -52,3 +52,42 @@ class NumberSequence(TimeStampedUUIDModel):
 
     def __str__(self):
         return f"{self.company_id}:{self.key}:{self.next_value}"
+
+
+class TaxCode(TimeStampedUUIDModel):
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name="tax_codes")
+    code = models.CharField(max_length=32)
+    name = models.CharField(max_length=255)
+    rate = models.DecimalField(max_digits=7, decimal_places=4)
+    tax_account = models.ForeignKey(Account, on_delete=models.RESTRICT, related_name="tax_codes")
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        db_table = "tax_code"
+        unique_together = (("company", "code"),)
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(rate__gte=0) & models.Q(rate__lte=100),
+                name="tax_code_rate_between_0_and_100",
+            ),
+        ]
+        ordering = ["code"]
+
+    def __str__(self):
+        return f"{self.company_id}:{self.code}:{self.rate}"
+
+
+class ExchangeRate(TimeStampedUUIDModel):
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name="exchange_rates")
+    currency_code = models.CharField(max_length=3)
+    rate_date = models.DateField()
+    rate = models.DecimalField(max_digits=19, decimal_places=8)
+
+    class Meta:
+        db_table = "exchange_rate"
+        unique_together = (("company", "currency_code", "rate_date"),)
+        constraints = [models.CheckConstraint(check=models.Q(rate__gt=0), name="exchange_rate_positive")]
+        ordering = ["currency_code", "-rate_date"]
+
+    def __str__(self):
+        return f"{self.company_id}:{self.currency_code}:{self.rate_date}:{self.rate}"
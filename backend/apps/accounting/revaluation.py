@@ -0,0 +1,113 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum
+from django.utils import timezone
+
+from apps.accounting.fx import MONEY_QUANT, fx_difference_line, get_fx_table, to_base
+from apps.accounting.models import Account
+from apps.journals.models import JournalEntry, JournalStatus
+from apps.journals.services import post_journal_entry, replace_journal_lines
+from apps.purchases.models import Bill, BillStatus
+from apps.sales.models import Invoice, InvoiceStatus
+
+_OPEN_AMOUNT = ExpressionWrapper(F("total") - F("amount_paid"), output_field=DecimalField(max_digits=19, decimal_places=4))
+_CARRIED_BASE = ExpressionWrapper(
+    (F("total") - F("amount_paid")) * F("exchange_rate"),
+    output_field=DecimalField(max_digits=30, decimal_places=12),
+)
+
+# (model, open statuses, document date field, control account field, sign of a rate rise on the ledger)
+_REVALUED_DOCUMENTS = (
+    (Invoice, (InvoiceStatus.POSTED, InvoiceStatus.PARTIALLY_PAID), "issue_date", "ar_account_id", Decimal("1")),
+    (Bill, (BillStatus.POSTED, BillStatus.PARTIALLY_PAID), "bill_date", "ap_account_id", Decimal("-1")),
+)
+
+
+def _open_foreign_documents(model, *, company, statuses, date_field, as_of):
+    return (
+        model.objects.filter(company=company, status__in=statuses, total__gt=F("amount_paid"), **{f"{date_field}__lte": as_of})
+        .exclude(currency_code__iexact=company.base_currency)
+        .order_by()
+    )
+
+
+@transaction.atomic
+def revalue_foreign_balances(*, company, as_of, actor_user=None):
+    """Revalue open foreign-currency AR/AP to the ``as_of`` rate and post one adjustment entry."""
+    rates = get_fx_table(company)
+    now = timezone.now()
+    adjustments = defaultdict(lambda: Decimal("0"))
+    rows = []
+    documents_revalued = 0
+
+    for model, statuses, date_field, account_field, sign in _REVALUED_DOCUMENTS:
+        documents = _open_foreign_documents(model, company=company, statuses=statuses, date_field=date_field, as_of=as_of)
+        grouped = documents.values("currency_code", account_field).annotate(
+            open_amount=Sum(_OPEN_AMOUNT),
+            carried_base=Sum(_CARRIED_BASE),
+        )
+        currency_rates = {}
+        for group in grouped:
+            currency_code = group["currency_code"]
+            if currency_code not in currency_rates:
+                currency_rates[currency_code] = rates.rate_on(currency_code, as_of)
+            revalued = to_base(group["open_amount"], currency_rates[currency_code])
+            carried = Decimal(group["carried_base"]).quantize(MONEY_QUANT)
+            difference = revalued - carried
+            adjustments[group[account_field]] += difference * sign
+            rows.append(
+                {
+                    "document_type": model._meta.model_name,
+                    "account_id": str(group[account_field]),
+                    "currency_code": currency_code,
+                    "rate": str(currency_rates[currency_code]),
+                    "open_amount": str(group["open_amount"]),
+                    "carried_base": str(carried),
+                    "revalued_base": str(revalued),
+                    "difference": str(difference),
+                }
+            )
+        for currency_code, rate in currency_rates.items():
+            documents_revalued += documents.filter(currency_code=currency_code).update(exchange_rate=rate, updated_at=now)
+
+    summary = {
+        "as_of": as_of.isoformat(),
+        "documents_revalued": documents_revalued,
+        "journal_entry_id": None,
+        "entry_no": None,
+        "rows": rows,
+    }
+    adjustments = {account_id: amount for account_id, amount in adjustments.items() if amount}
+    if not adjustments:
+        return summary
+
+    accounts = Account.objects.in_bulk(list(adjustments))
+    lines = []
+    for account_id, amount in adjustments.items():
+        lines.append(
+            {
+                "account": accounts[account_id],
+                "debit": amount if amount > 0 else Decimal("0"),
+                "credit": -amount if amount < 0 else Decimal("0"),
+                "description": "FX revaluation",
+            }
+        )
+    fx_line = fx_difference_line(company=company, difference=sum(adjustments.values()), description="Unrealized FX gain/loss")
+    if fx_line:
+        lines.append(fx_line)
+
+    entry = JournalEntry.objects.create(
+        company=company,
+        status=JournalStatus.DRAFT,
+        entry_date=as_of,
+        description=f"FX revaluation as of {as_of.isoformat()}",
+        reference_type="fx_revaluation",
+    )
+    replace_journal_lines(entry=entry, lines=lines)
+    entry = post_journal_entry(entry=entry, actor_user=actor_user)
+    summary["journal_entry_id"] = str(entry.id)
+    summary["entry_no"] = entry.entry_no
+    return summary
+
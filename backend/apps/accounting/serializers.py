@@ -1,6 +1,6 @@
 from rest_framework import serializers
 
-from apps.accounting.models import Account
+from apps.accounting.models import Account, ExchangeRate, TaxCode
 
 
 class AccountSerializer(serializers.ModelSerializer):
@@ -49,3 +49,73 @@ class AccountTreeSerializer(serializers.ModelSerializer):
     def get_children(self, obj):
         children = obj.children.all().order_by("code")
         return AccountTreeSerializer(children, many=True).data
+
+
+class TaxCodeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TaxCode
+        fields = (
+            "id",
+            "company",
+            "code",
+            "name",
+            "rate",
+            "tax_account",
+            "is_active",
+            "created_at",
+            "updated_at",
+        )
+        read_only_fields = ("id", "created_at", "updated_at")
+        extra_kwargs = {"company": {"required": False}}
+        validators = []
+
+    def validate_rate(self, value):
+        if value < 0 or value > 100:
+            raise serializers.ValidationError("Rate must be between 0 and 100 percent.")
+        return value
+
+    def validate(self, attrs):
+        company = attrs.get("company") or self.context.get("company") or getattr(self.instance, "company", None)
+        tax_account = attrs.get("tax_account")
+        if tax_account and company and tax_account.company_id != company.id:
+            raise serializers.ValidationError({"tax_account": "Tax account must belong to the same company."})
+
+        code = attrs.get("code") or getattr(self.instance, "code", None)
+        if company and code:
+            queryset = TaxCode.objects.filter(company=company, code=code)
+            if self.instance:
+                queryset = queryset.exclude(id=self.instance.id)
+            if queryset.exists():
+                raise serializers.ValidationError({"code": "Tax code must be unique within company."})
+        return attrs
+
+
+class ExchangeRateSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ExchangeRate
+        fields = ("id", "company", "currency_code", "rate_date", "rate", "created_at", "updated_at")
+        read_only_fields = ("id", "created_at", "updated_at")
+        extra_kwargs = {"company": {"required": False}}
+        validators = []
+
+    def validate_currency_code(self, value):
+        return value.strip().upper()
+
+    def validate_rate(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("Rate must be greater than zero.")
+        return value
+
+    def validate(self, attrs):
+        company = attrs.get("company") or self.context.get("company") or getattr(self.instance, "company", None)
+        currency_code = attrs.get("currency_code") or getattr(self.instance, "currency_code", None)
+        rate_date = attrs.get("rate_date") or getattr(self.instance, "rate_date", None)
+        if company and currency_code == company.base_currency.upper():
+            raise serializers.ValidationError({"currency_code": "Base currency does not need an exchange rate."})
+        if company and currency_code and rate_date:
+            queryset = ExchangeRate.objects.filter(company=company, currency_code=currency_code, rate_date=rate_date)
+            if self.instance:
+                queryset = queryset.exclude(id=self.instance.id)
+            if queryset.exists():
+                raise serializers.ValidationError({"rate_date": "A rate for this currency and date already exists."})
+        return attrs
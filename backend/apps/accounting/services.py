@@ -4,14 +4,27 @@ from apps.accounting.models import NumberSequence
 from apps.companies.models import Company
 
 
-@transaction.atomic
-def get_next_sequence_value(*, company: Company, key: str) -> int:
+def lock_sequence(*, company: Company, key: str) -> NumberSequence:
+    """Take the sequence row lock for the rest of the transaction, serializing with everything numbered by ``key``."""
     sequence, _ = NumberSequence.objects.select_for_update().get_or_create(
         company=company,
         key=key,
         defaults={"next_value": 1},
     )
-    next_value = sequence.next_value
-    sequence.next_value = next_value + 1
+    return sequence
+
+
+@transaction.atomic
+def allocate_sequence_block(*, company: Company, key: str, count: int) -> int:
+    """Reserve ``count`` consecutive values under one row lock and return the first."""
+    if count < 1:
+        raise ValueError("Sequence block size must be at least 1.")
+    sequence = lock_sequence(company=company, key=key)
+    first_value = sequence.next_value
+    sequence.next_value = first_value + count
     sequence.save(update_fields=["next_value", "updated_at"])
-    return next_value
+    return first_value
+
+
+def get_next_sequence_value(*, company: Company, key: str) -> int:
+    return allocate_sequence_block(company=company, key=key, count=1)
@@ -0,0 +1,59 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+from apps.accounting.models import TaxCode
+from apps.common.compiled_cache import CompanyCompiledCache
+
+TAX_QUANT = Decimal("0.0001")
+
+
+class TaxCodeError(ValueError):
+    pass
+
+
+class CompiledTaxCode:
+    __slots__ = ("id", "code", "rate", "multiplier", "tax_account")
+
+    def __init__(self, tax_code: TaxCode):
+        self.id = tax_code.id
+        self.code = tax_code.code
+        self.rate = tax_code.rate
+        self.multiplier = tax_code.rate / Decimal("100")
+        self.tax_account = tax_code.tax_account
+
+    def tax_for(self, amount: Decimal) -> Decimal:
+        return (amount * self.multiplier).quantize(TAX_QUANT, rounding=ROUND_HALF_UP)
+
+
+class TaxTable:
+    """Active tax codes for one company, keyed by id and by lower-cased code."""
+
+    def __init__(self, tax_codes):
+        self._codes = {}
+        for tax_code in tax_codes:
+            compiled = CompiledTaxCode(tax_code)
+            self._codes[str(compiled.id)] = compiled
+            self._codes[compiled.code.strip().lower()] = compiled
+
+    def resolve(self, value):
+        key = str(value or "").strip().lower()
+        if not key:
+            return None
+        compiled = self._codes.get(key)
+        if compiled is None:
+            raise TaxCodeError(f"Tax code '{value}' is not an active tax code in this company.")
+        return compiled
+
+
+def _build_tax_table(company_id):
+    return TaxTable(TaxCode.objects.filter(company_id=company_id, is_active=True).select_related("tax_account"))
+
+
+_tax_tables = CompanyCompiledCache(model=TaxCode, build=_build_tax_table)
+
+
+def get_tax_table(company) -> TaxTable:
+    return _tax_tables.get(company)
+
+
+def invalidate_tax_table(company) -> None:
+    _tax_tables.invalidate(company)
@@ -1,6 +1,10 @@
+from decimal import Decimal
+
 from rest_framework import status
 from rest_framework.test import APITestCase
 
+from apps.accounting.models import Account
+from apps.accounting.tax import TaxCodeError, get_tax_table
 from apps.companies.models import CompanyMember, CompanyMemberStatus
 from apps.companies.services import create_company_for_user
 from apps.rbac.constants import ROLE_VIEWER
@@ -97,3 +101,29 @@ class AccountApiTests(APITestCase):
             format="json",
         )
         self.assertEqual(create_response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_tax_table_is_reused_until_a_rate_changes(self):
+        tax_account = Account.objects.create(
+            company=self.company, code="2200", name="Sales Tax Payable", type="liability", normal_balance="credit"
+        )
+        self.client.force_authenticate(user=self.owner)
+        create_res = self.client.post(
+            f"/api/v1/accounting/companies/{self.company.id}/tax-codes/",
+            {"code": "VAT", "name": "VAT", "rate": "10.0000", "tax_account": str(tax_account.id)},
+            format="json",
+        )
+        self.assertEqual(create_res.status_code, status.HTTP_201_CREATED)
+
+        table = get_tax_table(self.company)
+        self.assertIs(get_tax_table(self.company), table)
+        self.assertEqual(table.resolve("vat").tax_for(Decimal("99.99")), Decimal("9.9990"))
+
+        update_res = self.client.patch(
+            f"/api/v1/accounting/companies/{self.company.id}/tax-codes/{create_res.data['id']}/",
+            {"rate": "20.0000"},
+            format="json",
+        )
+        self.assertEqual(update_res.status_code, status.HTTP_200_OK)
+        self.assertEqual(get_tax_table(self.company).resolve("VAT").rate, Decimal("20.0000"))
+        with self.assertRaises(TaxCodeError):
+            table.resolve("GST")
@@ -1,9 +1,29 @@
 from django.urls import path
 
-from apps.accounting.views import AccountDetailView, AccountListCreateView, AccountTreeView
+from apps.accounting.views import (
+    AccountDetailView,
+    AccountListCreateView,
+    AccountTreeView,
+    ExchangeRateDetailView,
+    ExchangeRateListCreateView,
+    TaxCodeDetailView,
+    TaxCodeListCreateView,
+)
 
 urlpatterns = [
     path("companies/<uuid:company_id>/accounts/", AccountListCreateView.as_view(), name="account_list_create"),
     path("companies/<uuid:company_id>/accounts/tree/", AccountTreeView.as_view(), name="account_tree"),
     path("companies/<uuid:company_id>/accounts/<uuid:account_id>/", AccountDetailView.as_view(), name="account_detail"),
+    path("companies/<uuid:company_id>/tax-codes/", TaxCodeListCreateView.as_view(), name="tax_code_list_create"),
+    path("companies/<uuid:company_id>/tax-codes/<uuid:tax_code_id>/", TaxCodeDetailView.as_view(), name="tax_code_detail"),
+    path(
+        "companies/<uuid:company_id>/exchange-rates/",
+        ExchangeRateListCreateView.as_view(),
+        name="exchange_rate_list_create",
+    ),
+    path(
+        "companies/<uuid:company_id>/exchange-rates/<uuid:exchange_rate_id>/",
+        ExchangeRateDetailView.as_view(),
+        name="exchange_rate_detail",
+    ),
 ]
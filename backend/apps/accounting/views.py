@@ -1,7 +1,15 @@
 from rest_framework import generics, permissions, response, status, views
 
-from apps.accounting.models import Account
-from apps.accounting.serializers import AccountSerializer, AccountTreeSerializer
+from apps.accounting.fx import invalidate_fx_table
+from apps.accounting.models import Account, ExchangeRate, TaxCode
+from apps.accounting.serializers import (
+    AccountSerializer,
+    AccountTreeSerializer,
+    ExchangeRateSerializer,
+    TaxCodeSerializer,
+)
+from apps.accounting.tax import invalidate_tax_table
+from apps.common.pagination import DefaultListPagination
 from apps.common.tenant import get_company_for_user_or_404, user_has_permission_in_company
 from apps.rbac.constants import PERMISSION_ACCOUNTING_POST, PERMISSION_ACCOUNTING_VIEW
 
@@ -95,3 +103,162 @@ class AccountTreeView(views.APIView):
         roots = Account.objects.filter(company=company, parent__isnull=True).prefetch_related("children")
         serialized = AccountTreeSerializer(roots, many=True)
         return response.Response(serialized.data)
+
+
+class TaxCodeListCreateView(generics.ListCreateAPIView):
+    serializer_class = TaxCodeSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def _company(self):
+        return get_company_for_user_or_404(user=self.request.user, company_id=self.kwargs["company_id"])
+
+    def get_queryset(self):
+        company = self._company()
+        if not user_has_permission_in_company(
+            user=self.request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_VIEW,
+        ):
+            return TaxCode.objects.none()
+        return TaxCode.objects.filter(company=company)
+
+    def list(self, request, *args, **kwargs):
+        company = self._company()
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_VIEW,
+        ):
+            return response.Response({"detail": "Insufficient accounting view permission."}, status=status.HTTP_403_FORBIDDEN)
+        return super().list(request, *args, **kwargs)
+
+    def create(self, request, *args, **kwargs):
+        company = self._company()
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_POST,
+        ):
+            return response.Response({"detail": "Insufficient accounting post permission."}, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = self.get_serializer(data=request.data, context={"company": company})
+        serializer.is_valid(raise_exception=True)
+        serializer.save(company=company)
+        invalidate_tax_table(company)
+        return response.Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class TaxCodeDetailView(generics.RetrieveUpdateAPIView):
+    serializer_class = TaxCodeSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def _company(self):
+        return get_company_for_user_or_404(user=self.request.user, company_id=self.kwargs["company_id"])
+
+    def get_object(self):
+        company = self._company()
+        return generics.get_object_or_404(TaxCode, company=company, id=self.kwargs["tax_code_id"])
+
+    def retrieve(self, request, *args, **kwargs):
+        company = self._company()
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_VIEW,
+        ):
+            return response.Response({"detail": "Insufficient accounting view permission."}, status=status.HTTP_403_FORBIDDEN)
+        return super().retrieve(request, *args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        company = self._company()
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_POST,
+        ):
+            return response.Response({"detail": "Insufficient accounting post permission."}, status=status.HTTP_403_FORBIDDEN)
+        result = super().update(request, *args, **kwargs)
+        invalidate_tax_table(company)
+        return result
+
+
+class ExchangeRateListCreateView(generics.ListCreateAPIView):
+    serializer_class = ExchangeRateSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = DefaultListPagination
+
+    def _company(self):
+        return get_company_for_user_or_404(user=self.request.user, company_id=self.kwargs["company_id"])
+
+    def get_queryset(self):
+        company = self._company()
+        if not user_has_permission_in_company(
+            user=self.request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_VIEW,
+        ):
+            return ExchangeRate.objects.none()
+        queryset = ExchangeRate.objects.filter(company=company)
+        currency_code = self.request.query_params.get("currency_code")
+        if currency_code:
+            queryset = queryset.filter(currency_code=currency_code.upper())
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        company = self._company()
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_VIEW,
+        ):
+            return response.Response({"detail": "Insufficient accounting view permission."}, status=status.HTTP_403_FORBIDDEN)
+        return super().list(request, *args, **kwargs)
+
+    def create(self, request, *args, **kwargs):
+        company = self._company()
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_POST,
+        ):
+            return response.Response({"detail": "Insufficient accounting post permission."}, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = self.get_serializer(data=request.data, context={"company": company})
+        serializer.is_valid(raise_exception=True)
+        serializer.save(company=company)
+        invalidate_fx_table(company)
+        return response.Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class ExchangeRateDetailView(generics.RetrieveUpdateAPIView):
+    serializer_class = ExchangeRateSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def _company(self):
+        return get_company_for_user_or_404(user=self.request.user, company_id=self.kwargs["company_id"])
+
+    def get_object(self):
+        company = self._company()
+        return generics.get_object_or_404(ExchangeRate, company=company, id=self.kwargs["exchange_rate_id"])
+
+    def retrieve(self, request, *args, **kwargs):
+        company = self._company()
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_VIEW,
+        ):
+            return response.Response({"detail": "Insufficient accounting view permission."}, status=status.HTTP_403_FORBIDDEN)
+        return super().retrieve(request, *args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        company = self._company()
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_POST,
+        ):
+            return response.Response({"detail": "Insufficient accounting post permission."}, status=status.HTTP_403_FORBIDDEN)
+        result = super().update(request, *args, **kwargs)
+        invalidate_fx_table(company)
+        return result
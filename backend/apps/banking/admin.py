@@ -4,6 +4,7 @@ from apps.banking.models import (
     BankAccount,
     BankReconciliation,
     BankReconciliationLine,
+    BankRule,
     BankStatementImport,
     BankTransaction,
 )
@@ -18,11 +19,18 @@ class BankAccountAdmin(admin.ModelAdmin):
 
 @admin.register(BankStatementImport)
 class BankStatementImportAdmin(admin.ModelAdmin):
-    list_display = ("id", "company", "bank_account", "file_name", "status", "created_at")
+    list_display = ("id", "company", "bank_account", "file_name", "status", "transactions_created", "rows_failed", "created_at")
     list_filter = ("company", "status")
     search_fields = ("file_name",)
 
 
+@admin.register(BankRule)
+class BankRuleAdmin(admin.ModelAdmin):
+    list_display = ("id", "company", "name", "priority", "bank_account", "target_account", "is_active")
+    list_filter = ("company", "is_active")
+    search_fields = ("name", "description_pattern", "counterparty")
+
+
 @admin.register(BankTransaction)
 class BankTransactionAdmin(admin.ModelAdmin):
     list_display = ("id", "company", "bank_account", "txn_date", "amount", "status")
@@ -0,0 +1,25 @@
+import hashlib
+import re
+from decimal import Decimal
+
+_NON_WORD_RE = re.compile(r"[^0-9a-z]+")
+_AMOUNT_QUANT = Decimal("0.0001")
+
+
+def normalize_text(value) -> str:
+    return _NON_WORD_RE.sub(" ", (value or "").lower()).strip()
+
+
+def fingerprint_key(*, bank_account_id, txn_date, amount, reference="", description="") -> str:
+    # The reference identifies a line better than its description when the bank provides one.
+    text = normalize_text(reference) or normalize_text(description)
+    return f"{bank_account_id}|{txn_date.isoformat()}|{Decimal(amount).quantize(_AMOUNT_QUANT)}|{text}"
+
+
+def transaction_fingerprint(key: str, occurrence: int = 1) -> str:
+    """Fingerprint of the ``occurrence``-th line with ``key`` in a statement.
+
+    Counting occurrences keeps genuinely repeated lines (two identical fees on one day) apart
+    while the same lines uploaded again in an overlapping statement still collide.
+    """
+    return hashlib.sha256(f"{key}|{occurrence}".encode()).hexdigest()
@@ -0,0 +1,62 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection
+from django.utils import timezone
+
+from apps.banking.models import BankImportStatus, BankStatementImport
+from apps.banking.workers import run_statement_import
+
+
+def _run(import_id):
+    close_old_connections()
+    try:
+        return run_statement_import(import_id)
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = "Parse statement imports waiting in 'uploaded' status, e.g. after a restart dropped the in-process queue."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--company", type=str, default="", help="Restrict processing to one company id.")
+        parser.add_argument("--workers", type=int, default=2, help="Imports parsed in parallel.")
+        parser.add_argument(
+            "--stale-after",
+            type=int,
+            default=None,
+            help="Requeue imports stuck in 'processing' for more than this many minutes.",
+        )
+        parser.add_argument("--follow", action="store_true", help="Keep polling for new imports until interrupted.")
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds between polls with --follow.")
+
+    def handle(self, *args, **options):
+        if options["workers"] < 1:
+            raise CommandError("--workers must be at least 1.")
+        imports = BankStatementImport.objects.all()
+        if options["company"]:
+            imports = imports.filter(company_id=options["company"])
+
+        try:
+            with ThreadPoolExecutor(max_workers=options["workers"], thread_name_prefix="bank-import") as executor:
+                while True:
+                    if options["stale_after"] is not None:
+                        cutoff = timezone.now() - timedelta(minutes=options["stale_after"])
+                        imports.filter(status=BankImportStatus.PROCESSING, updated_at__lt=cutoff).update(
+                            status=BankImportStatus.UPLOADED,
+                            updated_at=timezone.now(),
+                        )
+                    pending = list(
+                        imports.filter(status=BankImportStatus.UPLOADED).order_by("created_at").values_list("id", flat=True)
+                    )
+                    processed = sum(executor.map(_run, pending))
+                    if processed or not options["follow"]:
+                        self.stdout.write(self.style.SUCCESS(f"statement imports processed={processed}"))
+                    if not options["follow"]:
+                        break
+                    time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
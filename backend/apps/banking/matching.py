@@ -0,0 +1,196 @@
+from collections import defaultdict
+from datetime import timedelta
+from difflib import SequenceMatcher
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from apps.banking.fingerprints import normalize_text
+from apps.banking.models import BankTransaction, BankTransactionStatus
+from apps.banking.subset_sum import find_subset_sums
+from apps.journals.models import JournalLine, JournalStatus
+
+DEFAULT_DATE_WINDOW_DAYS = 5
+DEFAULT_MIN_SCORE = 0.5
+DEFAULT_SUGGESTION_WINDOW_DAYS = 30
+MAX_SUGGESTION_CANDIDATES = 400
+MINOR_UNITS = 10_000
+DATE_WEIGHT = 0.6
+TEXT_WEIGHT = 0.4
+
+
+class MatchCandidate:
+    __slots__ = ("journal_entry_id", "entry_no", "entry_date", "amount", "text")
+
+    def __init__(self, *, journal_entry_id, entry_no, entry_date, amount, text):
+        self.journal_entry_id = journal_entry_id
+        self.entry_no = entry_no
+        self.entry_date = entry_date
+        self.amount = amount
+        self.text = text
+
+
+class MatchProposal:
+    __slots__ = ("bank_transaction", "candidate", "score")
+
+    def __init__(self, *, bank_transaction, candidate, score):
+        self.bank_transaction = bank_transaction
+        self.candidate = candidate
+        self.score = score
+
+
+def unmatched_ledger_candidates(*, bank_account, start_date, end_date):
+    """Posted entries in the window not yet matched, with their net effect on the bank's ledger account."""
+    rows = (
+        JournalLine.objects.filter(
+            company_id=bank_account.company_id,
+            account_id=bank_account.ledger_account_id,
+            journal_entry__status=JournalStatus.POSTED,
+            journal_entry__entry_date__range=(start_date, end_date),
+            journal_entry__bank_transactions__isnull=True,
+        )
+        .values(
+            "journal_entry_id",
+            entry_no=F("journal_entry__entry_no"),
+            entry_date=F("journal_entry__entry_date"),
+            entry_description=F("journal_entry__description"),
+        )
+        .annotate(debit_total=Sum("debit"), credit_total=Sum("credit"))
+    )
+    for row in rows:
+        amount = row["debit_total"] - row["credit_total"]
+        if amount:
+            yield MatchCandidate(
+                journal_entry_id=row["journal_entry_id"],
+                entry_no=row["entry_no"],
+                entry_date=row["entry_date"],
+                amount=amount,
+                text=normalize_text(row["entry_description"]),
+            )
+
+
+def _text_score(txn_text, reference, candidate_text):
+    if not candidate_text:
+        return 0.0
+    if reference and reference in candidate_text:
+        return 1.0
+    if not txn_text:
+        return 0.0
+    return SequenceMatcher(None, txn_text, candidate_text).ratio()
+
+
+def propose_matches(*, bank_account, date_window_days=DEFAULT_DATE_WINDOW_DAYS, min_score=DEFAULT_MIN_SCORE):
+    """One-to-one proposals between unmatched bank lines and ledger entries of the same amount.
+
+    Candidates are bucketed by amount, so each line is only scored against entries it could
+    balance. Pairs are then taken best score first so neither side is used twice.
+    """
+    transactions = list(
+        BankTransaction.objects.filter(bank_account=bank_account, status=BankTransactionStatus.IMPORTED).order_by(
+            "txn_date", "created_at"
+        )
+    )
+    if not transactions:
+        return []
+
+    window = timedelta(days=date_window_days)
+    by_amount = defaultdict(list)
+    for candidate in unmatched_ledger_candidates(
+        bank_account=bank_account,
+        start_date=transactions[0].txn_date - window,
+        end_date=transactions[-1].txn_date + window,
+    ):
+        by_amount[candidate.amount].append(candidate)
+
+    scored = []
+    for txn in transactions:
+        candidates = by_amount.get(txn.amount)
+        if not candidates:
+            continue
+        reference = normalize_text(txn.reference)
+        txn_text = " ".join(part for part in (reference, normalize_text(txn.description)) if part)
+        for candidate in candidates:
+            days = abs((candidate.entry_date - txn.txn_date).days)
+            if days > date_window_days:
+                continue
+            date_score = 1 - days / (date_window_days + 1)
+            score = DATE_WEIGHT * date_score + TEXT_WEIGHT * _text_score(txn_text, reference, candidate.text)
+            if score >= min_score:
+                scored.append((score, txn, candidate))
+
+    scored.sort(key=lambda item: item[0], reverse=True)
+    used_transactions = set()
+    used_entries = set()
+    proposals = []
+    for score, txn, candidate in scored:
+        if txn.id in used_transactions or candidate.journal_entry_id in used_entries:
+            continue
+        used_transactions.add(txn.id)
+        used_entries.add(candidate.journal_entry_id)
+        proposals.append(MatchProposal(bank_transaction=txn, candidate=candidate, score=round(score, 4)))
+    return sorted(proposals, key=lambda proposal: (proposal.bank_transaction.txn_date, proposal.bank_transaction.created_at))
+
+
+@transaction.atomic
+def apply_matches(*, proposals):
+    """Mark proposed lines matched in one UPDATE batch; lines matched meanwhile are left alone."""
+    if not proposals:
+        return []
+    still_open = set(
+        BankTransaction.objects.select_for_update()
+        .filter(id__in=[proposal.bank_transaction.id for proposal in proposals], status=BankTransactionStatus.IMPORTED)
+        .values_list("id", flat=True)
+    )
+    now = timezone.now()
+    applied = []
+    for proposal in proposals:
+        txn = proposal.bank_transaction
+        if txn.id not in still_open:
+            continue
+        txn.matched_journal_entry_id = proposal.candidate.journal_entry_id
+        txn.status = BankTransactionStatus.MATCHED
+        txn.updated_at = now
+        applied.append(proposal)
+    BankTransaction.objects.bulk_update(
+        [proposal.bank_transaction for proposal in applied],
+        ["matched_journal_entry", "status", "updated_at"],
+        batch_size=1000,
+    )
+    return applied
+
+
+def suggest_combinations(
+    *,
+    bank_transaction,
+    date_window_days=DEFAULT_SUGGESTION_WINDOW_DAYS,
+    max_results=5,
+    time_budget=0.5,
+):
+    """Groups of unmatched ledger entries whose amounts add up to one bank line (e.g. a batched deposit).
+
+    Amounts are compared as integers in the ledger's 4-decimal minor units. Returns the candidate
+    groups and whether the search ran to completion within ``time_budget`` seconds.
+    """
+    window = timedelta(days=date_window_days)
+    target = int(abs(bank_transaction.amount) * MINOR_UNITS)
+    same_sign = [
+        candidate
+        for candidate in unmatched_ledger_candidates(
+            bank_account=bank_transaction.bank_account,
+            start_date=bank_transaction.txn_date - window,
+            end_date=bank_transaction.txn_date + window,
+        )
+        if (candidate.amount > 0) == (bank_transaction.amount > 0) and abs(candidate.amount) <= abs(bank_transaction.amount)
+    ]
+    # Closest dates first: both searches prefer earlier items, and the cap drops the least likely ones.
+    same_sign.sort(key=lambda candidate: (abs((candidate.entry_date - bank_transaction.txn_date).days), candidate.entry_no))
+    candidates = same_sign[:MAX_SUGGESTION_CANDIDATES]
+    combinations, complete = find_subset_sums(
+        [int(abs(candidate.amount) * MINOR_UNITS) for candidate in candidates],
+        target,
+        max_results=max_results,
+        time_budget=time_budget,
+    )
+    complete = complete and len(candidates) == len(same_sign)
+    return [[candidates[index] for index in combination] for combination in combinations], complete
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.11 on 2026-10-19 02:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('banking', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bankstatementimport',
+            name='row_errors',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='bankstatementimport',
+            name='rows_failed',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='bankstatementimport',
+            name='rows_processed',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='bankstatementimport',
+            name='transactions_created',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
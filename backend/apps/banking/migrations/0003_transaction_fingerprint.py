@@ -0,0 +1,57 @@
+# Generated by Django 5.2.11 on 2026-10-19 02:21
+
+from collections import Counter
+
+from django.db import migrations, models
+
+from apps.banking.fingerprints import fingerprint_key, transaction_fingerprint
+
+
+def backfill_fingerprints(apps, schema_editor):
+    BankTransaction = apps.get_model("banking", "BankTransaction")
+    occurrences = Counter()
+    batch = []
+    rows = BankTransaction.objects.order_by("bank_account_id", "txn_date", "created_at", "id")
+    for txn in rows.only("id", "bank_account_id", "txn_date", "amount", "reference", "description").iterator(chunk_size=2000):
+        key = fingerprint_key(
+            bank_account_id=txn.bank_account_id,
+            txn_date=txn.txn_date,
+            amount=txn.amount,
+            reference=txn.reference,
+            description=txn.description,
+        )
+        occurrences[key] += 1
+        txn.fingerprint = transaction_fingerprint(key, occurrences[key])
+        batch.append(txn)
+        if len(batch) >= 2000:
+            BankTransaction.objects.bulk_update(batch, ["fingerprint"])
+            batch = []
+    if batch:
+        BankTransaction.objects.bulk_update(batch, ["fingerprint"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('banking', '0002_statement_import_progress'),
+        ('companies', '0003_company_fx_gain_loss_account'),
+        ('journals', '0004_journal_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bankstatementimport',
+            name='duplicates_skipped',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='banktransaction',
+            name='fingerprint',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.RunPython(backfill_fingerprints, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='banktransaction',
+            constraint=models.UniqueConstraint(condition=models.Q(('fingerprint', ''), _negated=True), fields=('bank_account', 'fingerprint'), name='bank_transaction_unique_fingerprint'),
+        ),
+    ]
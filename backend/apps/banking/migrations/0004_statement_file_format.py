@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-19 02:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('banking', '0003_transaction_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bankstatementimport',
+            name='file_format',
+            field=models.CharField(default='csv', max_length=16),
+        ),
+    ]
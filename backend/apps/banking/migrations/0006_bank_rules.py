@@ -0,0 +1,49 @@
+# Generated by Django 5.2.11 on 2026-10-19 02:32
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0003_exchange_rate'),
+        ('banking', '0005_background_imports'),
+        ('companies', '0003_company_fx_gain_loss_account'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankRule',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(max_length=255)),
+                ('priority', models.PositiveIntegerField(default=100)),
+                ('description_pattern', models.CharField(blank=True, max_length=255)),
+                ('counterparty', models.CharField(blank=True, max_length=255)),
+                ('direction', models.CharField(choices=[('any', 'Any'), ('inflow', 'Inflow'), ('outflow', 'Outflow')], default='any', max_length=10)),
+                ('min_amount', models.DecimalField(blank=True, decimal_places=4, max_digits=19, null=True)),
+                ('max_amount', models.DecimalField(blank=True, decimal_places=4, max_digits=19, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('bank_account', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='rules', to='banking.bankaccount')),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bank_rules', to='companies.company')),
+                ('target_account', models.ForeignKey(on_delete=django.db.models.deletion.RESTRICT, related_name='bank_rules', to='accounting.account')),
+            ],
+            options={
+                'db_table': 'bank_rule',
+                'ordering': ['priority', 'name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='banktransaction',
+            name='rule',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='transactions', to='banking.bankrule'),
+        ),
+        migrations.AddIndex(
+            model_name='bankrule',
+            index=models.Index(fields=['company', 'is_active'], name='bank_rule_company_3b4670_idx'),
+        ),
+    ]
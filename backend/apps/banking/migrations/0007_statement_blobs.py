@@ -0,0 +1,61 @@
+# Generated by Django 5.2.11 on 2026-10-19 02:35
+
+import os
+from pathlib import Path
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+from apps.documents.blobs import write_blob
+
+
+def _read_file(path, size=64 * 1024):
+    with open(path, "rb") as handle:
+        yield from iter(lambda: handle.read(size), b"")
+
+
+def move_content_to_blobs(apps, schema_editor):
+    BankStatementImport = apps.get_model("banking", "BankStatementImport")
+    StoredBlob = apps.get_model("documents", "StoredBlob")
+    # Uploads queued by the background importer were kept under BANK_IMPORT_DIR.
+    upload_dir = Path(os.getenv("BANK_IMPORT_DIR", "").strip() or settings.BASE_DIR / "bank_imports")
+    imports = BankStatementImport.objects.only("id", "raw_content", "stored_file_name")
+    for statement_import in imports.iterator(chunk_size=200):
+        if statement_import.stored_file_name and (upload_dir / statement_import.stored_file_name).exists():
+            chunks = _read_file(upload_dir / statement_import.stored_file_name)
+        elif statement_import.raw_content:
+            chunks = [statement_import.raw_content]
+        else:
+            continue
+        sha256, size, compressed_size, name = write_blob(chunks)
+        blob, _ = StoredBlob.objects.get_or_create(
+            sha256=sha256,
+            defaults={"size": size, "compressed_size": compressed_size, "compression": "gzip", "storage_name": name},
+        )
+        BankStatementImport.objects.filter(id=statement_import.id).update(blob=blob)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('banking', '0006_bank_rules'),
+        ('documents', '0001_stored_blob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bankstatementimport',
+            name='blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='bank_statement_imports', to='documents.storedblob'),
+        ),
+        migrations.RunPython(move_content_to_blobs, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='bankstatementimport',
+            name='raw_content',
+        ),
+        migrations.RemoveField(
+            model_name='bankstatementimport',
+            name='stored_file_name',
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.11 on 2026-10-19 02:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('banking', '0007_statement_blobs'),
+        ('companies', '0003_company_fx_gain_loss_account'),
+        ('journals', '0004_journal_search'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='banktransaction',
+            name='bank_transa_company_39a3b5_idx',
+        ),
+        migrations.AddIndex(
+            model_name='banktransaction',
+            index=models.Index(fields=['company', 'bank_account', 'status', 'txn_date'], name='bank_transa_company_e8c387_idx'),
+        ),
+    ]
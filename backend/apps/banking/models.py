@@ -1,14 +1,17 @@
 from django.conf import settings
 from django.db import models
+from django.db.models import Q
 
 from apps.accounting.models import Account
 from apps.common.models import TimeStampedUUIDModel
 from apps.companies.models import Company
+from apps.documents.models import StoredBlob
 from apps.journals.models import JournalEntry
 
 
 class BankImportStatus(models.TextChoices):
     UPLOADED = "uploaded", "Uploaded"
+    PROCESSING = "processing", "Processing"
     PARSED = "parsed", "Parsed"
     FAILED = "failed", "Failed"
 
@@ -20,6 +23,12 @@ class BankTransactionStatus(models.TextChoices):
     IGNORED = "ignored", "Ignored"
 
 
+class BankRuleDirection(models.TextChoices):
+    ANY = "any", "Any"
+    INFLOW = "inflow", "Inflow"
+    OUTFLOW = "outflow", "Outflow"
+
+
 class ReconciliationStatus(models.TextChoices):
     DRAFT = "draft", "Draft"
     FINALIZED = "finalized", "Finalized"
@@ -43,9 +52,21 @@ class BankStatementImport(TimeStampedUUIDModel):
     company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name="bank_statement_imports")
     bank_account = models.ForeignKey(BankAccount, on_delete=models.CASCADE, related_name="imports")
     file_name = models.CharField(max_length=255)
+    file_format = models.CharField(max_length=16, default="csv")
     status = models.CharField(max_length=20, choices=BankImportStatus.choices, default=BankImportStatus.UPLOADED)
-    raw_content = models.TextField(blank=True)
+    blob = models.ForeignKey(
+        StoredBlob,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="bank_statement_imports",
+    )
     error_message = models.TextField(blank=True)
+    rows_processed = models.PositiveIntegerField(default=0)
+    transactions_created = models.PositiveIntegerField(default=0)
+    rows_failed = models.PositiveIntegerField(default=0)
+    duplicates_skipped = models.PositiveIntegerField(default=0)
+    row_errors = models.JSONField(default=list, blank=True)
     imported_by_user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.SET_NULL,
@@ -60,6 +81,31 @@ class BankStatementImport(TimeStampedUUIDModel):
         ordering = ["-created_at"]
 
 
+class BankRule(TimeStampedUUIDModel):
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name="bank_rules")
+    name = models.CharField(max_length=255)
+    priority = models.PositiveIntegerField(default=100)
+    bank_account = models.ForeignKey(
+        BankAccount,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="rules",
+    )
+    description_pattern = models.CharField(max_length=255, blank=True)
+    counterparty = models.CharField(max_length=255, blank=True)
+    direction = models.CharField(max_length=10, choices=BankRuleDirection.choices, default=BankRuleDirection.ANY)
+    min_amount = models.DecimalField(max_digits=19, decimal_places=4, null=True, blank=True)
+    max_amount = models.DecimalField(max_digits=19, decimal_places=4, null=True, blank=True)
+    target_account = models.ForeignKey(Account, on_delete=models.RESTRICT, related_name="bank_rules")
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        db_table = "bank_rule"
+        indexes = [models.Index(fields=["company", "is_active"])]
+        ordering = ["priority", "name"]
+
+
 class BankTransaction(TimeStampedUUIDModel):
     company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name="bank_transactions")
     bank_account = models.ForeignKey(BankAccount, on_delete=models.CASCADE, related_name="transactions")
@@ -74,6 +120,7 @@ class BankTransaction(TimeStampedUUIDModel):
     description = models.TextField(blank=True)
     reference = models.CharField(max_length=128, blank=True)
     amount = models.DecimalField(max_digits=19, decimal_places=4)
+    fingerprint = models.CharField(max_length=64, blank=True)
     status = models.CharField(max_length=20, choices=BankTransactionStatus.choices, default=BankTransactionStatus.IMPORTED)
     matched_journal_entry = models.ForeignKey(
         JournalEntry,
@@ -82,13 +129,21 @@ class BankTransaction(TimeStampedUUIDModel):
         blank=True,
         related_name="bank_transactions",
     )
+    rule = models.ForeignKey(BankRule, on_delete=models.SET_NULL, null=True, blank=True, related_name="transactions")
 
     class Meta:
         db_table = "bank_transaction"
         indexes = [
             models.Index(fields=["company", "status"]),
             models.Index(fields=["company", "txn_date"]),
-            models.Index(fields=["company", "bank_account"]),
+            models.Index(fields=["company", "bank_account", "status", "txn_date"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["bank_account", "fingerprint"],
+                condition=~Q(fingerprint=""),
+                name="bank_transaction_unique_fingerprint",
+            ),
         ]
         ordering = ["-txn_date", "-created_at"]
 
@@ -0,0 +1,259 @@
+import re
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.accounting.fx import FxRateError, rate_for, to_base
+from apps.accounting.services import allocate_sequence_block
+from apps.banking.fingerprints import normalize_text
+from apps.banking.models import BankRule, BankRuleDirection, BankTransaction, BankTransactionStatus
+from apps.banking.services import BankingValidationError
+from apps.common.compiled_cache import CompanyCompiledCache
+from apps.journals.models import JournalEntry, JournalLine, JournalStatus, LedgerEventType
+from apps.journals.outbox import record_ledger_events
+from apps.journals.services import archived_periods
+
+RULE_SCAN_CHUNK_SIZE = 2000
+# Backtracking cost grows with the text length to the power of the repeats in the pattern, so rule
+# patterns are kept to a small, non-nested set of repeats and only see the head of a description.
+MAX_PATTERN_REPEATS = 2
+PATTERN_TEXT_LIMIT = 256
+
+_BOUNDED_REPEAT = re.compile(r"\{(\d+(,\d*)?|,\d+)\}")
+
+
+def compile_rule_pattern(pattern: str):
+    """Compile a rule's description pattern, raising ``re.error`` for syntax that can backtrack badly.
+
+    Rejected: backreferences, a repeated group that itself repeats or alternates, and more than
+    ``MAX_PATTERN_REPEATS`` repeats overall. Optional ``?`` and ``{0,n}`` count as repeats too:
+    ``(a?){28}a{28}`` backtracks as badly as ``(a+)+``.
+    """
+    compiled = re.compile(pattern, re.IGNORECASE)
+    groups = [{"repeats": False, "alternates": False}]
+    repeats = 0
+    position = 0
+    in_class = False
+    # A "?" straight after a quantifier only makes it lazy; it is not another repeat.
+    after_quantifier = False
+    while position < len(pattern):
+        char = pattern[position]
+        if char == "\\":
+            if pattern[position + 1 : position + 2].isdigit() and pattern[position + 1] != "0":
+                raise re.error("backreferences are not supported")
+            position += 2
+            continue
+        if in_class:
+            in_class = char != "]"
+            position += 1
+            continue
+        repeat = _BOUNDED_REPEAT.match(pattern, position) if char == "{" else None
+        quantifier = char in ("*", "+") or repeat or (char == "?" and not after_quantifier)
+        after_quantifier = bool(quantifier)
+        if char == "[":
+            in_class = True
+            # A leading "]" (after an optional "^") is a literal inside the class.
+            if pattern[position + 1 : position + 2] == "^":
+                position += 1
+            if pattern[position + 1 : position + 2] == "]":
+                position += 1
+        elif char == "(":
+            if pattern.startswith("(?P=", position):
+                raise re.error("backreferences are not supported")
+            groups.append({"repeats": False, "alternates": False})
+            if pattern[position + 1 : position + 2] == "?":
+                position += 1
+        elif char == ")":
+            inner = groups.pop()
+            follower = pattern[position + 1 : position + 2]
+            quantified = follower in ("*", "+") or (follower == "{" and _BOUNDED_REPEAT.match(pattern, position + 1))
+            # An optional group only runs once, so alternatives inside it cannot multiply.
+            if (quantified and (inner["repeats"] or inner["alternates"])) or (follower == "?" and inner["repeats"]):
+                raise re.error("a repeated group cannot contain repeats or alternatives")
+            groups[-1]["repeats"] = groups[-1]["repeats"] or inner["repeats"]
+        elif char == "|":
+            groups[-1]["alternates"] = True
+        elif quantifier:
+            groups[-1]["repeats"] = True
+            repeats += 1
+            if repeat:
+                position = repeat.end() - 1
+        position += 1
+    if repeats > MAX_PATTERN_REPEATS:
+        raise re.error(f"at most {MAX_PATTERN_REPEATS} repeats are allowed")
+    return compiled
+
+
+class CompiledBankRule:
+    __slots__ = (
+        "id",
+        "name",
+        "bank_account_id",
+        "pattern",
+        "counterparty",
+        "direction",
+        "min_amount",
+        "max_amount",
+        "target_account_id",
+    )
+
+    def __init__(self, rule: BankRule):
+        self.id = rule.id
+        self.name = rule.name
+        self.bank_account_id = rule.bank_account_id
+        self.pattern = compile_rule_pattern(rule.description_pattern) if rule.description_pattern else None
+        self.counterparty = normalize_text(rule.counterparty)
+        self.direction = rule.direction
+        self.min_amount = rule.min_amount
+        self.max_amount = rule.max_amount
+        self.target_account_id = rule.target_account_id
+
+    def matches(self, txn, text) -> bool:
+        # Cheapest checks first; the regex only runs on lines that passed the amount filters.
+        if self.bank_account_id is not None and self.bank_account_id != txn.bank_account_id:
+            return False
+        if self.direction == BankRuleDirection.INFLOW and txn.amount <= 0:
+            return False
+        if self.direction == BankRuleDirection.OUTFLOW and txn.amount >= 0:
+            return False
+        amount = abs(txn.amount)
+        if self.min_amount is not None and amount < self.min_amount:
+            return False
+        if self.max_amount is not None and amount > self.max_amount:
+            return False
+        if self.counterparty and self.counterparty not in text:
+            return False
+        return self.pattern is None or self.pattern.search((txn.description or "")[:PATTERN_TEXT_LIMIT]) is not None
+
+
+class BankRuleSet:
+    """Active rules of one company in evaluation order; the first matching rule wins."""
+
+    def __init__(self, rules):
+        self._rules = []
+        for rule in rules:
+            try:
+                self._rules.append(CompiledBankRule(rule))
+            except re.error:
+                # Patterns are validated on save; a rule that still fails the check never matches.
+                continue
+
+    def __len__(self):
+        return len(self._rules)
+
+    def match(self, txn):
+        text = f"{normalize_text(txn.reference)} {normalize_text(txn.description)}"
+        for rule in self._rules:
+            if rule.matches(txn, text):
+                return rule
+        return None
+
+
+def _build_rule_set(company_id):
+    return BankRuleSet(BankRule.objects.filter(company_id=company_id, is_active=True).order_by("priority", "name", "id"))
+
+
+_rule_sets = CompanyCompiledCache(model=BankRule, build=_build_rule_set)
+
+
+def get_rule_set(company) -> BankRuleSet:
+    return _rule_sets.get(company)
+
+
+def invalidate_rule_set(company) -> None:
+    _rule_sets.invalidate(company)
+
+
+class RuleMatch:
+    __slots__ = ("bank_transaction", "rule", "journal_entry")
+
+    def __init__(self, *, bank_transaction, rule, journal_entry=None):
+        self.bank_transaction = bank_transaction
+        self.rule = rule
+        self.journal_entry = journal_entry
+
+
+def _in_archived_period(txn_date, periods):
+    return any(start_date <= txn_date <= end_date for start_date, end_date, _ in periods)
+
+
+@transaction.atomic
+def apply_bank_rules(*, company, actor_user, bank_account=None, date_from=None, date_to=None, dry_run=False):
+    """Run the company's rules over unmatched imported lines and post one entry per matching line.
+
+    Every entry takes its number from a single sequence block and all entries, lines and
+    transaction updates are written with bulk statements. Lines dated in an archived fiscal year
+    are left for manual handling.
+    """
+    rule_set = get_rule_set(company)
+    if not len(rule_set):
+        return []
+
+    queryset = BankTransaction.objects.filter(
+        company=company,
+        status=BankTransactionStatus.IMPORTED,
+        matched_journal_entry__isnull=True,
+    ).select_related("bank_account")
+    if bank_account is not None:
+        queryset = queryset.filter(bank_account=bank_account)
+    if date_from:
+        queryset = queryset.filter(txn_date__gte=date_from)
+    if date_to:
+        queryset = queryset.filter(txn_date__lte=date_to)
+    if not dry_run:
+        queryset = queryset.select_for_update(of=("self",))
+
+    periods = archived_periods(company)
+    matches = []
+    for txn in queryset.order_by("txn_date", "created_at").iterator(chunk_size=RULE_SCAN_CHUNK_SIZE):
+        if not txn.amount or _in_archived_period(txn.txn_date, periods):
+            continue
+        rule = rule_set.match(txn)
+        if rule is not None:
+            matches.append(RuleMatch(bank_transaction=txn, rule=rule))
+    if dry_run or not matches:
+        return matches
+
+    first_entry_no = allocate_sequence_block(company=company, key="journal_entry", count=len(matches))
+    now = timezone.now()
+    entries = []
+    journal_lines = []
+    for offset, match in enumerate(matches):
+        txn = match.bank_transaction
+        try:
+            rate = rate_for(company=company, currency_code=txn.bank_account.currency_code, on_date=txn.txn_date)
+        except FxRateError as exc:
+            raise BankingValidationError(str(exc)) from exc
+        amount = to_base(abs(txn.amount), rate)
+        entry = JournalEntry(
+            company=company,
+            entry_no=first_entry_no + offset,
+            status=JournalStatus.POSTED,
+            entry_date=txn.txn_date,
+            description=f"{match.rule.name}: {txn.description}" if txn.description else match.rule.name,
+            reference_type="bank_transaction",
+            reference_id=txn.id,
+            posted_at=now,
+            posted_by_user=actor_user,
+        )
+        bank_side = {"account_id": txn.bank_account.ledger_account_id, "description": txn.description}
+        rule_side = {"account_id": match.rule.target_account_id, "description": match.rule.name}
+        debit_side, credit_side = (bank_side, rule_side) if txn.amount > 0 else (rule_side, bank_side)
+        journal_lines.append(JournalLine(company=company, journal_entry=entry, line_no=1, debit=amount, credit=0, **debit_side))
+        journal_lines.append(JournalLine(company=company, journal_entry=entry, line_no=2, debit=0, credit=amount, **credit_side))
+        entries.append(entry)
+        match.journal_entry = entry
+        txn.matched_journal_entry = entry
+        txn.rule_id = match.rule.id
+        txn.status = BankTransactionStatus.MATCHED
+        txn.updated_at = now
+
+    JournalEntry.objects.bulk_create(entries, batch_size=500)
+    JournalLine.objects.bulk_create(journal_lines, batch_size=1000)
+    record_ledger_events(event_type=LedgerEventType.POSTED, entries=entries)
+    BankTransaction.objects.bulk_update(
+        [match.bank_transaction for match in matches],
+        ["matched_journal_entry", "rule", "status", "updated_at"],
+        batch_size=1000,
+    )
+    return matches
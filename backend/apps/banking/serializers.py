@@ -1,13 +1,20 @@
+import re
+
 from rest_framework import serializers
 
 from apps.accounting.models import Account
+from apps.banking.matching import DEFAULT_DATE_WINDOW_DAYS, DEFAULT_MIN_SCORE, DEFAULT_SUGGESTION_WINDOW_DAYS
 from apps.banking.models import (
     BankAccount,
     BankReconciliation,
     BankReconciliationLine,
+    BankRule,
     BankStatementImport,
     BankTransaction,
 )
+from apps.banking.rules import compile_rule_pattern
+from apps.banking.statement_parsers import SNIFF_SIZE, detect_statement_format, statement_format_choices
+from apps.documents.blobs import store_blob
 from apps.journals.models import JournalEntry, JournalStatus
 
 
@@ -38,6 +45,12 @@ class BankAccountSerializer(serializers.ModelSerializer):
 
 
 class BankStatementImportSerializer(serializers.ModelSerializer):
+    file = serializers.FileField(write_only=True, required=False)
+    raw_content = serializers.CharField(write_only=True, required=False, trim_whitespace=False)
+    file_size = serializers.IntegerField(source="blob.size", read_only=True, default=None)
+    background = serializers.BooleanField(write_only=True, required=False, default=False)
+    file_format = serializers.ChoiceField(choices=statement_format_choices(), required=False)
+
     class Meta:
         model = BankStatementImport
         fields = (
@@ -45,9 +58,19 @@ class BankStatementImportSerializer(serializers.ModelSerializer):
             "company",
             "bank_account",
             "file_name",
+            "file_format",
+            "file",
+            "background",
             "status",
             "raw_content",
+            "blob",
+            "file_size",
             "error_message",
+            "rows_processed",
+            "transactions_created",
+            "rows_failed",
+            "duplicates_skipped",
+            "row_errors",
             "imported_by_user",
             "created_at",
             "updated_at",
@@ -55,12 +78,18 @@ class BankStatementImportSerializer(serializers.ModelSerializer):
         read_only_fields = (
             "id",
             "status",
+            "blob",
             "error_message",
+            "rows_processed",
+            "transactions_created",
+            "rows_failed",
+            "duplicates_skipped",
+            "row_errors",
             "imported_by_user",
             "created_at",
             "updated_at",
         )
-        extra_kwargs = {"company": {"required": False}}
+        extra_kwargs = {"company": {"required": False}, "file_name": {"required": False}}
         validators = []
 
     def validate_bank_account(self, value):
@@ -69,6 +98,35 @@ class BankStatementImportSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Bank account must belong to the selected company.")
         return value
 
+    def validate(self, attrs):
+        upload = attrs.get("file")
+        if upload is None and not attrs.get("raw_content"):
+            raise serializers.ValidationError({"file": "Upload a statement file or provide raw_content."})
+        if upload is not None:
+            attrs["file_name"] = attrs.get("file_name") or upload.name
+            head = upload.read(SNIFF_SIZE).decode("utf-8", errors="ignore")
+            upload.seek(0)
+        else:
+            head = attrs["raw_content"][:SNIFF_SIZE]
+        if not attrs.get("file_name"):
+            raise serializers.ValidationError({"file_name": "This field is required."})
+        attrs["file_format"] = detect_statement_format(
+            file_name=attrs["file_name"],
+            requested=attrs.get("file_format", ""),
+            head=head,
+        )
+        return attrs
+
+    def create(self, validated_data):
+        upload = validated_data.pop("file", None)
+        raw_content = validated_data.pop("raw_content", "")
+        validated_data.pop("background", None)
+        if upload is not None:
+            validated_data["blob"] = store_blob(upload.chunks(), content_type=upload.content_type or "")
+        else:
+            validated_data["blob"] = store_blob([raw_content], content_type="text/plain")
+        return super().create(validated_data)
+
 
 class BankTransactionSerializer(serializers.ModelSerializer):
     bank_account_name = serializers.CharField(source="bank_account.name", read_only=True)
@@ -89,6 +147,7 @@ class BankTransactionSerializer(serializers.ModelSerializer):
             "status",
             "matched_journal_entry",
             "matched_entry_no",
+            "rule",
             "created_at",
             "updated_at",
         )
@@ -108,6 +167,85 @@ class TransactionMatchSerializer(serializers.Serializer):
         return value
 
 
+class AutoMatchSerializer(serializers.Serializer):
+    date_window_days = serializers.IntegerField(required=False, min_value=0, max_value=60, default=DEFAULT_DATE_WINDOW_DAYS)
+    min_score = serializers.FloatField(required=False, min_value=0, max_value=1, default=DEFAULT_MIN_SCORE)
+    apply = serializers.BooleanField(required=False, default=False)
+
+
+class MatchSuggestionQuerySerializer(serializers.Serializer):
+    date_window_days = serializers.IntegerField(
+        required=False,
+        min_value=0,
+        max_value=120,
+        default=DEFAULT_SUGGESTION_WINDOW_DAYS,
+    )
+    limit = serializers.IntegerField(required=False, min_value=1, max_value=20, default=5)
+
+
+class BankRuleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BankRule
+        fields = (
+            "id",
+            "company",
+            "name",
+            "priority",
+            "bank_account",
+            "description_pattern",
+            "counterparty",
+            "direction",
+            "min_amount",
+            "max_amount",
+            "target_account",
+            "is_active",
+            "created_at",
+            "updated_at",
+        )
+        read_only_fields = ("id", "created_at", "updated_at")
+        extra_kwargs = {"company": {"required": False}}
+        validators = []
+
+    def validate_description_pattern(self, value):
+        try:
+            compile_rule_pattern(value)
+        except re.error as exc:
+            raise serializers.ValidationError(f"Invalid regular expression: {exc}.") from exc
+        return value
+
+    def validate(self, attrs):
+        def current(name):
+            return attrs[name] if name in attrs else getattr(self.instance, name, None)
+
+        company = self.context.get("company") or getattr(self.instance, "company", None)
+        bank_account = current("bank_account")
+        target_account = current("target_account")
+        if company and bank_account and bank_account.company_id != company.id:
+            raise serializers.ValidationError({"bank_account": "Bank account must belong to the selected company."})
+        if company and target_account and target_account.company_id != company.id:
+            raise serializers.ValidationError({"target_account": "Target account must belong to the selected company."})
+        min_amount, max_amount = current("min_amount"), current("max_amount")
+        if any(amount is not None and amount < 0 for amount in (min_amount, max_amount)):
+            raise serializers.ValidationError({"min_amount": "Amount bounds apply to the absolute amount and cannot be negative."})
+        if min_amount is not None and max_amount is not None and min_amount > max_amount:
+            raise serializers.ValidationError({"max_amount": "Maximum amount must be greater than or equal to minimum amount."})
+        if not (current("description_pattern") or current("counterparty") or min_amount is not None or max_amount is not None):
+            raise serializers.ValidationError("A rule needs a description pattern, counterparty or amount range.")
+        return attrs
+
+
+class BankRuleApplySerializer(serializers.Serializer):
+    bank_account_id = serializers.UUIDField(required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    dry_run = serializers.BooleanField(required=False, default=False)
+
+    def validate(self, attrs):
+        if attrs.get("date_from") and attrs.get("date_to") and attrs["date_from"] > attrs["date_to"]:
+            raise serializers.ValidationError({"date_to": "End date must be greater than or equal to start date."})
+        return attrs
+
+
 class BankReconciliationSerializer(serializers.ModelSerializer):
     class Meta:
         model = BankReconciliation
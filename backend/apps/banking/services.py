@@ -1,20 +1,32 @@
 import csv
+from collections import Counter
 from datetime import date
-from decimal import Decimal, InvalidOperation
-from io import StringIO
+from decimal import Decimal
 
 from django.db import transaction
+from django.db.models import Count, DecimalField, Sum, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
+from apps.banking.fingerprints import fingerprint_key, transaction_fingerprint
 from apps.banking.models import (
     BankImportStatus,
     BankReconciliation,
     BankReconciliationLine,
+    BankStatementImport,
     BankTransaction,
     BankTransactionStatus,
     ReconciliationStatus,
 )
-from apps.journals.models import JournalStatus
+from apps.banking.statement_parsers import StatementFormatError, get_statement_parser
+from apps.common.decimals import parse_amount
+from apps.common.streaming import chunked, open_text_stream
+from apps.documents.blobs import BlobStoreError, open_blob
+from apps.journals.models import ArchivedAccountTotal, JournalLine, JournalStatus
+
+STATEMENT_CHUNK_SIZE = 1000
+MAX_REPORTED_ROW_ERRORS = 100
+MONEY_QUANT = Decimal("0.0001")
 
 
 class BankingValidationError(ValueError):
@@ -30,57 +42,140 @@ def _parse_date(value: str) -> date:
 
 def _parse_amount(value: str) -> Decimal:
     try:
-        return Decimal((value or "").strip())
-    except (InvalidOperation, AttributeError) as exc:
-        raise BankingValidationError(f"Invalid amount value '{value}'.") from exc
+        amount = parse_amount(value, label="amount value")
+    except ValueError as exc:
+        raise BankingValidationError(str(exc)) from exc
+    if not amount:
+        raise BankingValidationError(f"Invalid amount value '{value}': a statement line cannot be zero.")
+    return amount
+
+
+def _fail_import(statement_import, message):
+    statement_import.status = BankImportStatus.FAILED
+    statement_import.error_message = message
+    statement_import.save(update_fields=["status", "error_message", "updated_at"])
+    raise BankingValidationError(message)
+
+
+def _build_transaction(*, statement_import, row):
+    if isinstance(row, StatementFormatError):
+        raise BankingValidationError(str(row))
+    raw_date = row.get("date")
+    if not raw_date:
+        return None
+    txn = BankTransaction(
+        company_id=statement_import.company_id,
+        bank_account_id=statement_import.bank_account_id,
+        statement_import=statement_import,
+        txn_date=_parse_date(raw_date),
+        description=(row.get("description") or "").strip(),
+        reference=(row.get("reference") or "").strip()[:128],
+        amount=_parse_amount(row.get("amount") or "0"),
+        status=BankTransactionStatus.IMPORTED,
+    )
+    # Holds the un-numbered key until the caller knows which occurrence of it this line is.
+    txn.fingerprint = fingerprint_key(
+        bank_account_id=txn.bank_account_id,
+        txn_date=txn.txn_date,
+        amount=txn.amount,
+        reference=txn.reference,
+        description=txn.description,
+    )
+    return txn
+
+
+def _existing_fingerprints(*, bank_account_id, transactions):
+    if not transactions:
+        return set()
+    dates = [txn.txn_date for txn in transactions]
+    return set(
+        BankTransaction.objects.filter(
+            bank_account_id=bank_account_id,
+            txn_date__range=(min(dates), max(dates)),
+            fingerprint__in=[txn.fingerprint for txn in transactions],
+        ).values_list("fingerprint", flat=True)
+    )
 
 
 @transaction.atomic
-def parse_statement_import(*, statement_import):
-    content = statement_import.raw_content or ""
-    if not content.strip():
-        statement_import.status = BankImportStatus.FAILED
-        statement_import.error_message = "CSV content is empty."
-        statement_import.save(update_fields=["status", "error_message", "updated_at"])
-        raise BankingValidationError("CSV content is empty.")
-
-    reader = csv.DictReader(StringIO(content))
-    required_candidates = ("date", "txn_date")
-    if not reader.fieldnames:
-        statement_import.status = BankImportStatus.FAILED
-        statement_import.error_message = "CSV header row is missing."
-        statement_import.save(update_fields=["status", "error_message", "updated_at"])
-        raise BankingValidationError("CSV header row is missing.")
-
-    if not any(name in reader.fieldnames for name in required_candidates) or "amount" not in reader.fieldnames:
-        statement_import.status = BankImportStatus.FAILED
-        statement_import.error_message = "CSV must include date/txn_date and amount columns."
-        statement_import.save(update_fields=["status", "error_message", "updated_at"])
-        raise BankingValidationError("CSV must include date/txn_date and amount columns.")
-
-    created = 0
-    for row in reader:
-        raw_date = row.get("date") or row.get("txn_date")
-        if not raw_date:
-            continue
-        txn_date = _parse_date(raw_date)
-        amount = _parse_amount(row.get("amount", "0"))
-        BankTransaction.objects.create(
-            company=statement_import.company,
-            bank_account=statement_import.bank_account,
-            statement_import=statement_import,
-            txn_date=txn_date,
-            description=(row.get("description") or "").strip(),
-            reference=(row.get("reference") or "").strip(),
-            amount=amount,
-            status=BankTransactionStatus.IMPORTED,
-        )
-        created += 1
+def _save_statement_chunk(*, statement_import, transactions):
+    # ignore_conflicts covers a concurrent upload of the same lines landing between lookup and insert.
+    BankTransaction.objects.bulk_create(transactions, batch_size=STATEMENT_CHUNK_SIZE, ignore_conflicts=True)
+    BankStatementImport.objects.filter(id=statement_import.id).update(
+        rows_processed=statement_import.rows_processed,
+        transactions_created=statement_import.transactions_created,
+        rows_failed=statement_import.rows_failed,
+        duplicates_skipped=statement_import.duplicates_skipped,
+        row_errors=statement_import.row_errors,
+        updated_at=timezone.now(),
+    )
+
 
+def parse_statement_import(*, statement_import, text_stream=None, chunk_size=STATEMENT_CHUNK_SIZE):
+    """Stream statement rows into BankTransaction rows, committing one chunk at a time.
+
+    Rows come from the parser registered for the import's ``file_format`` (CSV, OFX, CAMT.053, MT940),
+    read lazily from the import's stored blob unless a ``text_stream`` is given.
+
+    Counters on the import are updated after every chunk so progress can be polled. Bad rows are
+    counted and reported; the import only fails outright if nothing could be imported. Lines whose
+    fingerprint already exists on the bank account (an overlapping statement) are skipped.
+    """
+    if text_stream is not None:
+        return _parse_statement_rows(statement_import=statement_import, text_stream=text_stream, chunk_size=chunk_size)
+    blob = statement_import.blob
+    if blob is None or not blob.size:
+        _fail_import(statement_import, "Statement content is empty.")
+    try:
+        with open_blob(blob) as handle:
+            return _parse_statement_rows(
+                statement_import=statement_import,
+                text_stream=open_text_stream(handle),
+                chunk_size=chunk_size,
+            )
+    except BlobStoreError as exc:
+        _fail_import(statement_import, str(exc))
+
+
+def _parse_statement_rows(*, statement_import, text_stream, chunk_size):
+    statement_import.rows_processed = 0
+    statement_import.transactions_created = 0
+    statement_import.rows_failed = 0
+    statement_import.duplicates_skipped = 0
+    statement_import.row_errors = []
+    occurrences = Counter()
+    try:
+        rows = get_statement_parser(statement_import.file_format)(text_stream)
+        for chunk in chunked(rows, chunk_size):
+            transactions = []
+            for row_no, row in chunk:
+                try:
+                    txn = _build_transaction(statement_import=statement_import, row=row)
+                except BankingValidationError as exc:
+                    statement_import.rows_failed += 1
+                    if len(statement_import.row_errors) < MAX_REPORTED_ROW_ERRORS:
+                        statement_import.row_errors.append({"row": row_no, "detail": str(exc)})
+                    continue
+                if txn is not None:
+                    occurrences[txn.fingerprint] += 1
+                    txn.fingerprint = transaction_fingerprint(txn.fingerprint, occurrences[txn.fingerprint])
+                    transactions.append(txn)
+            existing = _existing_fingerprints(bank_account_id=statement_import.bank_account_id, transactions=transactions)
+            if existing:
+                transactions = [txn for txn in transactions if txn.fingerprint not in existing]
+                statement_import.duplicates_skipped += len(existing)
+            statement_import.rows_processed += len(chunk)
+            statement_import.transactions_created += len(transactions)
+            _save_statement_chunk(statement_import=statement_import, transactions=transactions)
+    except (BankingValidationError, StatementFormatError, csv.Error, UnicodeDecodeError) as exc:
+        _fail_import(statement_import, str(exc))
+
+    if statement_import.rows_failed and not statement_import.transactions_created:
+        _fail_import(statement_import, statement_import.row_errors[0]["detail"])
     statement_import.status = BankImportStatus.PARSED
     statement_import.error_message = ""
     statement_import.save(update_fields=["status", "error_message", "updated_at"])
-    return created
+    return statement_import.transactions_created
 
 
 @transaction.atomic
@@ -128,17 +223,75 @@ def replace_reconciliation_lines(*, reconciliation: BankReconciliation, transact
     return reconciliation
 
 
+def format_money(value) -> str:
+    return str(Decimal(value).quantize(MONEY_QUANT))
+
+
+def reconciliation_summary(reconciliation: BankReconciliation) -> dict:
+    """Cleared/uncleared bank totals, ledger balance and the difference still to explain.
+
+    The reconciliation balances when opening balance plus cleared lines equals the closing balance.
+    """
+    zero = Value(Decimal("0"), output_field=DecimalField(max_digits=19, decimal_places=4))
+    cleared = reconciliation.lines.aggregate(
+        total=Coalesce(Sum("bank_transaction__amount"), zero),
+        count=Count("id"),
+    )
+    uncleared = (
+        BankTransaction.objects.filter(
+            bank_account_id=reconciliation.bank_account_id,
+            txn_date__range=(reconciliation.start_date, reconciliation.end_date),
+        )
+        .exclude(status=BankTransactionStatus.IGNORED)
+        .exclude(reconciliation_lines__reconciliation=reconciliation)
+        .aggregate(total=Coalesce(Sum("amount"), zero), count=Count("id"))
+    )
+    ledger_account_id = reconciliation.bank_account.ledger_account_id
+    ledger = JournalLine.objects.filter(
+        company_id=reconciliation.company_id,
+        account_id=ledger_account_id,
+        journal_entry__status=JournalStatus.POSTED,
+        journal_entry__entry_date__lte=reconciliation.end_date,
+    ).aggregate(debit=Coalesce(Sum("debit"), zero), credit=Coalesce(Sum("credit"), zero))
+    # Lines of archived fiscal years only survive as per-account totals.
+    archived = ArchivedAccountTotal.objects.filter(
+        company_id=reconciliation.company_id,
+        account_id=ledger_account_id,
+        archive__end_date__lte=reconciliation.end_date,
+    ).aggregate(debit=Coalesce(Sum("debit_total"), zero), credit=Coalesce(Sum("credit_total"), zero))
+
+    expected_closing = reconciliation.opening_balance + cleared["total"]
+    return {
+        "opening_balance": format_money(reconciliation.opening_balance),
+        "closing_balance": format_money(reconciliation.closing_balance),
+        "cleared_count": cleared["count"],
+        "cleared_total": format_money(cleared["total"]),
+        "uncleared_count": uncleared["count"],
+        "uncleared_total": format_money(uncleared["total"]),
+        "ledger_balance": format_money(ledger["debit"] - ledger["credit"] + archived["debit"] - archived["credit"]),
+        "difference": format_money(reconciliation.closing_balance - expected_closing),
+    }
+
+
 @transaction.atomic
 def finalize_reconciliation(*, reconciliation: BankReconciliation, actor_user):
-    reconciliation = BankReconciliation.objects.select_for_update().get(id=reconciliation.id)
+    reconciliation = BankReconciliation.objects.select_for_update().select_related("bank_account").get(id=reconciliation.id)
     if reconciliation.status != ReconciliationStatus.DRAFT:
         raise BankingValidationError("Only draft reconciliations can be finalized.")
-    lines = list(reconciliation.lines.select_related("bank_transaction").all())
-    if not lines:
+    summary = reconciliation_summary(reconciliation)
+    if not summary["cleared_count"]:
         raise BankingValidationError("Reconciliation must include at least one transaction.")
+    if Decimal(summary["difference"]):
+        raise BankingValidationError(
+            f"Reconciliation is out of balance by {summary['difference']}: "
+            f"opening {summary['opening_balance']} + cleared {summary['cleared_total']} "
+            f"!= closing {summary['closing_balance']}."
+        )
 
-    tx_ids = [line.bank_transaction_id for line in lines]
-    BankTransaction.objects.filter(id__in=tx_ids).update(status=BankTransactionStatus.RECONCILED)
+    BankTransaction.objects.filter(reconciliation_lines__reconciliation=reconciliation).update(
+        status=BankTransactionStatus.RECONCILED,
+        updated_at=timezone.now(),
+    )
 
     reconciliation.status = ReconciliationStatus.FINALIZED
     reconciliation.finalized_at = timezone.now()
@@ -0,0 +1,244 @@
+import csv
+import re
+from xml.etree import ElementTree
+
+READ_SIZE = 64 * 1024
+SNIFF_SIZE = 2048
+
+_PARSERS = {}
+_EXTENSIONS = {}
+
+
+class StatementFormatError(ValueError):
+    pass
+
+
+def register_statement_parser(name, *, extensions=()):
+    """Parsers take a text stream and yield ``(row_no, row)`` with date/amount/description/reference strings.
+
+    A row the parser cannot read is yielded as a ``StatementFormatError`` so it is reported against its row.
+    """
+
+    def decorator(func):
+        _PARSERS[name] = func
+        for extension in extensions:
+            _EXTENSIONS[extension] = name
+        return func
+
+    return decorator
+
+
+def get_statement_parser(name):
+    try:
+        return _PARSERS[name]
+    except KeyError as exc:
+        raise StatementFormatError(f"Unsupported statement format '{name}'.") from exc
+
+
+def statement_format_choices():
+    return tuple(sorted(_PARSERS))
+
+
+def _sniff(head):
+    head = head.lstrip("\ufeff \r\n\t")
+    if head.startswith("OFXHEADER") or "<OFX>" in head.upper():
+        return "ofx"
+    if head.startswith("<") and "camt.053" in head:
+        return "camt053"
+    if head.startswith(":20:") or "\n:20:" in head or head.startswith("{1:"):
+        return "mt940"
+    return ""
+
+
+def detect_statement_format(*, file_name="", requested="", head=""):
+    value = (requested or "").strip().lower()
+    if not value:
+        lowered = (file_name or "").lower()
+        extension = lowered.rsplit(".", 1)[-1] if "." in lowered else ""
+        value = _EXTENSIONS.get(extension) or _sniff(head) or "csv"
+    get_statement_parser(value)
+    return value
+
+
+@register_statement_parser("csv", extensions=("csv",))
+def iter_csv_rows(text_stream):
+    reader = csv.DictReader(text_stream)
+    if not reader.fieldnames:
+        raise StatementFormatError("CSV header row is missing.")
+    reader.fieldnames = [(name or "").strip() for name in reader.fieldnames]
+    if not any(name in reader.fieldnames for name in ("date", "txn_date")) or "amount" not in reader.fieldnames:
+        raise StatementFormatError("CSV must include date/txn_date and amount columns.")
+    for row in reader:
+        yield reader.line_num, {
+            "date": row.get("date") or row.get("txn_date"),
+            "amount": row.get("amount"),
+            "description": row.get("description"),
+            "reference": row.get("reference"),
+        }
+
+
+_OFX_TAG_RE = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+
+def _iter_ofx_tags(text_stream):
+    # Works for SGML (OFX 1.x, unclosed leaf tags) and XML (OFX 2.x) alike; only a partial tag is
+    # carried over between reads.
+    buffer = ""
+    while True:
+        chunk = text_stream.read(READ_SIZE)
+        buffer += chunk
+        cut = buffer.rfind("<") if chunk else len(buffer)
+        if cut > 0:
+            for match in _OFX_TAG_RE.finditer(buffer, 0, cut):
+                yield match.group(1) == "/", match.group(2).upper(), match.group(3).strip()
+            buffer = buffer[cut:]
+        if not chunk:
+            return
+
+
+def _ofx_date(value):
+    digits = value[:8]
+    if len(digits) != 8 or not digits.isdigit():
+        return value
+    return f"{digits[:4]}-{digits[4:6]}-{digits[6:]}"
+
+
+@register_statement_parser("ofx", extensions=("ofx", "qfx"))
+def iter_ofx_rows(text_stream):
+    current = None
+    row_no = 0
+    for closing, tag, text in _iter_ofx_tags(text_stream):
+        if tag == "STMTTRN":
+            if closing and current is not None:
+                row_no += 1
+                name, memo = current.get("NAME", ""), current.get("MEMO", "")
+                yield row_no, {
+                    "date": _ofx_date(current.get("DTPOSTED", "")),
+                    "amount": current.get("TRNAMT", ""),
+                    "description": " - ".join(part for part in (name, memo) if part) if memo != name else name,
+                    "reference": current.get("REFNUM") or current.get("CHECKNUM") or current.get("FITID", ""),
+                }
+            current = None if closing else {}
+        elif current is not None and not closing and text:
+            current[tag] = text
+    if row_no == 0:
+        raise StatementFormatError("OFX file contains no <STMTTRN> transactions.")
+
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _child(element, *path):
+    for name in path:
+        if element is None:
+            return None
+        element = next((child for child in element if _local(child.tag) == name), None)
+    return element
+
+
+def _text(element, *path):
+    found = _child(element, *path)
+    return (found.text or "").strip() if found is not None else ""
+
+
+@register_statement_parser("camt053", extensions=("xml", "053"))
+def iter_camt053_rows(text_stream):
+    row_no = 0
+    try:
+        for _, element in ElementTree.iterparse(text_stream, events=("end",)):
+            if _local(element.tag) != "Ntry":
+                continue
+            row_no += 1
+            amount = _text(element, "Amt")
+            if _text(element, "CdtDbtInd") == "DBIT" and amount and not amount.startswith("-"):
+                amount = f"-{amount}"
+            details = _child(element, "NtryDtls", "TxDtls")
+            party = _child(details, "RltdPties", "Cdtr" if amount.startswith("-") else "Dbtr")
+            description = " - ".join(
+                part
+                for part in (
+                    _text(party, "Nm"),
+                    _text(details, "RmtInf", "Ustrd") or _text(element, "AddtlNtryInf"),
+                )
+                if part
+            )
+            booked = _text(element, "BookgDt", "Dt") or _text(element, "BookgDt", "DtTm") or _text(element, "ValDt", "Dt")
+            yield row_no, {
+                "date": booked[:10],
+                "amount": amount,
+                "description": description,
+                "reference": _text(element, "NtryRef")
+                or _text(details, "Refs", "EndToEndId")
+                or _text(element, "AcctSvcrRef"),
+            }
+            # Entries are consumed as they close, so drop their subtrees to keep memory flat.
+            element.clear()
+    except ElementTree.ParseError as exc:
+        raise StatementFormatError(f"Invalid CAMT.053 XML: {exc}") from exc
+    if row_no == 0:
+        raise StatementFormatError("CAMT.053 file contains no <Ntry> entries.")
+
+
+_MT940_FIELD_RE = re.compile(r"^:(\d{2}[A-Z]?):(.*)$")
+_MT940_61_RE = re.compile(
+    r"^(?P<date>\d{6})(?P<entry>\d{4})?(?P<mark>R?[CD])(?P<funds>[A-Z])?(?P<amount>\d+,\d*)"
+    r"(?P<type>[SNF][A-Z0-9]{3})?(?P<ref>[^/\n]*)(?://(?P<bank_ref>[^\n]*))?"
+)
+_MT940_SUBFIELD_RE = re.compile(r"\?\d{2}")
+
+
+def _iter_mt940_fields(text_stream):
+    tag, lines = None, []
+    for raw_line in text_stream:
+        line = raw_line.rstrip("\r\n")
+        match = _MT940_FIELD_RE.match(line)
+        if match:
+            if tag:
+                yield tag, lines
+            tag, lines = match.group(1), [match.group(2)]
+        elif tag and line and line not in ("-", "-}") and not line.startswith("{"):
+            lines.append(line)
+    if tag:
+        yield tag, lines
+
+
+def _mt940_row(statement_line, details):
+    match = _MT940_61_RE.match(statement_line[0])
+    if not match:
+        return StatementFormatError(f"Invalid :61: statement line '{statement_line[0]}'.")
+    raw = match.group("date")
+    sign = "-" if match.group("mark") in ("D", "RC") else ""
+    reference = match.group("ref").strip()
+    if not reference or reference.upper() == "NONREF":
+        reference = (match.group("bank_ref") or "").strip()
+    description = " ".join(_MT940_SUBFIELD_RE.sub(" ", " ".join(details)).split())
+    return {
+        "date": f"20{raw[:2]}-{raw[2:4]}-{raw[4:6]}",
+        "amount": sign + match.group("amount").replace(",", "."),
+        "description": description or " ".join(line.strip() for line in statement_line[1:]),
+        "reference": reference,
+    }
+
+
+@register_statement_parser("mt940", extensions=("sta", "mt940", "940"))
+def iter_mt940_rows(text_stream):
+    # :86: narrative belongs to the :61: line before it, so each row is emitted once the next field shows up.
+    pending = None
+    details = []
+    row_no = 0
+    for tag, lines in _iter_mt940_fields(text_stream):
+        if tag == "86" and pending is not None:
+            details.extend(lines)
+            continue
+        if pending is not None:
+            row_no += 1
+            yield row_no, _mt940_row(pending, details)
+            pending, details = None, []
+        if tag == "61":
+            pending = lines
+    if pending is not None:
+        row_no += 1
+        yield row_no, _mt940_row(pending, details)
+    if row_no == 0:
+        raise StatementFormatError("MT940 file contains no :61: statement lines.")
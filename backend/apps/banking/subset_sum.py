@@ -0,0 +1,94 @@
+import time
+
+MEET_IN_THE_MIDDLE_LIMIT = 24
+MAX_DP_STATES = 200_000
+_CHECK_EVERY = 4096
+
+
+class _BudgetExceeded(Exception):
+    pass
+
+
+class _Deadline:
+    def __init__(self, seconds):
+        self._at = time.monotonic() + seconds
+        self._ticks = 0
+
+    def tick(self):
+        self._ticks += 1
+        if self._ticks % _CHECK_EVERY == 0 and time.monotonic() > self._at:
+            raise _BudgetExceeded
+
+    def check(self):
+        if time.monotonic() > self._at:
+            raise _BudgetExceeded
+
+
+def _subset_sums(values, offset, target, deadline):
+    pairs = [(0, 0)]
+    for position, value in enumerate(values):
+        bit = 1 << (offset + position)
+        extra = []
+        for subtotal, mask in pairs:
+            deadline.tick()
+            if subtotal + value <= target:
+                extra.append((subtotal + value, mask | bit))
+        pairs.extend(extra)
+    return pairs
+
+
+def _meet_in_the_middle(values, target, max_results, deadline):
+    half = len(values) // 2
+    right = {}
+    for subtotal, mask in _subset_sums(values[half:], half, target, deadline):
+        masks = right.setdefault(subtotal, [])
+        if len(masks) < max_results:
+            masks.append(mask)
+
+    found = []
+    for subtotal, left_mask in _subset_sums(values[:half], 0, target, deadline):
+        for right_mask in right.get(target - subtotal, ()):
+            found.append(left_mask | right_mask)
+    found.sort(key=lambda mask: (bin(mask).count("1"), mask))
+    return [tuple(index for index in range(len(values)) if mask >> index & 1) for mask in found[:max_results]]
+
+
+def _dynamic_programming(values, target, deadline):
+    # Reachable sums only, each remembering the item that first reached it; items are used at most once
+    # because every pass extends a snapshot taken before the item was considered.
+    parents = {0: None}
+    for index, value in enumerate(values):
+        deadline.check()
+        for subtotal in list(parents):
+            reached = subtotal + value
+            if reached > target or reached in parents:
+                continue
+            parents[reached] = (subtotal, index)
+            if reached == target:
+                combination = []
+                while parents[reached] is not None:
+                    reached, item = parents[reached]
+                    combination.append(item)
+                return [tuple(sorted(combination))], True
+        if len(parents) > MAX_DP_STATES:
+            return [], False
+    return [], True
+
+
+def find_subset_sums(values, target, *, max_results=5, time_budget=0.5):
+    """Index tuples of ``values`` (positive integers) that add up to ``target``.
+
+    Small inputs are searched exhaustively with meet-in-the-middle and may return several
+    combinations, fewest items first; larger ones fall back to a reachable-sum search that returns
+    the first combination found. The second value is False when the time budget or state cap cut the
+    search short, so a miss is not proof that no combination exists.
+    """
+    if target <= 0 or not values:
+        return [], True
+    deadline = _Deadline(time_budget)
+    try:
+        if len(values) <= MEET_IN_THE_MIDDLE_LIMIT:
+            return _meet_in_the_middle(values, target, max_results, deadline), True
+        return _dynamic_programming(values, target, deadline)
+    except _BudgetExceeded:
+        return [], False
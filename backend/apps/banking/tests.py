@@ -1,10 +1,20 @@
 from decimal import Decimal
+from tempfile import TemporaryDirectory
 
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.test import APITestCase
 
 from apps.accounting.models import Account
+from apps.banking.models import BankStatementImport, BankTransaction
+from apps.banking.services import parse_statement_import
+from apps.banking.workers import run_statement_import
 from apps.companies.services import create_company_for_user
+from apps.documents.blobs import store_blob
 from apps.journals.models import JournalEntry, JournalStatus
 from apps.journals.services import post_journal_entry, replace_journal_lines
 from apps.users.models import User
@@ -12,6 +22,14 @@ from apps.users.models import User
 
 class BankingApiTests(APITestCase):
     def setUp(self):
+        blob_dir = TemporaryDirectory()
+        self.addCleanup(blob_dir.cleanup)
+        blob_storage = override_settings(
+            STORAGES={**settings.STORAGES, "blobs": {**settings.STORAGES["blobs"], "OPTIONS": {"location": blob_dir.name}}}
+        )
+        blob_storage.enable()
+        self.addCleanup(blob_storage.disable)
+
         self.owner = User.objects.create_user(
             email="bank-owner@test.local",
             password="SecurePass@123",
@@ -96,6 +114,17 @@ class BankingApiTests(APITestCase):
         post_journal_entry(entry=entry, actor_user=self.owner)
         return entry
 
+    def _post_cash_receipt(self, entry_date, amount, description):
+        entry = JournalEntry.objects.create(company=self.company, entry_date=entry_date, description=description)
+        replace_journal_lines(
+            entry=entry,
+            lines=[
+                {"account": self.cash_account, "debit": Decimal(amount), "credit": Decimal("0")},
+                {"account": self.revenue_account, "debit": Decimal("0"), "credit": Decimal(amount)},
+            ],
+        )
+        return post_journal_entry(entry=entry, actor_user=self.owner)
+
     def test_csv_import_parses_transactions(self):
         bank_account_id = self._create_bank_account()
         response = self.client.post(
@@ -112,7 +141,241 @@ class BankingApiTests(APITestCase):
 
         tx_list = self.client.get(f"/api/v1/banking/companies/{self.company.id}/transactions/")
         self.assertEqual(tx_list.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(tx_list.data), 2)
+        self.assertEqual(len(tx_list.data["results"]), 2)
+        self.assertIsNone(tx_list.data["next"])
+
+    def test_imports_share_stored_blobs_and_stream_the_original_file(self):
+        bank_account_id = self._create_bank_account()
+        content = "date,description,amount,reference\n2026-02-20,Deposit,50.00,REF1\n"
+        responses = [
+            self.client.post(
+                f"/api/v1/banking/companies/{self.company.id}/imports/",
+                {"bank_account": bank_account_id, "file": SimpleUploadedFile(name, content.encode(), "text/csv")},
+                format="multipart",
+            )
+            for name in ("march.csv", "march-again.csv")
+        ]
+        self.assertEqual([response.status_code for response in responses], [status.HTTP_201_CREATED] * 2)
+        self.assertEqual(responses[0].data["blob"], responses[1].data["blob"])
+        self.assertEqual(responses[0].data["file_size"], len(content))
+        self.assertEqual(responses[1].data["duplicates_skipped"], 1)
+
+        listing = self.client.get(f"/api/v1/banking/companies/{self.company.id}/imports/")
+        self.assertNotIn("raw_content", listing.data["results"][0])
+
+        download = self.client.get(f"/api/v1/banking/companies/{self.company.id}/imports/{responses[1].data['id']}/file/")
+        self.assertEqual(download.status_code, status.HTTP_200_OK)
+        self.assertIn('filename="march-again.csv"', download["Content-Disposition"])
+        self.assertEqual(b"".join(download.streaming_content).decode(), content)
+
+    def test_transaction_list_pages_through_every_row_by_cursor(self):
+        bank_account_id = self._create_bank_account()
+        BankTransaction.objects.bulk_create(
+            [
+                BankTransaction(
+                    company=self.company,
+                    bank_account_id=bank_account_id,
+                    txn_date=f"2026-02-{1 + index // 3:02d}",
+                    description=f"Line {index}",
+                    amount=Decimal(index + 1),
+                )
+                for index in range(7)
+            ]
+        )
+        url = f"/api/v1/banking/companies/{self.company.id}/transactions/?bank_account_id={bank_account_id}&limit=3"
+        seen = []
+        while url:
+            page = self.client.get(url)
+            self.assertEqual(page.status_code, status.HTTP_200_OK)
+            seen.extend(page.data["results"])
+            url = page.data["next"]
+
+        self.assertEqual(len({row["id"] for row in seen}), 7)
+        self.assertEqual([row["txn_date"] for row in seen], sorted((row["txn_date"] for row in seen), reverse=True))
+        invalid = self.client.get(f"/api/v1/banking/companies/{self.company.id}/transactions/?cursor=not-a-cursor")
+        self.assertEqual(invalid.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(invalid.data["error"]["message"], "Invalid cursor.")
+
+    def test_csv_import_bulk_inserts_chunks_and_reports_bad_rows(self):
+        bank_account_id = self._create_bank_account()
+        statement_import = BankStatementImport.objects.create(
+            company=self.company,
+            bank_account_id=bank_account_id,
+            file_name="statement.csv",
+            blob=store_blob(
+                [
+                    "date,description,amount,reference\n",
+                    "2026-02-01,Deposit,50.00,REF1\n",
+                    "2026-02-02,Fee,-5.00,REF2\n",
+                    "2026-02-03,Card,-12.50,REF3\n",
+                    "2026-02-30,Broken,1.00,REF4\n",
+                    "2026-02-05,Deposit,80.00,REF5",
+                ]
+            ),
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            created = parse_statement_import(statement_import=statement_import, chunk_size=2)
+
+        inserts = [
+            query
+            for query in queries.captured_queries
+            if query["sql"].startswith("INSERT") and 'INTO "bank_transaction"' in query["sql"]
+        ]
+        self.assertEqual(created, 4)
+        self.assertEqual(len(inserts), 3)
+        statement_import.refresh_from_db()
+        self.assertEqual(statement_import.status, "parsed")
+        self.assertEqual(
+            (statement_import.rows_processed, statement_import.transactions_created, statement_import.rows_failed),
+            (5, 4, 1),
+        )
+        self.assertEqual(statement_import.row_errors[0]["row"], 5)
+
+    def test_statement_amounts_outside_ledger_precision_are_row_errors(self):
+        bank_account_id = self._create_bank_account()
+        statement_import = BankStatementImport.objects.create(
+            company=self.company,
+            bank_account_id=bank_account_id,
+            file_name="statement.csv",
+            blob=store_blob(
+                [
+                    "date,description,amount,reference\n",
+                    "2026-02-01,Deposit,50.00,REF1\n",
+                    "2026-02-02,Huge,1e30,REF2\n",
+                    "2026-02-03,Long,123456789012345678,REF3\n",
+                    "2026-02-04,Sub-cent,0.00001,REF4\n",
+                    "2026-02-05,Zero,0.0000,REF5\n",
+                    "2026-02-06,Not a number,NaN,REF6",
+                ]
+            ),
+        )
+
+        created = parse_statement_import(statement_import=statement_import)
+
+        self.assertEqual(created, 1)
+        statement_import.refresh_from_db()
+        self.assertEqual(statement_import.status, "parsed")
+        self.assertEqual([error["row"] for error in statement_import.row_errors], [3, 4, 5, 6, 7])
+        self.assertEqual(BankTransaction.objects.get(statement_import=statement_import).amount, Decimal("50.0000"))
+
+    def test_overlapping_statement_skips_fingerprinted_duplicates(self):
+        bank_account_id = self._create_bank_account()
+        url = f"/api/v1/banking/companies/{self.company.id}/imports/"
+        first = self.client.post(
+            url,
+            {
+                "bank_account": bank_account_id,
+                "file_name": "feb-1.csv",
+                "raw_content": "date,description,amount,reference\n"
+                "2026-02-10,Card fee,-5.00,\n2026-02-10,Card fee,-5.00,\n2026-02-11,Deposit,50.00,REF1",
+            },
+            format="json",
+        )
+        self.assertEqual(first.data["transactions_created"], 3)
+
+        second = self.client.post(
+            url,
+            {
+                "bank_account": bank_account_id,
+                "file_name": "feb-2.csv",
+                "raw_content": "date,description,amount,reference\n"
+                "2026-02-10,CARD  FEE,-5.00,\n2026-02-10,Card fee,-5.00,\n2026-02-10,Card fee,-5.00,\n"
+                "2026-02-11,Deposit (online),50.00,ref1\n2026-02-12,Deposit,20.00,REF2",
+            },
+            format="json",
+        )
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((second.data["transactions_created"], second.data["duplicates_skipped"]), (2, 3))
+        self.assertEqual(BankTransaction.objects.filter(bank_account_id=bank_account_id).count(), 5)
+
+    def test_statement_formats_feed_the_same_import_pipeline(self):
+        bank_account_id = self._create_bank_account()
+        url = f"/api/v1/banking/companies/{self.company.id}/imports/"
+        camt = (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Document xmlns="urn:iso:std:iso:20022:tech:xsd:camt.053.001.02"><BkToCstmrStmt><Stmt>'
+            '<Ntry><NtryRef>N1</NtryRef><Amt Ccy="USD">50.00</Amt><CdtDbtInd>CRDT</CdtDbtInd>'
+            "<BookgDt><Dt>2026-02-20</Dt></BookgDt><NtryDtls><TxDtls><RltdPties><Dbtr><Nm>Acme Corp</Nm></Dbtr>"
+            "</RltdPties><RmtInf><Ustrd>INV 1001</Ustrd></RmtInf></TxDtls></NtryDtls></Ntry>"
+            '<Ntry><Amt Ccy="USD">5.00</Amt><CdtDbtInd>DBIT</CdtDbtInd><BookgDt><Dt>2026-02-21</Dt></BookgDt>'
+            "<AddtlNtryInf>Account fee</AddtlNtryInf></Ntry>"
+            "</Stmt></BkToCstmrStmt></Document>"
+        )
+        camt_response = self.client.post(
+            url,
+            {"bank_account": bank_account_id, "file": SimpleUploadedFile("statement.xml", camt.encode())},
+            format="multipart",
+        )
+        self.assertEqual(camt_response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((camt_response.data["file_format"], camt_response.data["transactions_created"]), ("camt053", 2))
+
+        mt940 = "\n".join(
+            [
+                ":20:STMT1",
+                ":25:12345678",
+                ":60F:C260221USD45,00",
+                ":61:2602220222C20,00NTRFINV1002//B1",
+                ":86:?20Globex?21Invoice 1002",
+                ":61:260223D7,50NCHGNONREF//B2",
+                ":62F:C260223USD57,50",
+                "-",
+            ]
+        )
+        mt940_response = self.client.post(
+            url,
+            {"bank_account": bank_account_id, "file_name": "statement.sta", "raw_content": mt940},
+            format="json",
+        )
+        self.assertEqual(mt940_response.data["file_format"], "mt940")
+        self.assertEqual(
+            list(
+                BankTransaction.objects.filter(bank_account_id=bank_account_id)
+                .order_by("txn_date")
+                .values_list("amount", "reference", "description")
+            ),
+            [
+                (Decimal("50.0000"), "N1", "Acme Corp - INV 1001"),
+                (Decimal("-5.0000"), "", "Account fee"),
+                (Decimal("20.0000"), "INV1002", "Globex Invoice 1002"),
+                (Decimal("-7.5000"), "B2", ""),
+            ],
+        )
+
+        # A malformed :61: line is reported as a row error; the rest of the statement still imports.
+        broken = mt940.replace(":61:2602220222C20,00NTRFINV1002//B1", ":61:26022X")
+        broken = broken.replace("D7,50NCHGNONREF//B2", "D9,25NCHGNONREF//B3")
+        broken_response = self.client.post(
+            url,
+            {"bank_account": bank_account_id, "file_name": "statement.sta", "raw_content": broken},
+            format="json",
+        )
+        self.assertEqual(broken_response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((broken_response.data["transactions_created"], broken_response.data["rows_failed"]), (1, 1))
+        self.assertEqual(broken_response.data["row_errors"], [{"row": 1, "detail": "Invalid :61: statement line '26022X'."}])
+
+    def test_background_import_without_workers_waits_for_processing_command(self):
+        bank_account_id = self._create_bank_account()
+        upload = SimpleUploadedFile("statement.csv", b"date,description,amount,reference\n2026-02-20,Deposit,50.00,REF1\n")
+
+        with self.settings(BANK_IMPORT_WORKERS=0), self.captureOnCommitCallbacks(execute=True) as callbacks:
+            response = self.client.post(
+                f"/api/v1/banking/companies/{self.company.id}/imports/",
+                {"bank_account": bank_account_id, "file": upload, "background": True},
+                format="multipart",
+            )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual((response.data["status"], response.data["transactions_created"]), ("uploaded", 0))
+        self.assertEqual(callbacks, [])
+        self.assertFalse(BankTransaction.objects.exists())
+        detail_url = f"/api/v1/banking/companies/{self.company.id}/imports/{response.data['id']}/"
+        self.assertEqual(self.client.get(detail_url).data["status"], "uploaded")
+
+        # What process_statement_imports runs for each waiting import.
+        self.assertTrue(run_statement_import(response.data["id"]))
+        detail = self.client.get(detail_url)
+        self.assertEqual((detail.data["status"], detail.data["transactions_created"]), ("parsed", 1))
+        self.assertFalse(run_statement_import(response.data["id"]))
 
     def test_csv_import_rejects_missing_columns(self):
         bank_account_id = self._create_bank_account()
@@ -139,7 +402,7 @@ class BankingApiTests(APITestCase):
             format="json",
         )
         tx_list = self.client.get(f"/api/v1/banking/companies/{self.company.id}/transactions/")
-        transaction_id = tx_list.data[0]["id"]
+        transaction_id = tx_list.data["results"][0]["id"]
 
         entry = self._create_posted_journal()
         match_res = self.client.post(
@@ -180,7 +443,187 @@ class BankingApiTests(APITestCase):
         self.assertEqual(finalize_res.data["status"], "finalized")
 
         tx_after = self.client.get(f"/api/v1/banking/companies/{self.company.id}/transactions/")
-        self.assertEqual(tx_after.data[0]["status"], "reconciled")
+        self.assertEqual(tx_after.data["results"][0]["status"], "reconciled")
+
+    def test_auto_match_pairs_lines_by_amount_date_and_reference(self):
+        bank_account_id = self._create_bank_account()
+        self.client.post(
+            f"/api/v1/banking/companies/{self.company.id}/imports/",
+            {
+                "bank_account": bank_account_id,
+                "file_name": "statement.csv",
+                "raw_content": "date,description,amount,reference\n"
+                "2026-02-21,Customer payment,50.00,INV-1001\n2026-02-25,Cash deposit,50.00,\n2026-02-26,Fee,-5.00,",
+            },
+            format="json",
+        )
+
+        deposit = self._post_cash_receipt("2026-02-24", "50.00", "Deposit")
+        receipt = self._post_cash_receipt("2026-02-21", "50.00", "Receipt INV-1001 Acme")
+        url = f"/api/v1/banking/companies/{self.company.id}/bank-accounts/{bank_account_id}/auto-match/"
+
+        preview = self.client.post(url, {}, format="json")
+        self.assertEqual(preview.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row["journal_entry_id"], row["amount"]) for row in preview.data["matches"]],
+            [(str(receipt.id), "50.0000"), (str(deposit.id), "50.0000")],
+        )
+        self.assertEqual(BankTransaction.objects.filter(status="matched").count(), 0)
+
+        applied = self.client.post(url, {"apply": True}, format="json")
+        self.assertEqual(applied.data["match_count"], 2)
+        self.assertEqual(
+            set(BankTransaction.objects.filter(status="matched").values_list("matched_journal_entry_id", flat=True)),
+            {receipt.id, deposit.id},
+        )
+        self.assertEqual(self.client.post(url, {"apply": True}, format="json").data["match_count"], 0)
+
+    def test_bank_rules_post_matching_lines_in_one_batch(self):
+        bank_account_id = self._create_bank_account()
+        fees_account = Account.objects.create(
+            company=self.company, code="6100", name="Bank Fees", type="expense", normal_balance="debit"
+        )
+        self.client.post(
+            f"/api/v1/banking/companies/{self.company.id}/imports/",
+            {
+                "bank_account": bank_account_id,
+                "file_name": "statement.csv",
+                "raw_content": "date,description,amount,reference\n"
+                "2026-03-01,Monthly service fee,-12.50,\n2026-03-02,Card settlement ACME PAY,240.00,ST-77\n"
+                "2026-03-03,Wire fee,-250.00,\n2026-03-04,Customer payment,80.00,INV-9",
+            },
+            format="json",
+        )
+        rules_url = f"/api/v1/banking/companies/{self.company.id}/bank-rules/"
+        invalid = self.client.post(
+            rules_url,
+            {"name": "Broken", "description_pattern": "fee(", "target_account": str(fees_account.id)},
+            format="json",
+        )
+        self.assertEqual(invalid.status_code, status.HTTP_400_BAD_REQUEST)
+        for pattern in (r"(a+)+$", r"(fee|charge)*x", r"(\w+)\1", r".*.*.*fee", r"(a?){28}a{28}", r"a?a?a?fee"):
+            backtracking = self.client.post(
+                rules_url,
+                {"name": "Backtracking", "description_pattern": pattern, "target_account": str(fees_account.id)},
+                format="json",
+            )
+            self.assertEqual(backtracking.status_code, status.HTTP_400_BAD_REQUEST, pattern)
+        fee_rule = self.client.post(
+            rules_url,
+            {
+                "name": "Bank fees",
+                "description_pattern": r"\bfee\b",
+                "direction": "outflow",
+                "max_amount": "50.00",
+                "target_account": str(fees_account.id),
+            },
+            format="json",
+        )
+        self.assertEqual(fee_rule.status_code, status.HTTP_201_CREATED)
+        self.client.post(
+            rules_url,
+            {"name": "Card settlements", "counterparty": "Acme Pay", "target_account": str(self.revenue_account.id)},
+            format="json",
+        )
+
+        apply_url = f"{rules_url}apply/"
+        preview = self.client.post(apply_url, {"dry_run": True}, format="json")
+        self.assertEqual(
+            [(row["description"], row["rule_name"], row["amount"]) for row in preview.data["matches"]],
+            [("Monthly service fee", "Bank fees", "-12.5000"), ("Card settlement ACME PAY", "Card settlements", "240.0000")],
+        )
+        self.assertFalse(JournalEntry.objects.filter(reference_type="bank_transaction").exists())
+
+        applied = self.client.post(apply_url, {}, format="json")
+        self.assertEqual(applied.status_code, status.HTTP_200_OK)
+        self.assertEqual(applied.data["match_count"], 2)
+        entry_nos = [row["entry_no"] for row in applied.data["matches"]]
+        self.assertEqual(entry_nos[1], entry_nos[0] + 1)
+        fee_txn = BankTransaction.objects.get(description="Monthly service fee")
+        self.assertEqual(fee_txn.status, "matched")
+        self.assertEqual(str(fee_txn.rule_id), fee_rule.data["id"])
+        self.assertEqual(
+            sorted(fee_txn.matched_journal_entry.lines.values_list("account_id", "debit", "credit")),
+            sorted([(fees_account.id, Decimal("12.5000"), Decimal("0")), (self.cash_account.id, Decimal("0"), Decimal("12.5000"))]),
+        )
+        self.assertEqual(self.client.post(apply_url, {}, format="json").data["match_count"], 0)
+
+    def test_suggestions_find_receipts_summing_to_a_deposit(self):
+        bank_account_id = self._create_bank_account()
+        self.client.post(
+            f"/api/v1/banking/companies/{self.company.id}/imports/",
+            {
+                "bank_account": bank_account_id,
+                "file_name": "statement.csv",
+                "raw_content": "date,description,amount,reference\n2026-02-20,Batched deposit,120.00,",
+            },
+            format="json",
+        )
+        transaction_id = BankTransaction.objects.get(bank_account_id=bank_account_id).id
+        receipts = {
+            amount: self._post_cash_receipt(entry_date, amount, "Receipt")
+            for entry_date, amount in (
+                ("2026-02-18", "50.00"),
+                ("2026-02-19", "70.00"),
+                ("2026-02-17", "30.00"),
+                ("2026-02-16", "40.00"),
+                ("2026-02-19", "200.00"),
+            )
+        }
+
+        response = self.client.get(f"/api/v1/banking/companies/{self.company.id}/transactions/{transaction_id}/suggestions/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data["complete"])
+        self.assertEqual(
+            [{entry["journal_entry_id"] for entry in suggestion["entries"]} for suggestion in response.data["suggestions"]],
+            [
+                {str(receipts["50.00"].id), str(receipts["70.00"].id)},
+                {str(receipts["50.00"].id), str(receipts["30.00"].id), str(receipts["40.00"].id)},
+            ],
+        )
+        self.assertEqual(response.data["suggestions"][0]["total"], "120.0000")
+
+    def test_reconciliation_summary_and_finalize_require_zero_difference(self):
+        bank_account_id = self._create_bank_account()
+        self.client.post(
+            f"/api/v1/banking/companies/{self.company.id}/imports/",
+            {
+                "bank_account": bank_account_id,
+                "file_name": "statement.csv",
+                "raw_content": "date,description,amount,reference\n"
+                "2026-02-20,Deposit,50.00,REF1\n2026-02-21,Fee,-5.00,REF2\n2026-02-22,Card,-12.00,REF3",
+            },
+            format="json",
+        )
+        self._post_cash_receipt("2026-02-20", "50.00", "Deposit")
+        transactions = {txn.reference: str(txn.id) for txn in BankTransaction.objects.filter(bank_account_id=bank_account_id)}
+        reconciliation_id = self.client.post(
+            f"/api/v1/banking/companies/{self.company.id}/reconciliations/",
+            {
+                "bank_account": bank_account_id,
+                "start_date": "2026-02-01",
+                "end_date": "2026-02-28",
+                "opening_balance": "100.00",
+                "closing_balance": "145.00",
+            },
+            format="json",
+        ).data["id"]
+        base = f"/api/v1/banking/companies/{self.company.id}/reconciliations/{reconciliation_id}/"
+        self.client.put(f"{base}lines/", {"transaction_ids": [transactions["REF1"]]}, format="json")
+
+        summary = self.client.get(base).data["summary"]
+        self.assertEqual(
+            (summary["cleared_total"], summary["uncleared_total"], summary["ledger_balance"], summary["difference"]),
+            ("50.0000", "-17.0000", "50.0000", "-5.0000"),
+        )
+        rejected = self.client.post(f"{base}finalize/", {}, format="json")
+        self.assertEqual(rejected.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("out of balance", rejected.data["error"]["message"])
+
+        self.client.put(f"{base}lines/", {"transaction_ids": [transactions["REF1"], transactions["REF2"]]}, format="json")
+        self.assertEqual(self.client.get(base).data["summary"]["difference"], "0.0000")
+        self.assertEqual(self.client.post(f"{base}finalize/", {}, format="json").status_code, status.HTTP_200_OK)
+        self.assertEqual(BankTransaction.objects.filter(status="reconciled").count(), 2)
 
     def test_cross_tenant_banking_access_denied(self):
         bank_account_id = self._create_bank_account()
@@ -3,12 +3,19 @@ from django.urls import path
 from apps.banking.views import (
     BankAccountDetailUpdateView,
     BankAccountListCreateView,
+    BankAutoMatchView,
     BankReconciliationDetailView,
     BankReconciliationFinalizeView,
     BankReconciliationLinesReplaceView,
     BankReconciliationListCreateView,
+    BankRuleApplyView,
+    BankRuleDetailView,
+    BankRuleListCreateView,
+    BankStatementImportDetailView,
+    BankStatementImportFileView,
     BankStatementImportListCreateView,
     BankTransactionListView,
+    BankTransactionMatchSuggestionsView,
     BankTransactionMatchView,
 )
 
@@ -19,13 +26,40 @@ urlpatterns = [
         BankAccountDetailUpdateView.as_view(),
         name="bank_account_detail",
     ),
+    path(
+        "companies/<uuid:company_id>/bank-accounts/<uuid:bank_account_id>/auto-match/",
+        BankAutoMatchView.as_view(),
+        name="bank_auto_match",
+    ),
+    path("companies/<uuid:company_id>/bank-rules/", BankRuleListCreateView.as_view(), name="bank_rule_list_create"),
+    path("companies/<uuid:company_id>/bank-rules/apply/", BankRuleApplyView.as_view(), name="bank_rule_apply"),
+    path(
+        "companies/<uuid:company_id>/bank-rules/<uuid:rule_id>/",
+        BankRuleDetailView.as_view(),
+        name="bank_rule_detail",
+    ),
     path("companies/<uuid:company_id>/imports/", BankStatementImportListCreateView.as_view(), name="bank_imports"),
+    path(
+        "companies/<uuid:company_id>/imports/<uuid:import_id>/",
+        BankStatementImportDetailView.as_view(),
+        name="bank_import_detail",
+    ),
+    path(
+        "companies/<uuid:company_id>/imports/<uuid:import_id>/file/",
+        BankStatementImportFileView.as_view(),
+        name="bank_import_file",
+    ),
     path("companies/<uuid:company_id>/transactions/", BankTransactionListView.as_view(), name="bank_transactions"),
     path(
         "companies/<uuid:company_id>/transactions/<uuid:transaction_id>/match/",
         BankTransactionMatchView.as_view(),
         name="bank_transaction_match",
     ),
+    path(
+        "companies/<uuid:company_id>/transactions/<uuid:transaction_id>/suggestions/",
+        BankTransactionMatchSuggestionsView.as_view(),
+        name="bank_transaction_match_suggestions",
+    ),
     path(
         "companies/<uuid:company_id>/reconciliations/",
         BankReconciliationListCreateView.as_view(),
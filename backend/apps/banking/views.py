@@ -1,25 +1,41 @@
+from django.http import StreamingHttpResponse
+from django.utils.http import content_disposition_header
 from rest_framework import generics, permissions, response, status, views
+from rest_framework.utils.urls import replace_query_param
 
 from apps.audit.services import log_audit_event
-from apps.banking.models import BankReconciliation, BankStatementImport, BankTransaction
+from apps.banking.matching import apply_matches, propose_matches, suggest_combinations
+from apps.banking.models import BankReconciliation, BankRule, BankStatementImport, BankTransaction
+from apps.banking.rules import apply_bank_rules, invalidate_rule_set
 from apps.banking.serializers import (
+    AutoMatchSerializer,
     BankAccountSerializer,
     BankReconciliationSerializer,
+    BankRuleApplySerializer,
+    BankRuleSerializer,
     BankStatementImportSerializer,
     BankTransactionSerializer,
+    MatchSuggestionQuerySerializer,
     ReconciliationLinesReplaceSerializer,
     TransactionMatchSerializer,
 )
 from apps.banking.services import (
     BankingValidationError,
     finalize_reconciliation,
+    format_money,
     match_bank_transaction,
     parse_statement_import,
+    reconciliation_summary,
     replace_reconciliation_lines,
 )
+from apps.banking.workers import enqueue_statement_import
+from apps.common.pagination import KeysetCursorError, paginate_keyset
 from apps.common.tenant import get_company_for_user_or_404, user_has_permission_in_company
+from apps.documents.blobs import iter_blob_chunks
 from apps.rbac.constants import PERMISSION_ACCOUNTING_POST, PERMISSION_ACCOUNTING_VIEW
 
+TRANSACTION_LIST_KEYSET = ("txn_date", "created_at", "id")
+
 
 class BankAccountListCreateView(generics.ListCreateAPIView):
     serializer_class = BankAccountSerializer
@@ -123,7 +139,7 @@ class BankStatementImportListCreateView(generics.ListCreateAPIView):
 
     def get_queryset(self):
         company = self._company()
-        queryset = BankStatementImport.objects.filter(company=company).select_related("bank_account")
+        queryset = BankStatementImport.objects.filter(company=company).select_related("bank_account", "blob")
         status_filter = self.request.query_params.get("status")
         if status_filter:
             queryset = queryset.filter(status=status_filter)
@@ -150,16 +166,64 @@ class BankStatementImportListCreateView(generics.ListCreateAPIView):
 
         serializer = self.get_serializer(data=request.data, context={"company": company})
         serializer.is_valid(raise_exception=True)
+        background = serializer.validated_data["background"]
         statement_import = serializer.save(company=company, imported_by_user=request.user)
+        if background:
+            enqueue_statement_import(statement_import)
+            return response.Response(self.get_serializer(statement_import).data, status=status.HTTP_202_ACCEPTED)
+
         try:
-            created_count = parse_statement_import(statement_import=statement_import)
+            parse_statement_import(statement_import=statement_import)
         except BankingValidationError as exc:
             return response.Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return response.Response(self.get_serializer(statement_import).data, status=status.HTTP_201_CREATED)
+
 
-        output = self.get_serializer(statement_import)
-        payload = output.data
-        payload["transactions_created"] = created_count
-        return response.Response(payload, status=status.HTTP_201_CREATED)
+class BankStatementImportDetailView(generics.RetrieveAPIView):
+    serializer_class = BankStatementImportSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_object(self):
+        company = get_company_for_user_or_404(user=self.request.user, company_id=self.kwargs["company_id"])
+        return generics.get_object_or_404(BankStatementImport, company=company, id=self.kwargs["import_id"])
+
+    def retrieve(self, request, *args, **kwargs):
+        company = get_company_for_user_or_404(user=request.user, company_id=self.kwargs["company_id"])
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_VIEW,
+        ):
+            return response.Response({"detail": "Insufficient permission."}, status=status.HTTP_403_FORBIDDEN)
+        return super().retrieve(request, *args, **kwargs)
+
+
+class BankStatementImportFileView(views.APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, company_id, import_id):
+        company = get_company_for_user_or_404(user=request.user, company_id=company_id)
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_VIEW,
+        ):
+            return response.Response({"detail": "Insufficient permission."}, status=status.HTTP_403_FORBIDDEN)
+        statement_import = generics.get_object_or_404(
+            BankStatementImport.objects.select_related("blob"),
+            company=company,
+            id=import_id,
+        )
+        if statement_import.blob is None:
+            return response.Response({"detail": "Statement file is not available."}, status=status.HTTP_404_NOT_FOUND)
+
+        streamed = StreamingHttpResponse(
+            iter_blob_chunks(statement_import.blob),
+            content_type=statement_import.blob.content_type or "application/octet-stream",
+        )
+        streamed["Content-Length"] = str(statement_import.blob.size)
+        streamed["Content-Disposition"] = content_disposition_header(True, statement_import.file_name)
+        return streamed
 
 
 class BankTransactionListView(views.APIView):
@@ -196,8 +260,22 @@ class BankTransactionListView(views.APIView):
             except ValueError:
                 return response.Response({"detail": "limit must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
 
-        serializer = BankTransactionSerializer(queryset[:limit], many=True)
-        return response.Response(serializer.data)
+        try:
+            rows, next_cursor = paginate_keyset(
+                queryset,
+                fields=TRANSACTION_LIST_KEYSET,
+                cursor=request.query_params.get("cursor"),
+                limit=limit,
+            )
+        except KeysetCursorError as exc:
+            return response.Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return response.Response(
+            {
+                "next": replace_query_param(request.build_absolute_uri(), "cursor", next_cursor) if next_cursor else None,
+                "next_cursor": next_cursor,
+                "results": BankTransactionSerializer(rows, many=True).data,
+            }
+        )
 
 
 class BankTransactionMatchView(views.APIView):
@@ -234,6 +312,257 @@ class BankTransactionMatchView(views.APIView):
         return response.Response(BankTransactionSerializer(matched).data)
 
 
+class BankTransactionMatchSuggestionsView(views.APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, company_id, transaction_id):
+        company = get_company_for_user_or_404(user=request.user, company_id=company_id)
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_VIEW,
+        ):
+            return response.Response({"detail": "Insufficient permission."}, status=status.HTTP_403_FORBIDDEN)
+
+        transaction_obj = generics.get_object_or_404(
+            BankTransaction.objects.select_related("bank_account"),
+            company=company,
+            id=transaction_id,
+        )
+        serializer = MatchSuggestionQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        combinations, complete = suggest_combinations(
+            bank_transaction=transaction_obj,
+            date_window_days=serializer.validated_data["date_window_days"],
+            max_results=serializer.validated_data["limit"],
+        )
+        suggestions = [
+            {
+                "total": format_money(sum(candidate.amount for candidate in combination)),
+                "entries": [
+                    {
+                        "journal_entry_id": str(candidate.journal_entry_id),
+                        "entry_no": candidate.entry_no,
+                        "entry_date": candidate.entry_date,
+                        "amount": format_money(candidate.amount),
+                    }
+                    for candidate in combination
+                ],
+            }
+            for combination in combinations
+        ]
+        return response.Response(
+            {
+                "transaction_id": str(transaction_obj.id),
+                "amount": format_money(transaction_obj.amount),
+                "complete": complete,
+                "suggestions": suggestions,
+            }
+        )
+
+
+class BankAutoMatchView(views.APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, company_id, bank_account_id):
+        company = get_company_for_user_or_404(user=request.user, company_id=company_id)
+        serializer = AutoMatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        apply = serializer.validated_data["apply"]
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_POST if apply else PERMISSION_ACCOUNTING_VIEW,
+        ):
+            return response.Response({"detail": "Insufficient permission."}, status=status.HTTP_403_FORBIDDEN)
+
+        bank_account = generics.get_object_or_404(company.bank_accounts.all(), id=bank_account_id)
+        proposals = propose_matches(
+            bank_account=bank_account,
+            date_window_days=serializer.validated_data["date_window_days"],
+            min_score=serializer.validated_data["min_score"],
+        )
+        if apply:
+            proposals = apply_matches(proposals=proposals)
+            if proposals:
+                log_audit_event(
+                    company=company,
+                    actor_user=request.user,
+                    action="bank_transaction.auto_match",
+                    entity_type="bank_account",
+                    entity_id=bank_account.id,
+                    metadata={"matched_count": len(proposals)},
+                    ip_address=request.META.get("REMOTE_ADDR"),
+                    user_agent=request.headers.get("User-Agent", ""),
+                )
+
+        matches = [
+            {
+                "transaction_id": str(proposal.bank_transaction.id),
+                "txn_date": proposal.bank_transaction.txn_date,
+                "amount": format_money(proposal.bank_transaction.amount),
+                "journal_entry_id": str(proposal.candidate.journal_entry_id),
+                "entry_no": proposal.candidate.entry_no,
+                "entry_date": proposal.candidate.entry_date,
+                "score": proposal.score,
+            }
+            for proposal in proposals
+        ]
+        return response.Response({"applied": apply, "match_count": len(matches), "matches": matches})
+
+
+class BankRuleListCreateView(generics.ListCreateAPIView):
+    serializer_class = BankRuleSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def _company(self):
+        return get_company_for_user_or_404(user=self.request.user, company_id=self.kwargs["company_id"])
+
+    def get_queryset(self):
+        company = self._company()
+        return BankRule.objects.filter(company=company)
+
+    def list(self, request, *args, **kwargs):
+        company = self._company()
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_VIEW,
+        ):
+            return response.Response({"detail": "Insufficient permission."}, status=status.HTTP_403_FORBIDDEN)
+        return super().list(request, *args, **kwargs)
+
+    def create(self, request, *args, **kwargs):
+        company = self._company()
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_POST,
+        ):
+            return response.Response({"detail": "Insufficient permission."}, status=status.HTTP_403_FORBIDDEN)
+        serializer = self.get_serializer(data=request.data, context={"company": company})
+        serializer.is_valid(raise_exception=True)
+        serializer.save(company=company)
+        invalidate_rule_set(company)
+        return response.Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class BankRuleDetailView(generics.RetrieveUpdateDestroyAPIView):
+    serializer_class = BankRuleSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def _company(self):
+        return get_company_for_user_or_404(user=self.request.user, company_id=self.kwargs["company_id"])
+
+    def get_object(self):
+        company = self._company()
+        return generics.get_object_or_404(BankRule, company=company, id=self.kwargs["rule_id"])
+
+    def retrieve(self, request, *args, **kwargs):
+        company = self._company()
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_VIEW,
+        ):
+            return response.Response({"detail": "Insufficient permission."}, status=status.HTTP_403_FORBIDDEN)
+        return super().retrieve(request, *args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        company = self._company()
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_POST,
+        ):
+            return response.Response({"detail": "Insufficient permission."}, status=status.HTTP_403_FORBIDDEN)
+        instance = self.get_object()
+        serializer = self.get_serializer(
+            instance,
+            data=request.data,
+            partial=kwargs.get("partial", False),
+            context={"company": company},
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        invalidate_rule_set(company)
+        return response.Response(serializer.data)
+
+    def destroy(self, request, *args, **kwargs):
+        company = self._company()
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_POST,
+        ):
+            return response.Response({"detail": "Insufficient permission."}, status=status.HTTP_403_FORBIDDEN)
+        self.get_object().delete()
+        invalidate_rule_set(company)
+        return response.Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class BankRuleApplyView(views.APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, company_id):
+        company = get_company_for_user_or_404(user=request.user, company_id=company_id)
+        serializer = BankRuleApplySerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        dry_run = serializer.validated_data["dry_run"]
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_VIEW if dry_run else PERMISSION_ACCOUNTING_POST,
+        ):
+            return response.Response({"detail": "Insufficient permission."}, status=status.HTTP_403_FORBIDDEN)
+
+        bank_account = None
+        if serializer.validated_data.get("bank_account_id"):
+            bank_account = generics.get_object_or_404(company.bank_accounts.all(), id=serializer.validated_data["bank_account_id"])
+        try:
+            matches = apply_bank_rules(
+                company=company,
+                actor_user=request.user,
+                bank_account=bank_account,
+                date_from=serializer.validated_data.get("date_from"),
+                date_to=serializer.validated_data.get("date_to"),
+                dry_run=dry_run,
+            )
+        except BankingValidationError as exc:
+            return response.Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if matches and not dry_run:
+            log_audit_event(
+                company=company,
+                actor_user=request.user,
+                action="bank_rule.apply",
+                entity_type="company",
+                entity_id=company.id,
+                metadata={
+                    "posted_count": len(matches),
+                    "bank_account_id": str(bank_account.id) if bank_account else None,
+                },
+                ip_address=request.META.get("REMOTE_ADDR"),
+                user_agent=request.headers.get("User-Agent", ""),
+            )
+
+        results = [
+            {
+                "transaction_id": str(match.bank_transaction.id),
+                "txn_date": match.bank_transaction.txn_date,
+                "amount": format_money(match.bank_transaction.amount),
+                "description": match.bank_transaction.description,
+                "rule_id": str(match.rule.id),
+                "rule_name": match.rule.name,
+                "target_account_id": str(match.rule.target_account_id),
+                "journal_entry_id": str(match.journal_entry.id) if match.journal_entry else None,
+                "entry_no": match.journal_entry.entry_no if match.journal_entry else None,
+            }
+            for match in matches
+        ]
+        return response.Response({"dry_run": dry_run, "match_count": len(results), "matches": results})
+
+
 class BankReconciliationListCreateView(generics.ListCreateAPIView):
     serializer_class = BankReconciliationSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -275,7 +604,11 @@ class BankReconciliationDetailView(generics.RetrieveAPIView):
 
     def get_object(self):
         company = get_company_for_user_or_404(user=self.request.user, company_id=self.kwargs["company_id"])
-        return generics.get_object_or_404(BankReconciliation, company=company, id=self.kwargs["reconciliation_id"])
+        return generics.get_object_or_404(
+            BankReconciliation.objects.select_related("bank_account"),
+            company=company,
+            id=self.kwargs["reconciliation_id"],
+        )
 
     def retrieve(self, request, *args, **kwargs):
         company = get_company_for_user_or_404(user=request.user, company_id=self.kwargs["company_id"])
@@ -294,6 +627,7 @@ class BankReconciliationDetailView(generics.RetrieveAPIView):
             }
             for line in reconciliation.lines.all()
         ]
+        payload["summary"] = reconciliation_summary(reconciliation)
         return response.Response(payload)
 
 
@@ -0,0 +1,70 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from apps.banking.models import BankImportStatus, BankStatementImport
+from apps.banking.services import BankingValidationError, parse_statement_import
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _claim(import_id):
+    claimed = BankStatementImport.objects.filter(id=import_id, status=BankImportStatus.UPLOADED).update(
+        status=BankImportStatus.PROCESSING,
+        updated_at=timezone.now(),
+    )
+    return bool(claimed)
+
+
+def run_statement_import(import_id):
+    """Parse one uploaded import; returns False if another worker already took it."""
+    if not _claim(import_id):
+        return False
+    statement_import = BankStatementImport.objects.select_related("blob").get(id=import_id)
+    try:
+        parse_statement_import(statement_import=statement_import)
+    except BankingValidationError:
+        pass
+    except Exception as exc:
+        logger.exception("Statement import %s failed", import_id)
+        BankStatementImport.objects.filter(id=import_id).update(
+            status=BankImportStatus.FAILED,
+            error_message=f"Import failed: {exc}",
+            updated_at=timezone.now(),
+        )
+    return True
+
+
+def _run_in_worker(import_id):
+    close_old_connections()
+    try:
+        run_statement_import(import_id)
+    finally:
+        connection.close()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.BANK_IMPORT_WORKERS, thread_name_prefix="bank-import")
+        return _executor
+
+
+def enqueue_statement_import(statement_import):
+    """Hand the import to the local worker pool once the creating transaction commits.
+
+    With BANK_IMPORT_WORKERS = 0 there is no in-process pool: the import stays in ``uploaded``
+    for the process_statement_imports command, which also picks up imports left by a restart.
+    """
+    if settings.BANK_IMPORT_WORKERS <= 0:
+        return
+    import_id = statement_import.id
+    transaction.on_commit(lambda: _get_executor().submit(_run_in_worker, import_id))
@@ -0,0 +1,40 @@
+import threading
+
+from django.db.models import Count, Max
+
+
+class CompanyCompiledCache:
+    """In-process cache of per-company lookup tables compiled from one model's rows.
+
+    Each read runs a cheap count/max(updated_at) aggregate so workers that did not handle a
+    change still rebuild on their next lookup; writers may also call ``invalidate`` directly.
+    """
+
+    def __init__(self, *, model, build):
+        self._model = model
+        self._build = build
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def _version(self, company_id):
+        stats = self._model.objects.filter(company_id=company_id).aggregate(
+            count=Count("id"),
+            last_changed=Max("updated_at"),
+        )
+        return stats["count"], stats["last_changed"]
+
+    def get(self, company):
+        company_id = getattr(company, "id", company)
+        version = self._version(company_id)
+        cached = self._tables.get(company_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        table = self._build(company_id)
+        with self._lock:
+            self._tables[company_id] = (version, table)
+        return table
+
+    def invalidate(self, company) -> None:
+        with self._lock:
+            self._tables.pop(getattr(company, "id", company), None)
@@ -0,0 +1,26 @@
+from decimal import Decimal, InvalidOperation
+
+AMOUNT_MAX_DIGITS = 19
+AMOUNT_DECIMAL_PLACES = 4
+AMOUNT_QUANT = Decimal(1).scaleb(-AMOUNT_DECIMAL_PLACES)
+_INTEGER_DIGITS = AMOUNT_MAX_DIGITS - AMOUNT_DECIMAL_PLACES
+
+
+def check_amount_precision(value: Decimal, *, label: str) -> Decimal:
+    """Return ``value`` at 4 places, or raise ValueError if it does not fit a numeric(19, 4) column."""
+    if not value.is_finite():
+        raise ValueError(f"Invalid {label} '{value}'.")
+    if abs(value) >= Decimal(10) ** _INTEGER_DIGITS:
+        raise ValueError(f"Invalid {label} '{value}': at most {_INTEGER_DIGITS} digits before the decimal point.")
+    quantized = value.quantize(AMOUNT_QUANT)
+    if quantized != value:
+        raise ValueError(f"Invalid {label} '{value}': at most {AMOUNT_DECIMAL_PLACES} decimal places.")
+    return quantized
+
+
+def parse_amount(value, *, label: str) -> Decimal:
+    try:
+        parsed = Decimal(str(value).strip())
+    except (InvalidOperation, ValueError) as exc:
+        raise ValueError(f"Invalid {label} '{value}'.") from exc
+    return check_amount_precision(parsed, label=label)
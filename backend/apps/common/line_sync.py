@@ -0,0 +1,61 @@
+from django.utils import timezone
+
+
+class LineSyncError(ValueError):
+    pass
+
+
+def sync_rows(*, queryset, incoming, key, fields, delete_missing=True, delete_keys=()):
+    """Write ``incoming`` (unsaved instances) over the rows in ``queryset``, matched on ``key``.
+
+    Only rows whose ``fields`` changed are updated, unmatched incoming rows are inserted, and
+    existing rows are deleted when missing from a full replace or listed in ``delete_keys``.
+    Returns the resulting rows ordered by ``key``.
+    """
+    model = queryset.model
+    attnames = [model._meta.get_field(field).attname for field in fields]
+    existing = {getattr(row, key): row for row in queryset}
+
+    seen = set()
+    to_create = []
+    to_update = []
+    for row in incoming:
+        row_key = getattr(row, key)
+        if row_key in seen:
+            raise LineSyncError(f"Duplicate {key} '{row_key}'.")
+        seen.add(row_key)
+        current = existing.get(row_key)
+        if current is None:
+            to_create.append(row)
+            continue
+        changed = False
+        for attname in attnames:
+            value = getattr(row, attname)
+            if getattr(current, attname) != value:
+                setattr(current, attname, value)
+                changed = True
+        if changed:
+            to_update.append(current)
+
+    if delete_missing:
+        deleted_keys = set(existing) - seen
+    else:
+        deleted_keys = set(delete_keys)
+        for row_key in deleted_keys:
+            if row_key in seen:
+                raise LineSyncError(f"{key} '{row_key}' cannot be both updated and deleted.")
+            if row_key not in existing:
+                raise LineSyncError(f"{key} '{row_key}' does not exist.")
+
+    if deleted_keys:
+        model.objects.filter(id__in=[existing[row_key].id for row_key in deleted_keys]).delete()
+    if to_update:
+        now = timezone.now()
+        for row in to_update:
+            row.updated_at = now
+        model.objects.bulk_update(to_update, [*fields, "updated_at"])
+    if to_create:
+        model.objects.bulk_create(to_create)
+
+    rows = [row for row_key, row in existing.items() if row_key not in deleted_keys] + to_create
+    return sorted(rows, key=lambda row: getattr(row, key))
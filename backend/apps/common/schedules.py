@@ -0,0 +1,61 @@
+import calendar
+from datetime import date, timedelta
+
+from django.db import models
+
+
+class RecurrenceFrequency(models.TextChoices):
+    WEEKLY = "weekly", "Weekly"
+    MONTHLY = "monthly", "Monthly"
+    QUARTERLY = "quarterly", "Quarterly"
+    YEARLY = "yearly", "Yearly"
+
+
+_MONTH_STEPS = {
+    RecurrenceFrequency.MONTHLY: 1,
+    RecurrenceFrequency.QUARTERLY: 3,
+    RecurrenceFrequency.YEARLY: 12,
+}
+
+
+def _add_months(value: date, months: int, *, anchor_day: int) -> date:
+    month_index = value.month - 1 + months
+    year = value.year + month_index // 12
+    month = month_index % 12 + 1
+    day = min(anchor_day, calendar.monthrange(year, month)[1])
+    return date(year, month, day)
+
+
+def next_occurrence(value: date, *, frequency: str, anchor_day: int | None = None) -> date:
+    if frequency == RecurrenceFrequency.WEEKLY:
+        return value + timedelta(days=7)
+    months = _MONTH_STEPS.get(frequency)
+    if months is None:
+        raise ValueError(f"Unsupported recurrence frequency '{frequency}'.")
+    return _add_months(value, months, anchor_day=anchor_day or value.day)
+
+
+def iter_due_dates(*, next_run_date: date, as_of: date, frequency: str, anchor_day: int, end_date: date | None = None):
+    current = next_run_date
+    while current <= as_of and (end_date is None or current <= end_date):
+        yield current
+        current = next_occurrence(current, frequency=frequency, anchor_day=anchor_day)
+
+
+def advance_schedule(template, *, as_of: date) -> list[date]:
+    """Return the periods due up to ``as_of`` and move ``template.next_run_date`` past them."""
+    anchor_day = template.start_date.day
+    periods = list(
+        iter_due_dates(
+            next_run_date=template.next_run_date,
+            as_of=as_of,
+            frequency=template.frequency,
+            anchor_day=anchor_day,
+            end_date=template.end_date,
+        )
+    )
+    if periods:
+        template.next_run_date = next_occurrence(periods[-1], frequency=template.frequency, anchor_day=anchor_day)
+    if template.end_date and template.next_run_date > template.end_date:
+        template.is_active = False
+    return periods
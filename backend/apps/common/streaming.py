@@ -0,0 +1,71 @@
+import csv
+import io
+import json
+from itertools import islice
+
+SUPPORTED_RECORD_FORMATS = ("csv", "ndjson")
+
+
+class RecordFormatError(ValueError):
+    pass
+
+
+def detect_record_format(*, file_name: str = "", requested: str = "") -> str:
+    value = (requested or "").strip().lower()
+    if not value:
+        lowered = (file_name or "").lower()
+        if lowered.endswith((".ndjson", ".jsonl")):
+            value = "ndjson"
+        elif lowered.endswith(".csv"):
+            value = "csv"
+    if value not in SUPPORTED_RECORD_FORMATS:
+        raise RecordFormatError("Unsupported file format. Use csv or ndjson.")
+    return value
+
+
+def open_text_stream(binary_file, *, encoding: str = "utf-8-sig"):
+    return io.TextIOWrapper(binary_file, encoding=encoding, newline="")
+
+
+def iter_csv_records(text_stream):
+    reader = csv.DictReader(text_stream)
+    if not reader.fieldnames:
+        raise RecordFormatError("CSV header row is missing.")
+    for row in reader:
+        # DictReader files surplus cells under a ``None`` key; they have no column to map to.
+        record = {key.strip(): (value or "").strip() for key, value in row.items() if key is not None}
+        if not any(record.values()):
+            continue
+        yield reader.line_num, record
+
+
+def iter_ndjson_records(text_stream):
+    # Malformed lines are yielded as ``None`` so callers can report them per row and keep going.
+    for row_no, raw_line in enumerate(text_stream, start=1):
+        line = raw_line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            record = None
+        if record is not None and not isinstance(record, dict):
+            record = None
+        yield row_no, record
+
+
+def iter_records(text_stream, *, record_format: str):
+    if record_format == "csv":
+        return iter_csv_records(text_stream)
+    if record_format == "ndjson":
+        return iter_ndjson_records(text_stream)
+    raise RecordFormatError("Unsupported file format. Use csv or ndjson.")
+
+
+def chunked(iterable, size: int):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
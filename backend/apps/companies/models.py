@@ -18,6 +18,13 @@ class Company(TimeStampedUUIDModel):
         validators=[MinValueValidator(1), MaxValueValidator(12)],
     )
     is_active = models.BooleanField(default=True)
+    fx_gain_loss_account = models.ForeignKey(
+        "accounting.Account",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
 
     class Meta:
         db_table = "company"
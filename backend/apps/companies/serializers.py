@@ -18,11 +18,17 @@ class CompanySerializer(serializers.ModelSerializer):
             "timezone",
             "fiscal_year_start_month",
             "is_active",
+            "fx_gain_loss_account",
             "created_at",
             "updated_at",
         )
         read_only_fields = ("created_at", "updated_at")
 
+    def validate_fx_gain_loss_account(self, value):
+        if value and (self.instance is None or value.company_id != self.instance.id):
+            raise serializers.ValidationError("FX gain/loss account must belong to this company.")
+        return value
+
 
 class CompanyMemberSerializer(serializers.ModelSerializer):
     user_email = serializers.EmailField(source="user.email", read_only=True)
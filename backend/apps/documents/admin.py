@@ -1,3 +1,9 @@
 from django.contrib import admin
 
-# Register your models here.
+from apps.documents.models import StoredBlob
+
+
+@admin.register(StoredBlob)
+class StoredBlobAdmin(admin.ModelAdmin):
+    list_display = ("id", "sha256", "size", "compressed_size", "content_type", "created_at")
+    search_fields = ("sha256",)
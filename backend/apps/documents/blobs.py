@@ -0,0 +1,93 @@
+import gzip
+import hashlib
+import tempfile
+from contextlib import contextmanager
+
+from django.core.files import File
+from django.core.files.storage import storages
+
+from apps.documents.models import BlobCompression, StoredBlob
+
+BLOB_STORAGE_ALIAS = "blobs"
+READ_SIZE = 64 * 1024
+SPOOL_SIZE = 1024 * 1024
+
+
+class BlobStoreError(ValueError):
+    pass
+
+
+def blob_storage():
+    return storages[BLOB_STORAGE_ALIAS]
+
+
+def blob_storage_name(sha256: str) -> str:
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}.gz"
+
+
+def _as_bytes(chunk):
+    return chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+
+
+def write_blob(chunks, *, storage=None):
+    """Gzip ``chunks`` (bytes or str) into storage under their content hash.
+
+    Content is compressed into a spooled temp file while it is hashed, so memory stays flat for
+    large uploads; nothing is written to storage when the hash is already there. Returns
+    ``(sha256, size, compressed_size, storage_name)``.
+    """
+    storage = storage or blob_storage()
+    digest = hashlib.sha256()
+    size = 0
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE) as spool:
+        # mtime=0 keeps the compressed bytes a pure function of the content.
+        with gzip.GzipFile(fileobj=spool, mode="wb", mtime=0) as compressor:
+            for chunk in chunks:
+                data = _as_bytes(chunk)
+                digest.update(data)
+                size += len(data)
+                compressor.write(data)
+        compressed_size = spool.tell()
+        sha256 = digest.hexdigest()
+        name = blob_storage_name(sha256)
+        if not storage.exists(name):
+            spool.seek(0)
+            saved_name = storage.save(name, File(spool, name=name))
+            if saved_name != name:
+                # Another writer stored the same content first; its copy is byte-identical.
+                storage.delete(saved_name)
+    return sha256, size, compressed_size, name
+
+
+def store_blob(chunks, *, content_type="") -> StoredBlob:
+    sha256, size, compressed_size, name = write_blob(chunks)
+    blob, _ = StoredBlob.objects.get_or_create(
+        sha256=sha256,
+        defaults={
+            "size": size,
+            "compressed_size": compressed_size,
+            "compression": BlobCompression.GZIP,
+            "content_type": content_type[:100],
+            "storage_name": name,
+        },
+    )
+    return blob
+
+
+@contextmanager
+def open_blob(blob: StoredBlob):
+    """Binary file object over the uncompressed content, decompressed as it is read."""
+    try:
+        handle = blob_storage().open(blob.storage_name, "rb")
+    except FileNotFoundError as exc:
+        raise BlobStoreError(f"Stored content {blob.sha256} is missing from blob storage.") from exc
+    try:
+        with gzip.GzipFile(fileobj=handle, mode="rb") as stream:
+            yield stream
+    finally:
+        handle.close()
+
+
+def iter_blob_chunks(blob: StoredBlob, *, chunk_size=READ_SIZE):
+    with open_blob(blob) as stream:
+        yield from iter(lambda: stream.read(chunk_size), b"")
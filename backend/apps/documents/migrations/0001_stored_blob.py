@@ -0,0 +1,33 @@
+# Generated by Django 5.2.11 on 2026-10-19 02:35
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredBlob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('size', models.BigIntegerField()),
+                ('compressed_size', models.BigIntegerField()),
+                ('compression', models.CharField(choices=[('gzip', 'gzip')], default='gzip', max_length=10)),
+                ('content_type', models.CharField(blank=True, max_length=100)),
+                ('storage_name', models.CharField(max_length=255)),
+            ],
+            options={
+                'db_table': 'stored_blob',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -1,3 +1,25 @@
 from django.db import models
 
-# Create your models here.
+from apps.common.models import TimeStampedUUIDModel
+
+
+class BlobCompression(models.TextChoices):
+    GZIP = "gzip", "gzip"
+
+
+class StoredBlob(TimeStampedUUIDModel):
+    """Compressed file content addressed by the SHA-256 of its uncompressed bytes."""
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    size = models.BigIntegerField()
+    compressed_size = models.BigIntegerField()
+    compression = models.CharField(max_length=10, choices=BlobCompression.choices, default=BlobCompression.GZIP)
+    content_type = models.CharField(max_length=100, blank=True)
+    storage_name = models.CharField(max_length=255)
+
+    class Meta:
+        db_table = "stored_blob"
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.sha256}:{self.size}"
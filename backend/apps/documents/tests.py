@@ -1,3 +1,34 @@
-from django.test import TestCase
+from tempfile import TemporaryDirectory
 
-# Create your tests here.
+from django.conf import settings
+from django.test import TestCase, override_settings
+
+from apps.documents.blobs import blob_storage, open_blob, store_blob
+from apps.documents.models import StoredBlob
+
+
+class BlobStoreTests(TestCase):
+    def setUp(self):
+        blob_dir = TemporaryDirectory()
+        self.addCleanup(blob_dir.cleanup)
+        blob_storage_override = override_settings(
+            STORAGES={**settings.STORAGES, "blobs": {**settings.STORAGES["blobs"], "OPTIONS": {"location": blob_dir.name}}}
+        )
+        blob_storage_override.enable()
+        self.addCleanup(blob_storage_override.disable)
+
+    def test_identical_content_is_stored_once_compressed_and_read_back_lazily(self):
+        rows = [f"2026-03-{day:02d},Card settlement,{day}.00,ST-{day}\n" for day in range(1, 29)] * 50
+        first = store_blob(["date,description,amount,reference\n", *rows], content_type="text/csv")
+        second = store_blob(["date,description,amount,reference\n" + "".join(rows)])
+
+        self.assertEqual(first.id, second.id)
+        self.assertEqual(StoredBlob.objects.count(), 1)
+        self.assertLess(first.compressed_size, first.size // 5)
+        self.assertEqual(blob_storage().size(first.storage_name), first.compressed_size)
+        self.assertTrue(first.storage_name.startswith(f"{first.sha256[:2]}/{first.sha256[2:4]}/"))
+
+        with open_blob(first) as stream:
+            self.assertEqual(stream.readline(), b"date,description,amount,reference\n")
+            self.assertEqual(stream.readline(), rows[0].encode())
+            self.assertEqual(len(stream.read()), first.size - len("date,description,amount,reference\n") - len(rows[0]))
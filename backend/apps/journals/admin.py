@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from apps.journals.models import JournalEntry, JournalLine
+from apps.journals.models import JournalEntry, JournalLine, LedgerArchive, LedgerOutboxEvent
 
 
 class JournalLineInline(admin.TabularInline):
@@ -18,3 +18,14 @@ class JournalEntryAdmin(admin.ModelAdmin):
 @admin.register(JournalLine)
 class JournalLineAdmin(admin.ModelAdmin):
     list_display = ("company", "journal_entry", "line_no", "account", "debit", "credit")
+
+
+@admin.register(LedgerOutboxEvent)
+class LedgerOutboxEventAdmin(admin.ModelAdmin):
+    list_display = ("id", "company", "event_type", "journal_entry_id", "created_at")
+    list_filter = ("event_type",)
+
+
+@admin.register(LedgerArchive)
+class LedgerArchiveAdmin(admin.ModelAdmin):
+    list_display = ("company", "fiscal_year", "start_date", "end_date", "entry_count", "line_count", "created_at")
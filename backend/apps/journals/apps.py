@@ -1,7 +1,11 @@
 from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
 
 
 class JournalsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.journals"
 
+    def ready(self):
+        # Each installed app may register outbox consumers in a ``ledger_consumers`` module.
+        autodiscover_modules("ledger_consumers")
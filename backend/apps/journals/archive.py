@@ -0,0 +1,367 @@
+import gzip
+import hashlib
+import json
+import os
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from apps.accounting.models import Account
+from apps.accounting.services import lock_sequence
+from apps.common.streaming import chunked
+from apps.journals.models import ArchivedAccountTotal, JournalEntry, JournalLine, JournalStatus, LedgerArchive
+
+ARCHIVE_BLOCK_SIZE = 5000
+# Archive files are written in this order, so live lines sorted the same way continue them.
+LEDGER_LINE_ORDER = ("journal_entry__entry_date", "journal_entry__entry_no", "journal_entry_id", "line_no")
+ARCHIVE_COLUMNS = (
+    "line_id",
+    "journal_entry_id",
+    "entry_no",
+    "entry_date",
+    "status",
+    "line_no",
+    "account_id",
+    "description",
+    "debit",
+    "credit",
+    "created_at",
+    "updated_at",
+)
+_SOURCE_FIELDS = (
+    "id",
+    "journal_entry_id",
+    "journal_entry__entry_no",
+    "journal_entry__entry_date",
+    "journal_entry__status",
+    "line_no",
+    "account_id",
+    "description",
+    "debit",
+    "credit",
+    "created_at",
+    "updated_at",
+)
+
+
+class LedgerArchiveError(ValueError):
+    pass
+
+
+class ArchivedEntry:
+    __slots__ = ("id", "entry_no", "entry_date")
+
+    def __init__(self, *, id, entry_no, entry_date):
+        self.id = id
+        self.entry_no = entry_no
+        self.entry_date = entry_date
+
+
+class ArchivedLine:
+    """Read-only stand-in for a posted JournalLine that now lives in an archive file."""
+
+    __slots__ = (
+        "id",
+        "journal_entry_id",
+        "journal_entry",
+        "line_no",
+        "account_id",
+        "account",
+        "description",
+        "debit",
+        "credit",
+        "created_at",
+        "updated_at",
+    )
+
+    def __init__(
+        self,
+        *,
+        account,
+        debit,
+        credit,
+        id=None,
+        journal_entry=None,
+        line_no=None,
+        description="",
+        created_at=None,
+        updated_at=None,
+    ):
+        self.id = id
+        self.journal_entry = journal_entry
+        self.journal_entry_id = journal_entry.id if journal_entry else None
+        self.line_no = line_no
+        self.account = account
+        self.account_id = account.id
+        self.description = description
+        self.debit = debit
+        self.credit = credit
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+
+def fiscal_year_bounds(company, fiscal_year):
+    """Fiscal years are named after the calendar year in which they start."""
+    start_date = date(fiscal_year, company.fiscal_year_start_month, 1)
+    next_start = date(fiscal_year + 1, company.fiscal_year_start_month, 1)
+    return start_date, next_start - timedelta(days=1)
+
+
+def fiscal_year_of(company, on_date):
+    return on_date.year if on_date.month >= company.fiscal_year_start_month else on_date.year - 1
+
+
+def archive_path(archive):
+    return Path(settings.LEDGER_ARCHIVE_DIR) / archive.file_name
+
+
+def _serialize(row):
+    (
+        line_id,
+        entry_id,
+        entry_no,
+        entry_date,
+        entry_status,
+        line_no,
+        account_id,
+        description,
+        debit,
+        credit,
+        created_at,
+        updated_at,
+    ) = row
+    return (
+        str(line_id),
+        str(entry_id),
+        entry_no,
+        entry_date.isoformat(),
+        entry_status,
+        line_no,
+        str(account_id),
+        description,
+        str(debit),
+        str(credit),
+        created_at.isoformat(),
+        updated_at.isoformat(),
+    )
+
+
+def _write_archive_file(path, rows):
+    # Gzipped NDJSON where each record is one block of rows stored column by column.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, "wt", encoding="utf-8") as handle:
+        for block in chunked(rows, ARCHIVE_BLOCK_SIZE):
+            columns = {name: [row[index] for row in block] for index, name in enumerate(ARCHIVE_COLUMNS)}
+            handle.write(json.dumps(columns, separators=(",", ":")))
+            handle.write("\n")
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_archive_blocks(archive):
+    path = archive_path(archive)
+    if not path.exists():
+        raise LedgerArchiveError(f"Archive file for FY{archive.fiscal_year} is missing: {path}")
+    with gzip.open(path, "rt", encoding="utf-8") as handle:
+        for raw in handle:
+            yield json.loads(raw)
+
+
+@transaction.atomic
+def archive_fiscal_year(*, company, fiscal_year, today=None):
+    """Move a closed fiscal year's journal lines into an archive file and keep per-account totals.
+
+    Entry headers stay in the database so invoices, bills, payments and bank matches keep their links.
+    """
+    start_date, end_date = fiscal_year_bounds(company, fiscal_year)
+    today = today or timezone.now().date()
+    current_start, _ = fiscal_year_bounds(company, fiscal_year_of(company, today))
+    if end_date >= current_start:
+        raise LedgerArchiveError(f"FY{fiscal_year} is not closed; only fiscal years before the current one can be archived.")
+    # Every posting path numbers its entries under this lock, so nothing can be posted into the
+    # year between the scan below and the delete.
+    lock_sequence(company=company, key="journal_entry")
+    if LedgerArchive.objects.filter(company=company, fiscal_year=fiscal_year).exists():
+        raise LedgerArchiveError(f"FY{fiscal_year} is already archived.")
+
+    entries = JournalEntry.objects.filter(company=company, entry_date__range=(start_date, end_date))
+    if entries.filter(status=JournalStatus.DRAFT).exists():
+        raise LedgerArchiveError(f"FY{fiscal_year} still has draft journal entries; post or delete them first.")
+
+    if JournalLine.objects.filter(company=company, journal_entry__entry_date__lt=start_date).exists():
+        raise LedgerArchiveError(f"Archive the fiscal years before FY{fiscal_year} first.")
+
+    lines = JournalLine.objects.filter(company=company, journal_entry__entry_date__range=(start_date, end_date))
+    totals = defaultdict(lambda: [Decimal("0"), Decimal("0"), 0])
+    line_ids = []
+
+    def rows():
+        source = lines.order_by(*LEDGER_LINE_ORDER)
+        for row in source.values_list(*_SOURCE_FIELDS).iterator(chunk_size=ARCHIVE_BLOCK_SIZE):
+            line_ids.append(row[0])
+            if row[4] == JournalStatus.POSTED:
+                totals[row[6]][0] += row[8]
+                totals[row[6]][1] += row[9]
+                totals[row[6]][2] += 1
+            yield _serialize(row)
+
+    archive = LedgerArchive(
+        company=company,
+        fiscal_year=fiscal_year,
+        start_date=start_date,
+        end_date=end_date,
+        file_name=f"{company.id}/FY{fiscal_year}.ndjson.gz",
+    )
+    path = archive_path(archive)
+    if path.exists():
+        raise LedgerArchiveError(f"Archive file already exists: {path}")
+    # The file only takes its final name once the deletes commit, so a rollback never blocks a retry.
+    temp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        archive.checksum = _write_archive_file(temp_path, rows())
+        archive.entry_count = entries.count()
+        archive.line_count = len(line_ids)
+        archive.save()
+        ArchivedAccountTotal.objects.bulk_create(
+            [
+                ArchivedAccountTotal(
+                    company=company,
+                    archive=archive,
+                    account_id=account_id,
+                    debit_total=debit_total,
+                    credit_total=credit_total,
+                    line_count=posted_line_count,
+                )
+                for account_id, (debit_total, credit_total, posted_line_count) in totals.items()
+            ]
+        )
+        # Only the rows that went into the file are removed; anything else is left in place.
+        deleted = 0
+        for block in chunked(line_ids, ARCHIVE_BLOCK_SIZE):
+            deleted += JournalLine.objects.filter(id__in=block).delete()[0]
+        if deleted != len(line_ids):
+            raise LedgerArchiveError(
+                f"FY{fiscal_year} changed while it was archived ({deleted} of {len(line_ids)} lines removed); retry."
+            )
+    except Exception:
+        temp_path.unlink(missing_ok=True)
+        raise
+    transaction.on_commit(lambda: os.replace(temp_path, path))
+    return archive
+
+
+def _overlapping_archives(company, start_date, end_date):
+    archives = LedgerArchive.objects.filter(company=company)
+    if start_date:
+        archives = archives.filter(end_date__gte=start_date)
+    if end_date:
+        archives = archives.filter(start_date__lte=end_date)
+    return list(archives)
+
+
+def _iter_archive_lines(archive, accounts, *, start_date=None, end_date=None, account_id=None):
+    account_key = str(account_id) if account_id else None
+    for columns in _read_archive_blocks(archive):
+        for index, entry_status in enumerate(columns["status"]):
+            if entry_status != JournalStatus.POSTED:
+                continue
+            if account_key and columns["account_id"][index] != account_key:
+                continue
+            entry_date = date.fromisoformat(columns["entry_date"][index])
+            if (start_date and entry_date < start_date) or (end_date and entry_date > end_date):
+                continue
+            yield ArchivedLine(
+                id=uuid.UUID(columns["line_id"][index]),
+                journal_entry=ArchivedEntry(
+                    id=uuid.UUID(columns["journal_entry_id"][index]),
+                    entry_no=columns["entry_no"][index],
+                    entry_date=entry_date,
+                ),
+                line_no=columns["line_no"][index],
+                account=accounts[uuid.UUID(columns["account_id"][index])],
+                description=columns["description"][index],
+                debit=Decimal(columns["debit"][index]),
+                credit=Decimal(columns["credit"][index]),
+                created_at=datetime.fromisoformat(columns["created_at"][index]),
+                updated_at=datetime.fromisoformat(columns["updated_at"][index]),
+            )
+
+
+def iter_archived_lines(*, company, start_date=None, end_date=None, account_id=None):
+    """Posted lines from archived fiscal years overlapping the range, oldest year first."""
+    archives = _overlapping_archives(company, start_date, end_date)
+    if not archives:
+        return
+    accounts = Account.objects.filter(company=company).in_bulk()
+    for archive in archives:
+        yield from _iter_archive_lines(archive, accounts, start_date=start_date, end_date=end_date, account_id=account_id)
+
+
+def iter_archived_balances(*, company, start_date=None, end_date=None):
+    """Per-account debit/credit for archived years in range; whole years come from stored totals."""
+    archives = _overlapping_archives(company, start_date, end_date)
+    if not archives:
+        return
+    accounts = Account.objects.filter(company=company).in_bulk()
+    for archive in archives:
+        partial = (start_date and archive.start_date < start_date) or (end_date and archive.end_date > end_date)
+        if partial:
+            yield from _iter_archive_lines(archive, accounts, start_date=start_date, end_date=end_date)
+            continue
+        for total in archive.account_totals.all():
+            yield ArchivedLine(account=accounts[total.account_id], debit=total.debit_total, credit=total.credit_total)
+
+
+class LedgerLines:
+    """Posted lines in ledger order: archived fiscal years first, then ``queryset``.
+
+    Supports ``count()`` and slicing so it can be paginated like a queryset; a page only reads the
+    archive files it overlaps. ``queryset`` must hold posted lines ordered like the archive files.
+    """
+
+    def __init__(self, *, company, queryset, account_id=None):
+        self.company = company
+        self.queryset = queryset
+        self.account_id = account_id
+        self._archived_count = None
+
+    def archived_count(self):
+        if self._archived_count is None:
+            totals = ArchivedAccountTotal.objects.filter(company=self.company)
+            if self.account_id:
+                totals = totals.filter(account_id=self.account_id)
+            self._archived_count = totals.aggregate(count=Sum("line_count"))["count"] or 0
+        return self._archived_count
+
+    def count(self):
+        return self.archived_count() + self.queryset.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice) or item.step not in (None, 1):
+            raise TypeError("LedgerLines only supports contiguous slices.")
+        start = item.start or 0
+        archived_count = self.archived_count()
+        stop = item.stop if item.stop is not None else archived_count + self.queryset.count()
+        lines = []
+        if start < archived_count:
+            archived = iter_archived_lines(company=self.company, account_id=self.account_id)
+            lines.extend(islice(archived, start, min(stop, archived_count)))
+        hot_start, hot_stop = max(start - archived_count, 0), stop - archived_count
+        if hot_stop > hot_start:
+            lines.extend(self.queryset[hot_start:hot_stop])
+        return lines
@@ -0,0 +1,199 @@
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.accounting.models import Account
+from apps.accounting.services import allocate_sequence_block
+from apps.common.decimals import parse_amount
+from apps.common.streaming import iter_records
+from apps.journals.models import JournalEntry, JournalLine, JournalStatus, LedgerEventType
+from apps.journals.outbox import record_ledger_events
+from apps.journals.services import JournalValidationError, archived_periods, assert_period_open
+
+IMPORT_CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 500
+
+CSV_HEADER_FIELDS = ("entry_date", "description", "reference_type")
+
+
+def _build_account_lookup(company):
+    lookup = {}
+    for account in Account.objects.filter(company=company, is_active=True).only("id", "company_id", "code"):
+        lookup[str(account.id)] = account
+        lookup[account.code.strip().lower()] = account
+    return lookup
+
+
+def _parse_date(value):
+    raw = str(value or "").strip()
+    if not raw:
+        raise JournalValidationError("entry_date is required.")
+    try:
+        return date.fromisoformat(raw)
+    except ValueError as exc:
+        raise JournalValidationError(f"Invalid entry_date '{raw}'. Expected YYYY-MM-DD.") from exc
+
+
+def _parse_amount(value, *, label):
+    raw = str(value).strip() if value not in (None, "") else "0"
+    try:
+        amount = parse_amount(raw, label=label)
+    except ValueError as exc:
+        raise JournalValidationError(str(exc)) from exc
+    if amount < 0:
+        raise JournalValidationError(f"{label} cannot be negative.")
+    return amount
+
+
+def _iter_csv_entries(records):
+    # CSV carries one journal line per row; consecutive rows sharing an entry_ref form one entry.
+    current = None
+    for row_no, record in records:
+        ref = record.get("entry_ref", "")
+        if current is not None and (not ref or ref != current["ref"]):
+            yield current["row_no"], current
+            current = None
+        if current is None:
+            current = {"row_no": row_no, "ref": ref, "lines": []}
+            current.update({field: record.get(field, "") for field in CSV_HEADER_FIELDS})
+        current["lines"].append(
+            {
+                "account": record.get("account"),
+                "debit": record.get("debit"),
+                "credit": record.get("credit"),
+                "description": record.get("line_description", ""),
+            }
+        )
+    if current is not None:
+        yield current["row_no"], current
+
+
+def _iter_ndjson_entries(records):
+    for row_no, record in records:
+        if record is not None:
+            record.setdefault("ref", record.get("entry_ref", ""))
+        yield row_no, record
+
+
+def iter_journal_records(text_stream, *, record_format):
+    records = iter_records(text_stream, record_format=record_format)
+    if record_format == "csv":
+        return _iter_csv_entries(records)
+    return _iter_ndjson_entries(records)
+
+
+def build_entry_from_record(*, company, record, accounts, periods=()):
+    entry = JournalEntry(
+        company=company,
+        status=JournalStatus.DRAFT,
+        entry_date=_parse_date(record.get("entry_date")),
+        description=str(record.get("description") or ""),
+        reference_type=str(record.get("reference_type") or "import")[:64],
+    )
+
+    raw_lines = record.get("lines")
+    if not isinstance(raw_lines, list) or not raw_lines:
+        raise JournalValidationError("At least one journal line is required.")
+
+    lines = []
+    debit_total = Decimal("0")
+    credit_total = Decimal("0")
+    for line_no, raw_line in enumerate(raw_lines, start=1):
+        if not isinstance(raw_line, dict):
+            raise JournalValidationError(f"Line {line_no} must be an object.")
+        key = str(raw_line.get("account") or "").strip().lower()
+        account = accounts.get(key)
+        if account is None:
+            raise JournalValidationError(f"Line {line_no} account '{raw_line.get('account')}' was not found in this company.")
+        debit = _parse_amount(raw_line.get("debit"), label="debit")
+        credit = _parse_amount(raw_line.get("credit"), label="credit")
+        if (debit > 0) == (credit > 0):
+            raise JournalValidationError(f"Line {line_no} must have either a debit or a credit amount.")
+        debit_total += debit
+        credit_total += credit
+        lines.append(
+            JournalLine(
+                company=company,
+                journal_entry=entry,
+                line_no=line_no,
+                account=account,
+                description=str(raw_line.get("description") or ""),
+                debit=debit,
+                credit=credit,
+            )
+        )
+
+    if debit_total != credit_total:
+        raise JournalValidationError("Journal entry is not balanced (debit must equal credit).")
+    assert_period_open(company=company, entry_dates=[entry.entry_date], periods=periods)
+    return entry, lines
+
+
+@transaction.atomic
+def _flush_entry_chunk(*, company, entries, lines, post, actor_user):
+    if post:
+        # One sequence lock per chunk; entries take consecutive numbers in file order.
+        first_entry_no = allocate_sequence_block(company=company, key="journal_entry", count=len(entries))
+        posted_at = timezone.now()
+        for offset, entry in enumerate(entries):
+            entry.entry_no = first_entry_no + offset
+            entry.status = JournalStatus.POSTED
+            entry.posted_at = posted_at
+            entry.posted_by_user = actor_user
+    JournalEntry.objects.bulk_create(entries, batch_size=IMPORT_CHUNK_SIZE)
+    JournalLine.objects.bulk_create(lines, batch_size=IMPORT_CHUNK_SIZE)
+    if post:
+        record_ledger_events(event_type=LedgerEventType.POSTED, entries=entries)
+
+
+def import_journal_entries(*, company, text_stream, record_format, actor_user, post=True, chunk_size=IMPORT_CHUNK_SIZE):
+    accounts = _build_account_lookup(company)
+    periods = archived_periods(company)
+
+    summary = {
+        "entries_created": 0,
+        "lines_created": 0,
+        "entries_failed": 0,
+        "posted": post,
+        "first_entry_no": None,
+        "last_entry_no": None,
+        "errors": [],
+        "errors_truncated": False,
+    }
+    pending_entries = []
+    pending_lines = []
+
+    def flush():
+        if not pending_entries:
+            return
+        _flush_entry_chunk(company=company, entries=pending_entries, lines=pending_lines, post=post, actor_user=actor_user)
+        summary["entries_created"] += len(pending_entries)
+        summary["lines_created"] += len(pending_lines)
+        if post:
+            summary["first_entry_no"] = summary["first_entry_no"] or pending_entries[0].entry_no
+            summary["last_entry_no"] = pending_entries[-1].entry_no
+        pending_entries.clear()
+        pending_lines.clear()
+
+    for row_no, record in iter_journal_records(text_stream, record_format=record_format):
+        try:
+            if record is None:
+                raise JournalValidationError("Row is not a valid JSON object.")
+            entry, lines = build_entry_from_record(company=company, record=record, accounts=accounts, periods=periods)
+        except (TypeError, ValueError) as exc:
+            summary["entries_failed"] += 1
+            if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+                summary["errors"].append({"row": row_no, "ref": (record or {}).get("ref", ""), "detail": str(exc)})
+            else:
+                summary["errors_truncated"] = True
+            continue
+
+        pending_entries.append(entry)
+        pending_lines.extend(lines)
+        if len(pending_entries) >= chunk_size:
+            flush()
+
+    flush()
+    return summary
@@ -0,0 +1,18 @@
+import logging
+
+from apps.journals.outbox import register_ledger_consumer
+
+logger = logging.getLogger(__name__)
+
+
+@register_ledger_consumer("ledger-log")
+def log_ledger_events(events):
+    """Write one log record per event; a template for consumers and a way to tail the ledger."""
+    for event in events:
+        logger.info(
+            "Ledger %s: company=%s entry=%s entry_no=%s",
+            event.event_type,
+            event.company_id,
+            event.journal_entry_id,
+            event.payload.get("entry_no"),
+        )
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.companies.models import Company
+from apps.journals.archive import LedgerArchiveError, archive_fiscal_year
+
+
+class Command(BaseCommand):
+    help = "Move a closed fiscal year's journal lines into compressed archive files, keeping per-account totals."
+
+    def add_arguments(self, parser):
+        parser.add_argument("fiscal_year", type=int, help="Fiscal year to archive, named after the calendar year it starts in.")
+        parser.add_argument("--company", type=str, default="", help="Restrict archiving to one company id.")
+
+    def handle(self, *args, **options):
+        if options["company"]:
+            companies = Company.objects.filter(id=options["company"])
+            if not companies.exists():
+                raise CommandError(f"Company not found: {options['company']}")
+        else:
+            companies = Company.objects.filter(is_active=True)
+
+        for company in companies:
+            try:
+                archive = archive_fiscal_year(company=company, fiscal_year=options["fiscal_year"])
+            except LedgerArchiveError as exc:
+                self.stderr.write(self.style.ERROR(f"{company.name}: {exc}"))
+                continue
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{company.name} FY{archive.fiscal_year}: entries={archive.entry_count} lines={archive.line_count} "
+                    f"file={archive.file_name}"
+                )
+            )
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.companies.models import Company
+from apps.journals.outbox import LedgerOutboxError, drain_ledger_outbox, reset_ledger_checkpoint
+
+
+class Command(BaseCommand):
+    help = "Feed ledger outbox events to a registered consumer, advancing its per-company checkpoint."
+
+    def add_arguments(self, parser):
+        parser.add_argument("consumer", type=str, help="Registered ledger consumer name.")
+        parser.add_argument("--company", type=str, default="", help="Restrict draining to one company id.")
+        parser.add_argument("--batch-size", type=int, default=500, help="Events handed to the consumer per transaction.")
+        parser.add_argument(
+            "--replay-from",
+            type=int,
+            default=None,
+            help="Rewind the checkpoint so events after this position are delivered again (0 replays everything).",
+        )
+        parser.add_argument("--follow", action="store_true", help="Keep polling for new events until interrupted.")
+        parser.add_argument("--interval", type=float, default=2.0, help="Seconds between polls with --follow.")
+
+    def handle(self, *args, **options):
+        company = None
+        if options["company"]:
+            company = Company.objects.filter(id=options["company"]).first()
+            if company is None:
+                raise CommandError(f"Company not found: {options['company']}")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        consumer = options["consumer"]
+        try:
+            if options["replay_from"] is not None:
+                reset_ledger_checkpoint(consumer=consumer, position=options["replay_from"], company=company)
+            while True:
+                processed = drain_ledger_outbox(consumer=consumer, company=company, batch_size=options["batch_size"])
+                if processed or not options["follow"]:
+                    self.stdout.write(self.style.SUCCESS(f"{consumer}: processed={processed}"))
+                if not options["follow"]:
+                    break
+                time.sleep(options["interval"])
+        except LedgerOutboxError as exc:
+            raise CommandError(str(exc)) from exc
+        except KeyboardInterrupt:
+            pass
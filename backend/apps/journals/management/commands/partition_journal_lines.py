@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.journals.partitioning import PartitioningError, journal_line_partition_statements, partition_journal_lines
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild journal_line as a PostgreSQL table hash-partitioned by company, copying existing rows "
+        "in one transaction. Run during a maintenance window; the table is locked while rows are copied."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--partitions", type=int, default=16, help="Number of hash partitions to create.")
+        parser.add_argument("--dry-run", action="store_true", help="Print the SQL without running it.")
+
+    def handle(self, *args, **options):
+        try:
+            if options["dry_run"]:
+                statements = journal_line_partition_statements(partitions=options["partitions"])
+            else:
+                statements = partition_journal_lines(partitions=options["partitions"])
+        except PartitioningError as exc:
+            raise CommandError(str(exc)) from exc
+
+        for statement in statements:
+            self.stdout.write(f"{statement};")
+        if not options["dry_run"]:
+            self.stdout.write(self.style.SUCCESS(f"journal_line partitioned into {options['partitions']} partitions."))
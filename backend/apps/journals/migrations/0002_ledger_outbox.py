@@ -0,0 +1,44 @@
+# Generated by Django 5.2.11 on 2026-10-19 01:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0003_company_fx_gain_loss_account'),
+        ('journals', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerConsumerCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('consumer', models.CharField(max_length=64)),
+                ('position', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ledger_checkpoints', to='companies.company')),
+            ],
+            options={
+                'db_table': 'ledger_consumer_checkpoint',
+                'unique_together': {('consumer', 'company')},
+            },
+        ),
+        migrations.CreateModel(
+            name='LedgerOutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('event_type', models.CharField(choices=[('journal.posted', 'Journal posted'), ('journal.voided', 'Journal voided')], max_length=32)),
+                ('journal_entry_id', models.UUIDField()),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ledger_events', to='companies.company')),
+            ],
+            options={
+                'db_table': 'ledger_outbox_event',
+                'indexes': [models.Index(fields=['company', 'id'], name='ledger_outb_company_86fe65_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.11 on 2026-10-19 02:07
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0003_exchange_rate'),
+        ('companies', '0003_company_fx_gain_loss_account'),
+        ('journals', '0002_ledger_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerArchive',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('fiscal_year', models.PositiveIntegerField()),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('file_name', models.CharField(max_length=255)),
+                ('checksum', models.CharField(max_length=64)),
+                ('entry_count', models.PositiveIntegerField(default=0)),
+                ('line_count', models.PositiveIntegerField(default=0)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ledger_archives', to='companies.company')),
+            ],
+            options={
+                'db_table': 'ledger_archive',
+                'ordering': ['fiscal_year'],
+                'unique_together': {('company', 'fiscal_year')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedAccountTotal',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('debit_total', models.DecimalField(decimal_places=4, default=0, max_digits=19)),
+                ('credit_total', models.DecimalField(decimal_places=4, default=0, max_digits=19)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.RESTRICT, related_name='archived_totals', to='accounting.account')),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_account_totals', to='companies.company')),
+                ('archive', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='account_totals', to='journals.ledgerarchive')),
+            ],
+            options={
+                'db_table': 'ledger_archived_account_total',
+                'unique_together': {('archive', 'account')},
+            },
+        ),
+    ]
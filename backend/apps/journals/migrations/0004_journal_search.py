@@ -0,0 +1,111 @@
+# Generated by Django 5.2.11 on 2026-10-19 02:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX journal_entry_search_tsv ON journal_entry "
+    "USING gin (to_tsvector('simple', description || ' ' || reference_type))",
+    "CREATE INDEX journal_entry_description_trgm ON journal_entry USING gin (description gin_trgm_ops)",
+    "CREATE INDEX journal_line_search_tsv ON journal_line USING gin (to_tsvector('simple', description))",
+    "CREATE INDEX journal_line_description_trgm ON journal_line USING gin (description gin_trgm_ops)",
+]
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS journal_entry_search_tsv",
+    "DROP INDEX IF EXISTS journal_entry_description_trgm",
+    "DROP INDEX IF EXISTS journal_line_search_tsv",
+    "DROP INDEX IF EXISTS journal_line_description_trgm",
+]
+
+# FTS5 rows are tied to their source row through a key table on the UUID primary key; the implicit
+# rowid of journal_entry/journal_line is not stable (VACUUM and table rebuilds may renumber it).
+# Note that a migration which rebuilds either table on SQLite drops these triggers with it.
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE journal_entry_search USING fts5("
+    "body, company_id UNINDEXED, entry_id UNINDEXED, tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE VIRTUAL TABLE journal_line_search USING fts5("
+    "body, company_id UNINDEXED, entry_id UNINDEXED, tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TABLE journal_entry_search_key (entry_id char(32) PRIMARY KEY, search_rowid integer NOT NULL)",
+    "CREATE TABLE journal_line_search_key (line_id char(32) PRIMARY KEY, search_rowid integer NOT NULL)",
+    "INSERT INTO journal_entry_search (rowid, body, company_id, entry_id) "
+    "SELECT rowid, description || ' ' || reference_type || ' ' || coalesce(reference_id, ''), company_id, id "
+    "FROM journal_entry",
+    "INSERT INTO journal_entry_search_key (entry_id, search_rowid) SELECT id, rowid FROM journal_entry",
+    "INSERT INTO journal_line_search (rowid, body, company_id, entry_id) "
+    "SELECT rowid, description, company_id, journal_entry_id FROM journal_line",
+    "INSERT INTO journal_line_search_key (line_id, search_rowid) SELECT id, rowid FROM journal_line",
+    """CREATE TRIGGER journal_entry_search_insert AFTER INSERT ON journal_entry BEGIN
+        INSERT INTO journal_entry_search (body, company_id, entry_id)
+        VALUES (new.description || ' ' || new.reference_type || ' ' || coalesce(new.reference_id, ''),
+                new.company_id, new.id);
+        INSERT INTO journal_entry_search_key (entry_id, search_rowid) VALUES (new.id, last_insert_rowid());
+    END""",
+    """CREATE TRIGGER journal_entry_search_update
+    AFTER UPDATE OF description, reference_type, reference_id ON journal_entry BEGIN
+        UPDATE journal_entry_search
+        SET body = new.description || ' ' || new.reference_type || ' ' || coalesce(new.reference_id, '')
+        WHERE rowid = (SELECT search_rowid FROM journal_entry_search_key WHERE entry_id = new.id);
+    END""",
+    """CREATE TRIGGER journal_entry_search_delete AFTER DELETE ON journal_entry BEGIN
+        DELETE FROM journal_entry_search
+        WHERE rowid = (SELECT search_rowid FROM journal_entry_search_key WHERE entry_id = old.id);
+        DELETE FROM journal_entry_search_key WHERE entry_id = old.id;
+    END""",
+    """CREATE TRIGGER journal_line_search_insert AFTER INSERT ON journal_line BEGIN
+        INSERT INTO journal_line_search (body, company_id, entry_id)
+        VALUES (new.description, new.company_id, new.journal_entry_id);
+        INSERT INTO journal_line_search_key (line_id, search_rowid) VALUES (new.id, last_insert_rowid());
+    END""",
+    """CREATE TRIGGER journal_line_search_update AFTER UPDATE OF description ON journal_line BEGIN
+        UPDATE journal_line_search SET body = new.description
+        WHERE rowid = (SELECT search_rowid FROM journal_line_search_key WHERE line_id = new.id);
+    END""",
+    """CREATE TRIGGER journal_line_search_delete AFTER DELETE ON journal_line BEGIN
+        DELETE FROM journal_line_search
+        WHERE rowid = (SELECT search_rowid FROM journal_line_search_key WHERE line_id = old.id);
+        DELETE FROM journal_line_search_key WHERE line_id = old.id;
+    END""",
+]
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS journal_entry_search_insert",
+    "DROP TRIGGER IF EXISTS journal_entry_search_update",
+    "DROP TRIGGER IF EXISTS journal_entry_search_delete",
+    "DROP TRIGGER IF EXISTS journal_line_search_insert",
+    "DROP TRIGGER IF EXISTS journal_line_search_update",
+    "DROP TRIGGER IF EXISTS journal_line_search_delete",
+    "DROP TABLE IF EXISTS journal_entry_search_key",
+    "DROP TABLE IF EXISTS journal_line_search_key",
+    "DROP TABLE IF EXISTS journal_entry_search",
+    "DROP TABLE IF EXISTS journal_line_search",
+]
+
+
+def _run(schema_editor, statements_by_vendor):
+    for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def create_search_indexes(apps, schema_editor):
+    _run(schema_editor, {"postgresql": POSTGRES_FORWARD, "sqlite": SQLITE_FORWARD})
+
+
+def drop_search_indexes(apps, schema_editor):
+    _run(schema_editor, {"postgresql": POSTGRES_BACKWARD, "sqlite": SQLITE_BACKWARD})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0003_company_fx_gain_loss_account'),
+        ('journals', '0003_ledger_archive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='journalentry',
+            index=models.Index(fields=['company', 'reference_id'], name='journal_ent_company_7af4d7_idx'),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-19 03:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journals', '0004_journal_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedaccounttotal',
+            name='line_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -44,6 +44,7 @@ class JournalEntry(TimeStampedUUIDModel):
         indexes = [
             models.Index(fields=["company", "status"]),
             models.Index(fields=["company", "entry_date"]),
+            models.Index(fields=["company", "reference_id"]),
         ]
         ordering = ["-entry_date", "-created_at"]
 
@@ -78,3 +79,74 @@ class JournalLine(TimeStampedUUIDModel):
 
     def __str__(self):
         return f"{self.journal_entry_id}:{self.line_no}"
+
+
+class LedgerEventType(models.TextChoices):
+    POSTED = "journal.posted", "Journal posted"
+    VOIDED = "journal.voided", "Journal voided"
+
+
+class LedgerOutboxEvent(models.Model):
+    # The sequential id is the position consumers checkpoint against and replay from.
+    id = models.BigAutoField(primary_key=True)
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name="ledger_events")
+    event_type = models.CharField(max_length=32, choices=LedgerEventType.choices)
+    journal_entry_id = models.UUIDField()
+    payload = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "ledger_outbox_event"
+        indexes = [models.Index(fields=["company", "id"])]
+
+    def __str__(self):
+        return f"{self.id}:{self.event_type}:{self.journal_entry_id}"
+
+
+class LedgerConsumerCheckpoint(models.Model):
+    consumer = models.CharField(max_length=64)
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name="ledger_checkpoints")
+    position = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "ledger_consumer_checkpoint"
+        unique_together = (("consumer", "company"),)
+
+    def __str__(self):
+        return f"{self.consumer}:{self.company_id}:{self.position}"
+
+
+class LedgerArchive(TimeStampedUUIDModel):
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name="ledger_archives")
+    fiscal_year = models.PositiveIntegerField()
+    start_date = models.DateField()
+    end_date = models.DateField()
+    file_name = models.CharField(max_length=255)
+    checksum = models.CharField(max_length=64)
+    entry_count = models.PositiveIntegerField(default=0)
+    line_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "ledger_archive"
+        unique_together = (("company", "fiscal_year"),)
+        ordering = ["fiscal_year"]
+
+    def __str__(self):
+        return f"{self.company_id}:FY{self.fiscal_year}"
+
+
+class ArchivedAccountTotal(TimeStampedUUIDModel):
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name="archived_account_totals")
+    archive = models.ForeignKey(LedgerArchive, on_delete=models.CASCADE, related_name="account_totals")
+    account = models.ForeignKey(Account, on_delete=models.RESTRICT, related_name="archived_totals")
+    debit_total = models.DecimalField(max_digits=19, decimal_places=4, default=0)
+    credit_total = models.DecimalField(max_digits=19, decimal_places=4, default=0)
+    line_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "ledger_archived_account_total"
+        unique_together = (("archive", "account"),)
+
+    def __str__(self):
+        return f"{self.archive_id}:{self.account_id}"
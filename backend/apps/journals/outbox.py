@@ -0,0 +1,101 @@
+from django.db import transaction
+
+from apps.companies.models import Company
+from apps.journals.models import LedgerConsumerCheckpoint, LedgerEventType, LedgerOutboxEvent
+
+OUTBOX_BATCH_SIZE = 500
+
+_consumers = {}
+
+
+class LedgerOutboxError(ValueError):
+    pass
+
+
+def register_ledger_consumer(name):
+    """Register ``handler(events)``; it runs in the transaction that advances the consumer's checkpoint."""
+
+    def decorator(handler):
+        _consumers[name] = handler
+        return handler
+
+    return decorator
+
+
+def get_ledger_consumer(name):
+    try:
+        return _consumers[name]
+    except KeyError as exc:
+        raise LedgerOutboxError(f"Unknown ledger consumer '{name}'.") from exc
+
+
+def _event_payload(entry):
+    return {
+        "entry_no": entry.entry_no,
+        "entry_date": entry.entry_date.isoformat(),
+        "reference_type": entry.reference_type,
+        "reference_id": str(entry.reference_id) if entry.reference_id else None,
+    }
+
+
+def record_ledger_events(*, event_type: LedgerEventType, entries):
+    # Callers write events after taking the company's journal_entry sequence lock, so ids within
+    # one company commit in order; that is what lets checkpoints be a plain per-company position.
+    LedgerOutboxEvent.objects.bulk_create(
+        [
+            LedgerOutboxEvent(
+                company_id=entry.company_id,
+                event_type=event_type,
+                journal_entry_id=entry.id,
+                payload=_event_payload(entry),
+            )
+            for entry in entries
+        ],
+        batch_size=OUTBOX_BATCH_SIZE,
+    )
+
+
+@transaction.atomic
+def _drain_company_batch(*, consumer, handler, company_id, batch_size):
+    checkpoint, _ = LedgerConsumerCheckpoint.objects.select_for_update().get_or_create(
+        consumer=consumer,
+        company_id=company_id,
+    )
+    events = list(
+        LedgerOutboxEvent.objects.filter(company_id=company_id, id__gt=checkpoint.position).order_by("id")[:batch_size]
+    )
+    if not events:
+        return 0
+    handler(events)
+    checkpoint.position = events[-1].id
+    checkpoint.save(update_fields=["position", "updated_at"])
+    return len(events)
+
+
+def drain_ledger_outbox(*, consumer, company=None, batch_size=OUTBOX_BATCH_SIZE) -> int:
+    handler = get_ledger_consumer(consumer)
+    if company is not None:
+        company_ids = [company.id]
+    else:
+        company_ids = list(Company.objects.order_by("id").values_list("id", flat=True))
+
+    processed = 0
+    for company_id in company_ids:
+        while True:
+            count = _drain_company_batch(consumer=consumer, handler=handler, company_id=company_id, batch_size=batch_size)
+            processed += count
+            if count < batch_size:
+                break
+    return processed
+
+
+def reset_ledger_checkpoint(*, consumer, position=0, company=None) -> None:
+    """Rewind (or fast-forward) ``consumer`` so the next drain resumes after ``position``."""
+    get_ledger_consumer(consumer)
+    companies = Company.objects.all() if company is None else Company.objects.filter(id=company.id)
+    for company_id in companies.values_list("id", flat=True):
+        LedgerConsumerCheckpoint.objects.update_or_create(
+            consumer=consumer,
+            company_id=company_id,
+            defaults={"position": position},
+        )
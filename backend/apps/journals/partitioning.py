@@ -0,0 +1,112 @@
+from django.db import connection, transaction
+from django.db.models import Index
+
+from apps.journals.models import JournalLine
+
+PARTITION_KEY = "company_id"
+LEGACY_SUFFIX = "_unpartitioned"
+
+
+class PartitioningError(ValueError):
+    pass
+
+
+def _qn(name):
+    return connection.ops.quote_name(name)
+
+
+def _columns(columns):
+    return ", ".join(_qn(column) for column in columns)
+
+
+def _with_partition_key(columns):
+    # PostgreSQL only accepts primary/unique keys on a partitioned table that contain the partition key.
+    return list(columns) if PARTITION_KEY in columns else [*columns, PARTITION_KEY]
+
+
+def build_partition_statements(*, table, constraints, partitions, index_definitions=None):
+    """SQL that swaps ``table`` for a copy hash-partitioned on company_id, keeping constraint/index names.
+
+    ``constraints`` is the introspection output for the existing table. Check constraints and
+    defaults are copied with ``LIKE``; key, foreign key and index definitions are rebuilt by name.
+    Expression and non-btree indexes are recreated from ``index_definitions`` (name -> CREATE INDEX).
+    """
+    index_definitions = index_definitions or {}
+    if partitions < 2:
+        raise PartitioningError("Use at least 2 partitions.")
+    legacy = f"{table}{LEGACY_SUFFIX}"
+    statements = [
+        f"ALTER TABLE {_qn(table)} RENAME TO {_qn(legacy)}",
+        f"CREATE TABLE {_qn(table)} (LIKE {_qn(legacy)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        f"PARTITION BY HASH ({_qn(PARTITION_KEY)})",
+    ]
+    for remainder in range(partitions):
+        statements.append(
+            f"CREATE TABLE {_qn(f'{table}_p{remainder}')} PARTITION OF {_qn(table)} "
+            f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+        )
+    statements.append(f"INSERT INTO {_qn(table)} SELECT * FROM {_qn(legacy)}")
+    # Index names are schema-wide, so the old table has to go before they can be reused.
+    statements.append(f"DROP TABLE {_qn(legacy)}")
+
+    for name, spec in sorted(constraints.items()):
+        columns = spec["columns"]
+        if spec["primary_key"]:
+            statements.append(
+                f"ALTER TABLE {_qn(table)} ADD CONSTRAINT {_qn(name)} PRIMARY KEY ({_columns(_with_partition_key(columns))})"
+            )
+        elif spec["foreign_key"]:
+            ref_table, ref_column = spec["foreign_key"]
+            statements.append(
+                f"ALTER TABLE {_qn(table)} ADD CONSTRAINT {_qn(name)} FOREIGN KEY ({_columns(columns)}) "
+                f"REFERENCES {_qn(ref_table)} ({_qn(ref_column)}) DEFERRABLE INITIALLY DEFERRED"
+            )
+        elif spec["unique"]:
+            statements.append(
+                f"ALTER TABLE {_qn(table)} ADD CONSTRAINT {_qn(name)} UNIQUE ({_columns(_with_partition_key(columns))})"
+            )
+        elif spec["index"] and not spec["check"]:
+            if columns and spec["type"] == Index.suffix:
+                statements.append(f"CREATE INDEX {_qn(name)} ON {_qn(table)} ({_columns(columns)})")
+            elif name in index_definitions:
+                statements.append(index_definitions[name])
+            else:
+                raise PartitioningError(f"Index {name} needs its definition to be rebuilt.")
+    return statements
+
+
+def journal_lines_are_partitioned() -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s))",
+            [JournalLine._meta.db_table],
+        )
+        return cursor.fetchone()[0]
+
+
+def journal_line_partition_statements(*, partitions):
+    if connection.vendor != "postgresql":
+        raise PartitioningError("Journal line partitioning requires PostgreSQL.")
+    if journal_lines_are_partitioned():
+        raise PartitioningError("journal_line is already partitioned.")
+    table = JournalLine._meta.db_table
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+        cursor.execute("SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s", [table])
+        index_definitions = dict(cursor.fetchall())
+    return build_partition_statements(
+        table=table,
+        constraints=constraints,
+        partitions=partitions,
+        index_definitions=index_definitions,
+    )
+
+
+@transaction.atomic
+def partition_journal_lines(*, partitions):
+    statements = journal_line_partition_statements(partitions=partitions)
+    with connection.cursor() as cursor:
+        cursor.execute(f"LOCK TABLE {_qn(JournalLine._meta.db_table)} IN ACCESS EXCLUSIVE MODE")
+        for statement in statements:
+            cursor.execute(statement)
+    return statements
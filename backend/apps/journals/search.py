@@ -0,0 +1,120 @@
+import re
+import uuid
+
+from django.db import connection
+
+from apps.journals.models import JournalEntry
+
+DEFAULT_SEARCH_LIMIT = 25
+MAX_SEARCH_LIMIT = 100
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Both backends search the same documents: an entry's description + reference type, and each line's
+# description. The PostgreSQL expressions must match the indexes created in 0004_journal_search.
+_POSTGRES_SEARCH_SQL = """
+SELECT entry_id, MAX(score) AS score FROM (
+    SELECT e.id AS entry_id,
+           ts_rank(to_tsvector('simple', e.description || ' ' || e.reference_type), query)
+               + word_similarity(%(text)s, e.description) AS score
+    FROM journal_entry e, to_tsquery('simple', %(tsquery)s) query
+    WHERE e.company_id = %(company_id)s
+      AND (to_tsvector('simple', e.description || ' ' || e.reference_type) @@ query OR %(text)s <%% e.description)
+    UNION ALL
+    SELECT l.journal_entry_id,
+           ts_rank(to_tsvector('simple', l.description), query) + word_similarity(%(text)s, l.description)
+    FROM journal_line l, to_tsquery('simple', %(tsquery)s) query
+    WHERE l.company_id = %(company_id)s
+      AND (to_tsvector('simple', l.description) @@ query OR %(text)s <%% l.description)
+    UNION ALL
+    SELECT e.id, 2.0 FROM journal_entry e
+    WHERE e.company_id = %(company_id)s AND e.reference_id = %(reference_id)s
+) hits
+GROUP BY entry_id
+ORDER BY score DESC, entry_id
+LIMIT %(limit)s
+"""
+
+# bm25() is lower-is-better, so the best hit per entry is the minimum.
+_SQLITE_SEARCH_SQL = """
+SELECT entry_id, MIN(score) AS score FROM (
+    SELECT entry_id, bm25(journal_entry_search) AS score FROM journal_entry_search
+    WHERE journal_entry_search MATCH %s AND company_id = %s
+    UNION ALL
+    SELECT entry_id, bm25(journal_line_search) FROM journal_line_search
+    WHERE journal_line_search MATCH %s AND company_id = %s
+) hits
+GROUP BY entry_id
+ORDER BY score, entry_id
+LIMIT %s
+"""
+
+
+class JournalSearchError(ValueError):
+    pass
+
+
+def _tokens(query):
+    tokens = _TOKEN_RE.findall(query.lower())
+    if not tokens:
+        raise JournalSearchError("Search query must contain at least one letter or digit.")
+    return tokens
+
+
+def _as_uuid(query):
+    try:
+        return uuid.UUID(query.strip())
+    except ValueError:
+        return None
+
+
+def _postgres_hits(*, company, query, limit):
+    reference_id = _as_uuid(query)
+    tokens = [reference_id.hex] if reference_id else _tokens(query)
+    params = {
+        "company_id": company.id,
+        "text": query.strip(),
+        "tsquery": " & ".join(f"{token}:*" for token in tokens),
+        "reference_id": reference_id,
+        "limit": limit,
+    }
+    with connection.cursor() as cursor:
+        cursor.execute(_POSTGRES_SEARCH_SQL, params)
+        return [(entry_id, float(score)) for entry_id, score in cursor.fetchall()]
+
+
+def _sqlite_hits(*, company, query, limit):
+    # SQLite stores UUIDs as 32-char hex, which is also how reference_id is indexed.
+    reference_id = _as_uuid(query)
+    tokens = [reference_id.hex] if reference_id else _tokens(query)
+    match = " ".join(f'"{token}"*' for token in tokens)
+    company_id = company.id.hex
+    with connection.cursor() as cursor:
+        cursor.execute(_SQLITE_SEARCH_SQL, [match, company_id, match, company_id, limit])
+        return [(uuid.UUID(entry_id), -score) for entry_id, score in cursor.fetchall()]
+
+
+def search_journal_entries(*, company, query, limit=DEFAULT_SEARCH_LIMIT, queryset=None):
+    """Entries whose description, reference or line descriptions match ``query``, best match first.
+
+    Each returned entry carries a ``search_rank``; higher is better.
+    """
+    limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+    if connection.vendor == "postgresql":
+        hits = _postgres_hits(company=company, query=query, limit=limit)
+    elif connection.vendor == "sqlite":
+        hits = _sqlite_hits(company=company, query=query, limit=limit)
+    else:
+        raise JournalSearchError(f"Journal search is not supported on {connection.vendor}.")
+    if not hits:
+        return []
+
+    queryset = queryset if queryset is not None else JournalEntry.objects.all()
+    entries = queryset.filter(company=company).in_bulk([entry_id for entry_id, _ in hits])
+    results = []
+    for entry_id, score in hits:
+        entry = entries.get(entry_id)
+        if entry is not None:
+            entry.search_rank = round(score, 6)
+            results.append(entry)
+    return results
@@ -3,7 +3,9 @@ from decimal import Decimal
 from rest_framework import serializers
 
 from apps.accounting.models import Account
+from apps.common.streaming import SUPPORTED_RECORD_FORMATS
 from apps.journals.models import JournalEntry, JournalLine
+from apps.journals.search import DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT
 
 
 class JournalLineSerializer(serializers.ModelSerializer):
@@ -72,6 +74,18 @@ class JournalEntrySerializer(serializers.ModelSerializer):
         validators = []
 
 
+class JournalSearchResultSerializer(JournalEntrySerializer):
+    rank = serializers.FloatField(source="search_rank", read_only=True)
+
+    class Meta(JournalEntrySerializer.Meta):
+        fields = (*JournalEntrySerializer.Meta.fields, "rank")
+
+
+class JournalSearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(min_length=2, max_length=200)
+    limit = serializers.IntegerField(required=False, min_value=1, max_value=MAX_SEARCH_LIMIT, default=DEFAULT_SEARCH_LIMIT)
+
+
 class JournalLinesReplaceSerializer(serializers.Serializer):
     lines = JournalLineInputSerializer(many=True)
 
@@ -99,3 +113,28 @@ class JournalLinesReplaceSerializer(serializers.Serializer):
                 }
             )
         return payload
+
+
+class JournalLinesUpdateSerializer(JournalLinesReplaceSerializer):
+    lines = JournalLineInputSerializer(many=True, default=list)
+    delete_line_nos = serializers.ListField(child=serializers.IntegerField(min_value=1), default=list)
+
+    def validate_lines(self, value):
+        if any("line_no" not in line for line in value):
+            raise serializers.ValidationError("Every line needs a line_no when editing lines.")
+        return value
+
+    def validate(self, attrs):
+        if not attrs["lines"] and not attrs["delete_line_nos"]:
+            raise serializers.ValidationError("Send lines to upsert or delete_line_nos to remove.")
+        return attrs
+
+
+class JournalImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    file_format = serializers.ChoiceField(choices=SUPPORTED_RECORD_FORMATS, required=False)
+    post = serializers.BooleanField(required=False, default=True)
+
+
+class JournalBulkVoidSerializer(serializers.Serializer):
+    entry_ids = serializers.ListField(child=serializers.UUIDField(), allow_empty=False, max_length=1000)
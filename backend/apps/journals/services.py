@@ -4,14 +4,28 @@ from django.db import transaction
 from django.db.models import Sum
 from django.utils import timezone
 
-from apps.accounting.services import get_next_sequence_value
-from apps.journals.models import JournalEntry, JournalLine, JournalStatus
+from apps.accounting.services import allocate_sequence_block, get_next_sequence_value
+from apps.common.line_sync import LineSyncError, sync_rows
+from apps.journals.models import JournalEntry, JournalLine, JournalStatus, LedgerArchive, LedgerEventType
+from apps.journals.outbox import record_ledger_events
 
 
 class JournalValidationError(ValueError):
     pass
 
 
+def archived_periods(company):
+    return list(LedgerArchive.objects.filter(company=company).values_list("start_date", "end_date", "fiscal_year"))
+
+
+def assert_period_open(*, company, entry_dates, periods=None):
+    periods = archived_periods(company) if periods is None else periods
+    for entry_date in entry_dates:
+        for start_date, end_date, fiscal_year in periods:
+            if start_date <= entry_date <= end_date:
+                raise JournalValidationError(f"FY{fiscal_year} is archived; entries dated {entry_date} cannot be posted or voided.")
+
+
 def _assert_draft(entry: JournalEntry):
     if entry.status != JournalStatus.DRAFT:
         raise JournalValidationError("Only draft journal entries can be modified.")
@@ -28,35 +42,60 @@ def _assert_balanced(entry: JournalEntry):
         raise JournalValidationError("Journal entry is not balanced (debit must equal credit).")
 
 
-@transaction.atomic
-def replace_journal_lines(*, entry: JournalEntry, lines: list[dict]):
-    entry = JournalEntry.objects.select_for_update().get(id=entry.id)
-    _assert_draft(entry)
+JOURNAL_LINE_FIELDS = ("account", "description", "debit", "credit")
 
-    if not lines:
-        raise JournalValidationError("At least one journal line is required.")
 
-    entry.lines.all().delete()
+def _sync_journal_lines(*, entry: JournalEntry, lines: list[dict], delete_missing: bool, delete_line_nos=()):
+    entry = JournalEntry.objects.select_for_update().get(id=entry.id)
+    _assert_draft(entry)
 
+    incoming = []
     for idx, line in enumerate(lines, start=1):
         account = line["account"]
         if account.company_id != entry.company_id:
             raise JournalValidationError("Journal line account must belong to the same company.")
+        incoming.append(
+            JournalLine(
+                company=entry.company,
+                journal_entry=entry,
+                line_no=line.get("line_no") or idx,
+                account=account,
+                description=line.get("description", ""),
+                debit=line.get("debit", 0),
+                credit=line.get("credit", 0),
+            )
+        )
 
-        JournalLine.objects.create(
-            company=entry.company,
-            journal_entry=entry,
-            line_no=line.get("line_no") or idx,
-            account=account,
-            description=line.get("description", ""),
-            debit=line.get("debit", 0),
-            credit=line.get("credit", 0),
+    try:
+        rows = sync_rows(
+            queryset=entry.lines.all(),
+            incoming=incoming,
+            key="line_no",
+            fields=JOURNAL_LINE_FIELDS,
+            delete_missing=delete_missing,
+            delete_keys=delete_line_nos,
         )
+    except LineSyncError as exc:
+        raise JournalValidationError(str(exc)) from exc
+    if not rows:
+        raise JournalValidationError("At least one journal line is required.")
 
     _assert_balanced(entry)
     return entry
 
 
+@transaction.atomic
+def replace_journal_lines(*, entry: JournalEntry, lines: list[dict]):
+    if not lines:
+        raise JournalValidationError("At least one journal line is required.")
+    return _sync_journal_lines(entry=entry, lines=lines, delete_missing=True)
+
+
+@transaction.atomic
+def update_journal_lines(*, entry: JournalEntry, lines: list[dict], delete_line_nos=()):
+    return _sync_journal_lines(entry=entry, lines=lines, delete_missing=False, delete_line_nos=delete_line_nos)
+
+
 @transaction.atomic
 def post_journal_entry(*, entry: JournalEntry, actor_user):
     entry = JournalEntry.objects.select_for_update().get(id=entry.id)
@@ -66,6 +105,7 @@ def post_journal_entry(*, entry: JournalEntry, actor_user):
         raise JournalValidationError("Journal entry has no lines.")
 
     _assert_balanced(entry)
+    assert_period_open(company=entry.company, entry_dates=[entry.entry_date])
 
     if not entry.entry_no:
         entry.entry_no = get_next_sequence_value(company=entry.company, key="journal_entry")
@@ -74,6 +114,7 @@ def post_journal_entry(*, entry: JournalEntry, actor_user):
     entry.posted_at = timezone.now()
     entry.posted_by_user = actor_user
     entry.save(update_fields=["entry_no", "status", "posted_at", "posted_by_user", "updated_at"])
+    record_ledger_events(event_type=LedgerEventType.POSTED, entries=[entry])
     return entry
 
 
@@ -82,6 +123,7 @@ def void_journal_entry(*, entry: JournalEntry, actor_user):
     entry = JournalEntry.objects.select_for_update().get(id=entry.id)
     if entry.status != JournalStatus.POSTED:
         raise JournalValidationError("Only posted journal entries can be voided.")
+    assert_period_open(company=entry.company, entry_dates=[entry.entry_date])
 
     reversal_entry = JournalEntry.objects.create(
         company=entry.company,
@@ -114,5 +156,72 @@ def void_journal_entry(*, entry: JournalEntry, actor_user):
     entry.voided_at = timezone.now()
     entry.voided_by_user = actor_user
     entry.save(update_fields=["status", "voided_at", "voided_by_user", "updated_at"])
+    record_ledger_events(event_type=LedgerEventType.VOIDED, entries=[entry])
+    record_ledger_events(event_type=LedgerEventType.POSTED, entries=[reversal_entry])
 
     return entry, reversal_entry
+
+
+@transaction.atomic
+def void_journal_entries(*, company, entry_ids, actor_user):
+    """Void many posted entries at once; either every entry is reversed or none are."""
+    entry_ids = list(dict.fromkeys(entry_ids))
+    if not entry_ids:
+        raise JournalValidationError("At least one journal entry is required.")
+
+    entries = list(
+        JournalEntry.objects.select_for_update()
+        .filter(company=company, id__in=entry_ids)
+        .order_by("entry_no", "created_at")
+    )
+    if len(entries) != len(entry_ids):
+        found = {entry.id for entry in entries}
+        missing = [str(entry_id) for entry_id in entry_ids if entry_id not in found]
+        raise JournalValidationError(f"Journal entries not found in this company: {', '.join(missing)}.")
+    not_posted = [str(entry.entry_no or entry.id) for entry in entries if entry.status != JournalStatus.POSTED]
+    if not_posted:
+        raise JournalValidationError(f"Only posted journal entries can be voided: {', '.join(not_posted)}.")
+    assert_period_open(company=company, entry_dates={entry.entry_date for entry in entries})
+
+    now = timezone.now()
+    first_entry_no = allocate_sequence_block(company=company, key="journal_entry", count=len(entries))
+    reversals = {}
+    for offset, entry in enumerate(entries):
+        reversals[entry.id] = JournalEntry(
+            company=company,
+            entry_no=first_entry_no + offset,
+            status=JournalStatus.POSTED,
+            entry_date=now.date(),
+            description=f"Reversal of JE #{entry.entry_no or entry.id}",
+            reference_type="journal_reversal",
+            reference_id=entry.id,
+            posted_at=now,
+            posted_by_user=actor_user,
+        )
+    JournalEntry.objects.bulk_create(reversals.values())
+
+    reversal_lines = []
+    original_lines = JournalLine.objects.filter(journal_entry_id__in=reversals).order_by("journal_entry_id", "line_no")
+    for line in original_lines.iterator(chunk_size=2000):
+        reversal_lines.append(
+            JournalLine(
+                company=company,
+                journal_entry=reversals[line.journal_entry_id],
+                line_no=line.line_no,
+                account_id=line.account_id,
+                description=f"Reversal: {line.description}".strip(),
+                debit=line.credit,
+                credit=line.debit,
+            )
+        )
+    JournalLine.objects.bulk_create(reversal_lines, batch_size=2000)
+
+    JournalEntry.objects.filter(id__in=reversals).update(
+        status=JournalStatus.VOID,
+        voided_at=now,
+        voided_by_user=actor_user,
+        updated_at=now,
+    )
+    record_ledger_events(event_type=LedgerEventType.VOIDED, entries=entries)
+    record_ledger_events(event_type=LedgerEventType.POSTED, entries=list(reversals.values()))
+    return [(entry, reversals[entry.id]) for entry in entries]
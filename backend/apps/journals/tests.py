@@ -1,8 +1,28 @@
+import io
+import uuid
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.test import APITestCase
 
 from apps.accounting.models import Account
 from apps.companies.services import create_company_for_user
+from apps.journals.models import (
+    JournalEntry,
+    JournalLine,
+    JournalStatus,
+    LedgerConsumerCheckpoint,
+    LedgerEventType,
+    LedgerOutboxEvent,
+)
+from apps.journals.outbox import drain_ledger_outbox, register_ledger_consumer, reset_ledger_checkpoint
+from apps.journals.partitioning import build_partition_statements, journal_lines_are_partitioned, partition_journal_lines
+from apps.journals.search import search_journal_entries
 from apps.users.models import User
 
 
@@ -133,6 +153,124 @@ class JournalApiTests(APITestCase):
         self.assertEqual(void_response.status_code, status.HTTP_200_OK)
         self.assertIn("reversal_id", void_response.data)
 
+    def test_bulk_void_reverses_entries_in_one_block(self):
+        journal_ids = []
+        for amount in ("10.00", "20.00", "30.00"):
+            journal_id = self._create_draft_journal()
+            self._replace_lines(
+                journal_id,
+                [
+                    {"account_id": str(self.cash.id), "debit": amount, "credit": "0.00"},
+                    {"account_id": str(self.revenue.id), "debit": "0.00", "credit": amount},
+                ],
+            )
+            self.client.post(f"/api/v1/journals/companies/{self.company.id}/journals/{journal_id}/post/", {}, format="json")
+            journal_ids.append(journal_id)
+        draft_id = self._create_draft_journal()
+        url = f"/api/v1/journals/companies/{self.company.id}/journals/void/"
+
+        rejected = self.client.post(url, {"entry_ids": [journal_ids[0], draft_id]}, format="json")
+        self.assertEqual(rejected.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(JournalEntry.objects.filter(company=self.company, status=JournalStatus.VOID).count(), 0)
+
+        response = self.client.post(url, {"entry_ids": journal_ids}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["voided_count"], 3)
+        self.assertEqual([row["reversal_entry_no"] for row in response.data["results"]], [4, 5, 6])
+        self.assertEqual(JournalEntry.objects.filter(id__in=journal_ids, status=JournalStatus.VOID).count(), 3)
+        reversal = JournalEntry.objects.get(id=response.data["results"][2]["reversal_id"])
+        self.assertEqual(
+            [(line.account_id, line.debit, line.credit) for line in reversal.lines.order_by("line_no")],
+            [(self.cash.id, Decimal("0"), Decimal("30.00")), (self.revenue.id, Decimal("30.00"), Decimal("0"))],
+        )
+
+    def test_outbox_feeds_consumer_with_checkpoint_and_replay(self):
+        seen = []
+        register_ledger_consumer("test-journal-feed")(lambda events: seen.extend(events))
+        journal_id = self._create_draft_journal()
+        self._replace_lines(
+            journal_id,
+            [
+                {"account_id": str(self.cash.id), "debit": "40.00", "credit": "0.00"},
+                {"account_id": str(self.revenue.id), "debit": "0.00", "credit": "40.00"},
+            ],
+        )
+        self.client.post(f"/api/v1/journals/companies/{self.company.id}/journals/{journal_id}/post/", {}, format="json")
+        self.client.post(f"/api/v1/journals/companies/{self.company.id}/journals/{journal_id}/void/", {}, format="json")
+
+        self.assertEqual(drain_ledger_outbox(consumer="test-journal-feed", batch_size=2), 3)
+        self.assertEqual(
+            [event.event_type for event in seen],
+            [LedgerEventType.POSTED, LedgerEventType.VOIDED, LedgerEventType.POSTED],
+        )
+        self.assertEqual(str(seen[0].journal_entry_id), journal_id)
+        self.assertEqual(seen[0].payload["entry_no"], 1)
+        self.assertEqual(drain_ledger_outbox(consumer="test-journal-feed"), 0)
+
+        reset_ledger_checkpoint(consumer="test-journal-feed", position=seen[0].id, company=self.company)
+        self.assertEqual(drain_ledger_outbox(consumer="test-journal-feed", company=self.company), 2)
+
+    def test_drain_command_feeds_discovered_consumer(self):
+        journal_id = self._create_draft_journal()
+        self._replace_lines(
+            journal_id,
+            [
+                {"account_id": str(self.cash.id), "debit": "40.00", "credit": "0.00"},
+                {"account_id": str(self.revenue.id), "debit": "0.00", "credit": "40.00"},
+            ],
+        )
+        self.client.post(f"/api/v1/journals/companies/{self.company.id}/journals/{journal_id}/post/", {}, format="json")
+
+        out = io.StringIO()
+        with self.assertLogs("apps.journals.ledger_consumers", level="INFO") as logs:
+            call_command("drain_ledger_outbox", "ledger-log", "--company", str(self.company.id), stdout=out)
+        self.assertIn("ledger-log: processed=1", out.getvalue())
+        self.assertIn(journal_id, logs.output[0])
+        checkpoint = LedgerConsumerCheckpoint.objects.get(consumer="ledger-log", company=self.company)
+        self.assertEqual(checkpoint.position, LedgerOutboxEvent.objects.get(journal_entry_id=journal_id).id)
+
+        call_command("drain_ledger_outbox", "ledger-log", stdout=out)
+        self.assertIn("ledger-log: processed=0", out.getvalue())
+        with self.assertRaisesMessage(CommandError, "Unknown ledger consumer 'missing'."):
+            call_command("drain_ledger_outbox", "missing", stdout=out)
+
+    def test_search_ranks_entries_by_description_line_and_reference(self):
+        def entry(company, description, line_description="", **fields):
+            journal = JournalEntry.objects.create(company=company, entry_date="2026-03-31", description=description, **fields)
+            if line_description:
+                JournalLine.objects.create(
+                    company=company,
+                    journal_entry=journal,
+                    line_no=1,
+                    account=self.cash,
+                    description=line_description,
+                    debit=Decimal("10.00"),
+                )
+            return journal
+
+        accrual = entry(self.company, "Acme accrual for March services")
+        by_line = entry(self.company, "Month-end adjustments", line_description="Acme freight accrual")
+        unrelated = entry(self.company, "Office rent", reference_type="bill", reference_id=uuid.uuid4())
+        entry(self.other_company, "Acme accrual for March services")
+        url = f"/api/v1/journals/companies/{self.company.id}/journals/search/"
+        self.client.force_authenticate(user=self.owner)
+
+        response = self.client.get(url, {"q": "acme accr"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual({row["id"] for row in response.data["results"]}, {str(accrual.id), str(by_line.id)})
+        self.assertGreaterEqual(response.data["results"][0]["rank"], response.data["results"][1]["rank"])
+
+        by_reference = self.client.get(url, {"q": str(unrelated.reference_id)})
+        self.assertEqual([row["id"] for row in by_reference.data["results"]], [str(unrelated.id)])
+
+        JournalEntry.objects.filter(id=accrual.id).update(description="Globex accrual")
+        self.assertEqual(self.client.get(url, {"q": "acme"}).data["count"], 1)
+        by_line.lines.all().delete()
+        unrelated.delete()
+        self.assertEqual(self.client.get(url, {"q": "acme"}).data["count"], 0)
+        self.assertEqual(self.client.get(url, {"q": "globex"}).data["count"], 1)
+        self.assertEqual(self.client.get(url, {"q": "?!"}).status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_sequence_increments_per_company(self):
         first_id = self._create_draft_journal()
         self._replace_lines(
@@ -180,3 +318,162 @@ class JournalApiTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["count"], 2)
         self.assertEqual(len(response.data["results"]), 1)
+
+    def _query_count(self, url):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(captured), response
+
+    def test_journal_list_and_detail_query_count_is_constant(self):
+        journal_ids = []
+        for line_pairs in (1, 2, 3):
+            journal_id = self._create_draft_journal()
+            lines = []
+            for _ in range(line_pairs):
+                lines.append({"account_id": str(self.cash.id), "debit": "10.00", "credit": "0.00"})
+                lines.append({"account_id": str(self.revenue.id), "debit": "0.00", "credit": "10.00"})
+            self.assertEqual(self._replace_lines(journal_id, lines).status_code, status.HTTP_200_OK)
+            journal_ids.append(journal_id)
+
+        base_url = f"/api/v1/journals/companies/{self.company.id}/journals/"
+        single_page, _ = self._query_count(f"{base_url}?page_size=1")
+        full_page, response = self._query_count(f"{base_url}?page_size=3")
+        self.assertEqual(single_page, full_page)
+        self.assertEqual(response.data["results"][0]["lines"][0]["account_code"], "1000")
+
+        small_detail, _ = self._query_count(f"{base_url}{journal_ids[0]}/")
+        large_detail, _ = self._query_count(f"{base_url}{journal_ids[2]}/")
+        self.assertEqual(small_detail, large_detail)
+
+    def test_bulk_import_posts_balanced_entries_and_reports_failures(self):
+        self.client.force_authenticate(user=self.owner)
+        content = "\n".join(
+            [
+                "entry_ref,entry_date,description,account,debit,credit,line_description",
+                "P-1,2026-02-01,Payroll,1000,,100.00,Net pay",
+                "P-1,,,4000,100.00,,Accrual",
+                "P-2,2026-02-02,Unbalanced,1000,50.00,,",
+                "P-2,,,4000,,40.00,",
+                "P-3,2026-02-03,POS,1000,25.00,,",
+                "P-3,,,4000,,25.00,",
+                "P-4,2026-02-04,Unknown account,9999,10.00,,",
+                "P-4,,,4000,,10.00,",
+                "P-5,2026-02-05,Not a number,1000,NaN,,",
+                "P-5,,,4000,,NaN,",
+                "P-6,2026-02-06,Infinite,1000,Infinity,,",
+                "P-6,,,4000,,Infinity,",
+                "P-7,2026-02-07,Sub-cent,1000,0.00001,,",
+                "P-7,,,4000,,0.00001,",
+                "P-8,2026-02-08,Too large,1000,1e30,,",
+                "P-8,,,4000,,1e30,",
+            ]
+        )
+        response = self.client.post(
+            f"/api/v1/journals/companies/{self.company.id}/journals/import/",
+            {"file": SimpleUploadedFile("journals.csv", content.encode("utf-8"), content_type="text/csv")},
+            format="multipart",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["entries_created"], 2)
+        self.assertEqual(response.data["lines_created"], 4)
+        self.assertEqual([error["ref"] for error in response.data["errors"]], ["P-2", "P-4", "P-5", "P-6", "P-7", "P-8"])
+        entries = JournalEntry.objects.filter(company=self.company).order_by("entry_no")
+        self.assertEqual([entry.entry_no for entry in entries], [1, 2])
+        self.assertTrue(all(entry.status == JournalStatus.POSTED for entry in entries))
+        self.assertEqual(
+            (response.data["first_entry_no"], response.data["last_entry_no"]),
+            (1, 2),
+        )
+
+    @skipUnless(connection.vendor == "postgresql", "journal_line partitioning requires PostgreSQL.")
+    def test_partition_journal_lines_keeps_rows_constraints_and_search_indexes(self):
+        other_cash = Account.objects.create(
+            company=self.other_company, code="1000", name="Cash", type="asset", normal_balance="debit"
+        )
+        for company, account in ((self.company, self.cash), (self.other_company, other_cash)):
+            for index in range(3):
+                journal = JournalEntry.objects.create(company=company, entry_date="2026-03-31", description=f"Entry {index}")
+                JournalLine.objects.create(
+                    company=company,
+                    journal_entry=journal,
+                    line_no=1,
+                    account=account,
+                    description=f"Acme freight {index}",
+                    debit=Decimal("10.00"),
+                )
+        table = JournalLine._meta.db_table
+        with connection.cursor() as cursor:
+            # Rows written in the test transaction leave deferred FK checks pending, which block ALTER TABLE.
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+            constraints_before = connection.introspection.get_constraints(cursor, table)
+
+        partition_journal_lines(partitions=4)
+
+        self.assertTrue(journal_lines_are_partitioned())
+        self.assertEqual(JournalLine.objects.filter(company=self.company).count(), 3)
+        self.assertEqual(JournalLine.objects.filter(company=self.other_company).count(), 3)
+        with connection.cursor() as cursor:
+            constraints_after = connection.introspection.get_constraints(cursor, table)
+            cursor.execute("SELECT count(*) FROM pg_inherits WHERE inhparent = to_regclass(%s)", [table])
+            partition_count = cursor.fetchone()[0]
+            cursor.execute("SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s", [table])
+            index_definitions = dict(cursor.fetchall())
+        self.assertEqual(partition_count, 4)
+        self.assertEqual(set(constraints_after), set(constraints_before))
+        primary_key = next(spec for spec in constraints_after.values() if spec["primary_key"])
+        self.assertEqual(primary_key["columns"], ["id", "company_id"])
+        self.assertIn("gin", index_definitions["journal_line_search_tsv"])
+        self.assertIn("gin_trgm_ops", index_definitions["journal_line_description_trgm"])
+
+        line = JournalLine.objects.filter(company=self.company).first()
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            JournalLine.objects.create(
+                company=self.company, journal_entry=line.journal_entry, line_no=1, account=self.cash, debit=Decimal("1.00")
+            )
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            JournalLine.objects.create(company=self.company, journal_entry=line.journal_entry, line_no=2, account=self.cash)
+        self.assertEqual(search_journal_entries(company=self.company, query="acme freight")[0].company_id, self.company.id)
+
+    def test_bulk_import_rejects_malformed_csv(self):
+        self.client.force_authenticate(user=self.owner)
+        content = "entry_ref,entry_date,description,account,debit,credit\nP-1,2026-02-01," + "x" * 200000 + ",1000,1,\n"
+        response = self.client.post(
+            f"/api/v1/journals/companies/{self.company.id}/journals/import/",
+            {"file": SimpleUploadedFile("journals.csv", content.encode("utf-8"), content_type="text/csv")},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_partition_statements_add_company_to_keys_and_keep_names(self):
+        def constraint(columns, **flags):
+            spec = {"primary_key": False, "unique": False, "foreign_key": None, "check": False, "index": False}
+            spec.update(flags, columns=columns)
+            return spec
+
+        statements = build_partition_statements(
+            table="journal_line",
+            constraints={
+                "journal_line_pkey": constraint(["id"], primary_key=True, unique=True),
+                "journal_line_uniq": constraint(["company_id", "journal_entry_id", "line_no"], unique=True),
+                "journal_line_account_fk": constraint(["account_id"], foreign_key=("account", "id")),
+                "journal_line_account_idx": constraint(["account_id"], index=True, type="idx"),
+                "journal_line_description_trgm": constraint(["description"], index=True, type="gin"),
+                "journal_line_one_side_only": constraint(["debit", "credit"], check=True),
+            },
+            partitions=4,
+            index_definitions={
+                "journal_line_description_trgm": "CREATE INDEX journal_line_description_trgm ON public.journal_line "
+                "USING gin (description gin_trgm_ops)",
+            },
+        )
+
+        self.assertIn('PARTITION BY HASH ("company_id")', statements[1])
+        self.assertEqual(sum("PARTITION OF" in statement for statement in statements), 4)
+        self.assertIn('CONSTRAINT "journal_line_pkey" PRIMARY KEY ("id", "company_id")', statements[-2])
+        self.assertIn('UNIQUE ("company_id", "journal_entry_id", "line_no")', statements[-1])
+        self.assertFalse(any("journal_line_one_side_only" in statement for statement in statements))
+        self.assertIn("USING gin (description gin_trgm_ops)", statements[-3])
+        self.assertLess(statements.index('DROP TABLE "journal_line_unpartitioned"'), len(statements) - 4)
+
@@ -3,16 +3,22 @@ from django.urls import path
 from apps.journals.views import (
     AccountLedgerView,
     GeneralLedgerView,
+    JournalBulkVoidView,
     JournalDetailUpdateView,
+    JournalImportView,
     JournalLinesReplaceView,
     JournalListCreateView,
     JournalPostView,
+    JournalSearchView,
     JournalVoidView,
     TrialBalanceView,
 )
 
 urlpatterns = [
     path("companies/<uuid:company_id>/journals/", JournalListCreateView.as_view(), name="journal_list_create"),
+    path("companies/<uuid:company_id>/journals/import/", JournalImportView.as_view(), name="journal_import"),
+    path("companies/<uuid:company_id>/journals/search/", JournalSearchView.as_view(), name="journal_search"),
+    path("companies/<uuid:company_id>/journals/void/", JournalBulkVoidView.as_view(), name="journal_bulk_void"),
     path("companies/<uuid:company_id>/journals/<uuid:journal_id>/", JournalDetailUpdateView.as_view(), name="journal_detail"),
     path(
         "companies/<uuid:company_id>/journals/<uuid:journal_id>/lines/",
@@ -1,15 +1,44 @@
-from django.db.models import Sum
+import csv
+from itertools import chain
+
+from django.db.models import Prefetch, Sum
 from rest_framework import generics, permissions, response, status, views
 
 from apps.audit.services import log_audit_event
 from apps.common.pagination import DefaultListPagination
+from apps.common.streaming import RecordFormatError, detect_record_format, open_text_stream
 from apps.common.tenant import get_company_for_user_or_404, user_has_permission_in_company
-from apps.journals.models import JournalEntry, JournalLine, JournalStatus
-from apps.journals.serializers import JournalEntrySerializer, JournalLinesReplaceSerializer, JournalLineSerializer
-from apps.journals.services import JournalValidationError, post_journal_entry, replace_journal_lines, void_journal_entry
+from apps.journals.archive import LEDGER_LINE_ORDER, LedgerLines
+from apps.journals.bulk_import import import_journal_entries
+from apps.journals.models import ArchivedAccountTotal, JournalEntry, JournalLine, JournalStatus
+from apps.journals.search import JournalSearchError, search_journal_entries
+from apps.journals.serializers import (
+    JournalBulkVoidSerializer,
+    JournalEntrySerializer,
+    JournalImportSerializer,
+    JournalLinesReplaceSerializer,
+    JournalLinesUpdateSerializer,
+    JournalLineSerializer,
+    JournalSearchQuerySerializer,
+    JournalSearchResultSerializer,
+)
+from apps.journals.services import (
+    JournalValidationError,
+    post_journal_entry,
+    replace_journal_lines,
+    update_journal_lines,
+    void_journal_entries,
+    void_journal_entry,
+)
 from apps.rbac.constants import PERMISSION_ACCOUNTING_POST, PERMISSION_ACCOUNTING_VIEW
 
 
+def _journal_queryset(company):
+    # JournalLineSerializer renders account code/name, so lines must arrive with their accounts.
+    lines = JournalLine.objects.select_related("account").order_by("line_no")
+    return JournalEntry.objects.filter(company=company).prefetch_related(Prefetch("lines", queryset=lines))
+
+
 class JournalListCreateView(generics.ListCreateAPIView):
     serializer_class = JournalEntrySerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -26,7 +55,7 @@ class JournalListCreateView(generics.ListCreateAPIView):
             permission_code=PERMISSION_ACCOUNTING_VIEW,
         ):
             return JournalEntry.objects.none()
-        return JournalEntry.objects.filter(company=company).prefetch_related("lines")
+        return _journal_queryset(company)
 
     def list(self, request, *args, **kwargs):
         company = self._company()
@@ -53,6 +82,79 @@ class JournalListCreateView(generics.ListCreateAPIView):
         return response.Response(self.get_serializer(entry).data, status=status.HTTP_201_CREATED)
 
 
+class JournalImportView(views.APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, company_id):
+        company = get_company_for_user_or_404(user=request.user, company_id=company_id)
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_POST,
+        ):
+            return response.Response({"detail": "Insufficient accounting post permission."}, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = JournalImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.validated_data["file"]
+        try:
+            record_format = detect_record_format(
+                file_name=upload.name,
+                requested=serializer.validated_data.get("file_format", ""),
+            )
+            summary = import_journal_entries(
+                company=company,
+                text_stream=open_text_stream(upload.file),
+                record_format=record_format,
+                actor_user=request.user,
+                post=serializer.validated_data["post"],
+            )
+        except (RecordFormatError, csv.Error, UnicodeDecodeError) as exc:
+            return response.Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        log_audit_event(
+            company=company,
+            actor_user=request.user,
+            action="journal.import",
+            entity_type="journal_entry",
+            metadata={
+                "file_name": upload.name,
+                "entries_created": summary["entries_created"],
+                "entries_failed": summary["entries_failed"],
+                "posted": summary["posted"],
+            },
+            ip_address=request.META.get("REMOTE_ADDR"),
+            user_agent=request.headers.get("User-Agent", ""),
+        )
+        return response.Response(summary)
+
+
+class JournalSearchView(views.APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, company_id):
+        company = get_company_for_user_or_404(user=request.user, company_id=company_id)
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_VIEW,
+        ):
+            return response.Response({"detail": "Insufficient accounting view permission."}, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = JournalSearchQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        try:
+            entries = search_journal_entries(
+                company=company,
+                query=serializer.validated_data["q"],
+                limit=serializer.validated_data["limit"],
+                queryset=_journal_queryset(company),
+            )
+        except JournalSearchError as exc:
+            return response.Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return response.Response({"count": len(entries), "results": JournalSearchResultSerializer(entries, many=True).data})
+
+
 class JournalDetailUpdateView(generics.RetrieveUpdateAPIView):
     serializer_class = JournalEntrySerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -62,7 +164,7 @@ class JournalDetailUpdateView(generics.RetrieveUpdateAPIView):
 
     def get_object(self):
         company = self._company()
-        return generics.get_object_or_404(JournalEntry, company=company, id=self.kwargs["journal_id"])
+        return generics.get_object_or_404(_journal_queryset(company), id=self.kwargs["journal_id"])
 
     def retrieve(self, request, *args, **kwargs):
         company = self._company()
@@ -110,7 +212,33 @@ class JournalLinesReplaceView(views.APIView):
         except JournalValidationError as exc:
             return response.Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
-        output = JournalEntrySerializer(entry)
+        output = JournalEntrySerializer(_journal_queryset(company).get(id=entry.id))
+        return response.Response(output.data)
+
+    def patch(self, request, company_id, journal_id):
+        company = get_company_for_user_or_404(user=request.user, company_id=company_id)
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_POST,
+        ):
+            return response.Response({"detail": "Insufficient accounting post permission."}, status=status.HTTP_403_FORBIDDEN)
+
+        entry = generics.get_object_or_404(JournalEntry, id=journal_id, company=company)
+        serializer = JournalLinesUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            payload = serializer.to_service_payload(company=company)
+            update_journal_lines(
+                entry=entry,
+                lines=payload,
+                delete_line_nos=serializer.validated_data["delete_line_nos"],
+            )
+        except JournalValidationError as exc:
+            return response.Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        output = JournalEntrySerializer(_journal_queryset(company).get(id=entry.id))
         return response.Response(output.data)
 
 
@@ -142,7 +270,7 @@ class JournalPostView(views.APIView):
             ip_address=request.META.get("REMOTE_ADDR"),
             user_agent=request.headers.get("User-Agent", ""),
         )
-        return response.Response(JournalEntrySerializer(posted).data)
+        return response.Response(JournalEntrySerializer(_journal_queryset(company).get(id=posted.id)).data)
 
 
 class JournalVoidView(views.APIView):
@@ -176,6 +304,49 @@ class JournalVoidView(views.APIView):
         return response.Response({"voided_id": str(voided.id), "reversal_id": str(reversal.id)})
 
 
+class JournalBulkVoidView(views.APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, company_id):
+        company = get_company_for_user_or_404(user=request.user, company_id=company_id)
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_POST,
+        ):
+            return response.Response({"detail": "Insufficient accounting post permission."}, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = JournalBulkVoidSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            voided = void_journal_entries(
+                company=company,
+                entry_ids=serializer.validated_data["entry_ids"],
+                actor_user=request.user,
+            )
+        except JournalValidationError as exc:
+            return response.Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = [
+            {"voided_id": str(entry.id), "reversal_id": str(reversal.id), "reversal_entry_no": reversal.entry_no}
+            for entry, reversal in voided
+        ]
+        log_audit_event(
+            company=company,
+            actor_user=request.user,
+            action="journal.bulk_void",
+            entity_type="journal_entry",
+            metadata={
+                "voided_count": len(results),
+                "first_reversal_entry_no": results[0]["reversal_entry_no"],
+                "last_reversal_entry_no": results[-1]["reversal_entry_no"],
+            },
+            ip_address=request.META.get("REMOTE_ADDR"),
+            user_agent=request.headers.get("User-Agent", ""),
+        )
+        return response.Response({"voided_count": len(results), "results": results})
+
+
 class GeneralLedgerView(views.APIView):
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = DefaultListPagination
@@ -189,10 +360,15 @@ class GeneralLedgerView(views.APIView):
         ):
             return response.Response({"detail": "Insufficient accounting view permission."}, status=status.HTTP_403_FORBIDDEN)
 
-        lines = JournalLine.objects.filter(
+        lines = LedgerLines(
             company=company,
-            journal_entry__status=JournalStatus.POSTED,
-        ).select_related("account", "journal_entry")
+            queryset=JournalLine.objects.filter(
+                company=company,
+                journal_entry__status=JournalStatus.POSTED,
+            )
+            .select_related("account", "journal_entry")
+            .order_by(*LEDGER_LINE_ORDER),
+        )
 
         paginator = self.pagination_class()
         page = paginator.paginate_queryset(lines, request, view=self)
@@ -213,11 +389,17 @@ class AccountLedgerView(views.APIView):
         ):
             return response.Response({"detail": "Insufficient accounting view permission."}, status=status.HTTP_403_FORBIDDEN)
 
-        lines = JournalLine.objects.filter(
+        lines = LedgerLines(
             company=company,
             account_id=account_id,
-            journal_entry__status=JournalStatus.POSTED,
-        ).select_related("journal_entry", "account")
+            queryset=JournalLine.objects.filter(
+                company=company,
+                account_id=account_id,
+                journal_entry__status=JournalStatus.POSTED,
+            )
+            .select_related("journal_entry", "account")
+            .order_by(*LEDGER_LINE_ORDER),
+        )
 
         paginator = self.pagination_class()
         page = paginator.paginate_queryset(lines, request, view=self)
@@ -238,12 +420,24 @@ class TrialBalanceView(views.APIView):
         ):
             return response.Response({"detail": "Insufficient accounting view permission."}, status=status.HTTP_403_FORBIDDEN)
 
-        data = (
+        hot = (
             JournalLine.objects.filter(company=company, journal_entry__status=JournalStatus.POSTED)
             .values("account__id", "account__code", "account__name")
             .annotate(total_debit=Sum("debit"), total_credit=Sum("credit"))
-            .order_by("account__code")
+            .order_by()
+        )
+        archived = (
+            ArchivedAccountTotal.objects.filter(company=company)
+            .values("account__id", "account__code", "account__name")
+            .annotate(total_debit=Sum("debit_total"), total_credit=Sum("credit_total"))
+            .order_by()
         )
+        totals = {}
+        for row in chain(archived, hot):
+            current = totals.setdefault(row["account__id"], {**row, "total_debit": 0, "total_credit": 0})
+            current["total_debit"] += row["total_debit"]
+            current["total_credit"] += row["total_credit"]
+        data = sorted(totals.values(), key=lambda row: row["account__code"])
         paginator = self.pagination_class()
         page = paginator.paginate_queryset(data, request, view=self)
         return paginator.get_paginated_response(list(page))
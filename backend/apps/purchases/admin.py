@@ -1,6 +1,13 @@
 from django.contrib import admin
 
-from apps.purchases.models import Bill, BillLine, VendorPayment, VendorPaymentAllocation
+from apps.purchases.models import (
+    Bill,
+    BillLine,
+    RecurringBillTemplate,
+    RecurringBillTemplateLine,
+    VendorPayment,
+    VendorPaymentAllocation,
+)
 
 
 @admin.register(Bill)
@@ -28,3 +35,16 @@ class VendorPaymentAdmin(admin.ModelAdmin):
 class VendorPaymentAllocationAdmin(admin.ModelAdmin):
     list_display = ("id", "vendor_payment", "bill", "amount")
     list_filter = ("company",)
+
+
+class RecurringBillTemplateLineInline(admin.TabularInline):
+    model = RecurringBillTemplateLine
+    extra = 0
+
+
+@admin.register(RecurringBillTemplate)
+class RecurringBillTemplateAdmin(admin.ModelAdmin):
+    list_display = ("id", "company", "name", "vendor", "frequency", "next_run_date", "is_active")
+    list_filter = ("frequency", "is_active", "company")
+    search_fields = ("name", "vendor__name")
+    inlines = [RecurringBillTemplateLineInline]
@@ -0,0 +1,111 @@
+# Generated by Django 5.2.11 on 2026-10-19 01:36
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0001_initial'),
+        ('companies', '0002_initial'),
+        ('contacts', '0001_initial'),
+        ('journals', '0001_initial'),
+        ('purchases', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecurringBillTemplateLine',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('line_no', models.PositiveIntegerField()),
+                ('description', models.TextField()),
+                ('quantity', models.DecimalField(decimal_places=4, default=1, max_digits=19)),
+                ('unit_cost', models.DecimalField(decimal_places=4, default=0, max_digits=19)),
+            ],
+            options={
+                'db_table': 'recurring_bill_template_line',
+            },
+        ),
+        migrations.AddField(
+            model_name='bill',
+            name='recurring_period',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='RecurringBillTemplate',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(max_length=255)),
+                ('currency_code', models.CharField(default='USD', max_length=3)),
+                ('notes', models.TextField(blank=True)),
+                ('frequency', models.CharField(choices=[('weekly', 'Weekly'), ('monthly', 'Monthly'), ('quarterly', 'Quarterly'), ('yearly', 'Yearly')], default='monthly', max_length=20)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('next_run_date', models.DateField()),
+                ('due_days', models.PositiveIntegerField(default=30)),
+                ('is_active', models.BooleanField(default=True)),
+                ('ap_account', models.ForeignKey(on_delete=django.db.models.deletion.RESTRICT, related_name='recurring_bill_templates', to='accounting.account')),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recurring_bill_templates', to='companies.company')),
+                ('vendor', models.ForeignKey(on_delete=django.db.models.deletion.RESTRICT, related_name='recurring_bill_templates', to='contacts.contact')),
+            ],
+            options={
+                'db_table': 'recurring_bill_template',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='bill',
+            name='recurring_template',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bills', to='purchases.recurringbilltemplate'),
+        ),
+        migrations.AddConstraint(
+            model_name='bill',
+            constraint=models.UniqueConstraint(fields=('recurring_template', 'recurring_period'), name='bill_recurring_period_unique'),
+        ),
+        migrations.AddField(
+            model_name='recurringbilltemplateline',
+            name='company',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recurring_bill_template_lines', to='companies.company'),
+        ),
+        migrations.AddField(
+            model_name='recurringbilltemplateline',
+            name='expense_account',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.RESTRICT, related_name='recurring_bill_template_lines', to='accounting.account'),
+        ),
+        migrations.AddField(
+            model_name='recurringbilltemplateline',
+            name='template',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='purchases.recurringbilltemplate'),
+        ),
+        migrations.AddIndex(
+            model_name='recurringbilltemplate',
+            index=models.Index(fields=['company', 'is_active'], name='recurring_b_company_34912e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recurringbilltemplate',
+            index=models.Index(fields=['is_active', 'next_run_date'], name='recurring_b_is_acti_73d2ad_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recurringbilltemplateline',
+            index=models.Index(fields=['template'], name='recurring_b_templat_f9ec09_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='recurringbilltemplateline',
+            constraint=models.CheckConstraint(condition=models.Q(('quantity__gt', 0)), name='recurring_bill_line_quantity_positive'),
+        ),
+        migrations.AddConstraint(
+            model_name='recurringbilltemplateline',
+            constraint=models.CheckConstraint(condition=models.Q(('unit_cost__gte', 0)), name='recurring_bill_line_unit_cost_non_negative'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='recurringbilltemplateline',
+            unique_together={('company', 'template', 'line_no')},
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.11 on 2026-10-19 01:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0002_tax_code'),
+        ('purchases', '0002_recurring_bill_templates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='billline',
+            name='tax_amount',
+            field=models.DecimalField(decimal_places=4, default=0, max_digits=19),
+        ),
+        migrations.AddField(
+            model_name='billline',
+            name='tax_code',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.RESTRICT, related_name='bill_lines', to='accounting.taxcode'),
+        ),
+    ]
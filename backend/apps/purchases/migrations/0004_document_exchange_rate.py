@@ -0,0 +1,23 @@
+# Generated by Django 5.2.11 on 2026-10-19 01:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('purchases', '0003_bill_line_tax'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bill',
+            name='exchange_rate',
+            field=models.DecimalField(decimal_places=8, default=1, max_digits=19),
+        ),
+        migrations.AddField(
+            model_name='vendorpayment',
+            name='exchange_rate',
+            field=models.DecimalField(decimal_places=8, default=1, max_digits=19),
+        ),
+    ]
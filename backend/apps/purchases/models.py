@@ -1,8 +1,9 @@
 from django.db import models
 from django.db.models import Q
 
-from apps.accounting.models import Account
+from apps.accounting.models import Account, TaxCode
 from apps.common.models import TimeStampedUUIDModel
+from apps.common.schedules import RecurrenceFrequency
 from apps.companies.models import Company
 from apps.contacts.models import Contact
 from apps.journals.models import JournalEntry
@@ -34,6 +35,7 @@ class Bill(TimeStampedUUIDModel):
     tax_total = models.DecimalField(max_digits=19, decimal_places=4, default=0)
     total = models.DecimalField(max_digits=19, decimal_places=4, default=0)
     amount_paid = models.DecimalField(max_digits=19, decimal_places=4, default=0)
+    exchange_rate = models.DecimalField(max_digits=19, decimal_places=8, default=1)
     notes = models.TextField(blank=True)
     ap_account = models.ForeignKey(Account, on_delete=models.RESTRICT, related_name="ap_bills")
     journal_entry = models.ForeignKey(
@@ -43,10 +45,24 @@ class Bill(TimeStampedUUIDModel):
         blank=True,
         related_name="bills",
     )
+    recurring_template = models.ForeignKey(
+        "RecurringBillTemplate",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="bills",
+    )
+    recurring_period = models.DateField(null=True, blank=True)
 
     class Meta:
         db_table = "bill"
         unique_together = (("company", "bill_no"),)
+        constraints = [
+            models.UniqueConstraint(
+                fields=["recurring_template", "recurring_period"],
+                name="bill_recurring_period_unique",
+            )
+        ]
         indexes = [
             models.Index(fields=["company", "status"]),
             models.Index(fields=["company", "vendor"]),
@@ -67,6 +83,14 @@ class BillLine(TimeStampedUUIDModel):
     unit_cost = models.DecimalField(max_digits=19, decimal_places=4, default=0)
     line_total = models.DecimalField(max_digits=19, decimal_places=4, default=0)
     expense_account = models.ForeignKey(Account, on_delete=models.RESTRICT, related_name="bill_lines")
+    tax_code = models.ForeignKey(
+        TaxCode,
+        on_delete=models.RESTRICT,
+        null=True,
+        blank=True,
+        related_name="bill_lines",
+    )
+    tax_amount = models.DecimalField(max_digits=19, decimal_places=4, default=0)
 
     class Meta:
         db_table = "bill_line"
@@ -89,6 +113,7 @@ class VendorPayment(TimeStampedUUIDModel):
     paid_date = models.DateField()
     amount = models.DecimalField(max_digits=19, decimal_places=4)
     currency_code = models.CharField(max_length=3, default="USD")
+    exchange_rate = models.DecimalField(max_digits=19, decimal_places=8, default=1)
     payment_account = models.ForeignKey(Account, on_delete=models.RESTRICT, related_name="vendor_payments")
     journal_entry = models.ForeignKey(
         JournalEntry,
@@ -117,3 +142,59 @@ class VendorPaymentAllocation(TimeStampedUUIDModel):
         unique_together = (("company", "vendor_payment", "bill"),)
         constraints = [models.CheckConstraint(check=Q(amount__gt=0), name="vendor_payment_allocation_amount_positive")]
         indexes = [models.Index(fields=["vendor_payment"])]
+
+
+class RecurringBillTemplate(TimeStampedUUIDModel):
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name="recurring_bill_templates")
+    name = models.CharField(max_length=255)
+    vendor = models.ForeignKey(Contact, on_delete=models.RESTRICT, related_name="recurring_bill_templates")
+    ap_account = models.ForeignKey(Account, on_delete=models.RESTRICT, related_name="recurring_bill_templates")
+    currency_code = models.CharField(max_length=3, default="USD")
+    notes = models.TextField(blank=True)
+    frequency = models.CharField(
+        max_length=20,
+        choices=RecurrenceFrequency.choices,
+        default=RecurrenceFrequency.MONTHLY,
+    )
+    start_date = models.DateField()
+    end_date = models.DateField(null=True, blank=True)
+    next_run_date = models.DateField()
+    due_days = models.PositiveIntegerField(default=30)
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        db_table = "recurring_bill_template"
+        indexes = [
+            models.Index(fields=["company", "is_active"]),
+            models.Index(fields=["is_active", "next_run_date"]),
+        ]
+        ordering = ["name"]
+
+    def __str__(self):
+        return f"{self.company_id}:{self.name}:{self.frequency}"
+
+
+class RecurringBillTemplateLine(TimeStampedUUIDModel):
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name="recurring_bill_template_lines")
+    template = models.ForeignKey(RecurringBillTemplate, on_delete=models.CASCADE, related_name="lines")
+    line_no = models.PositiveIntegerField()
+    description = models.TextField()
+    quantity = models.DecimalField(max_digits=19, decimal_places=4, default=1)
+    unit_cost = models.DecimalField(max_digits=19, decimal_places=4, default=0)
+    expense_account = models.ForeignKey(
+        Account,
+        on_delete=models.RESTRICT,
+        related_name="recurring_bill_template_lines",
+    )
+
+    class Meta:
+        db_table = "recurring_bill_template_line"
+        unique_together = (("company", "template", "line_no"),)
+        constraints = [
+            models.CheckConstraint(check=Q(quantity__gt=0), name="recurring_bill_line_quantity_positive"),
+            models.CheckConstraint(check=Q(unit_cost__gte=0), name="recurring_bill_line_unit_cost_non_negative"),
+        ]
+        indexes = [models.Index(fields=["template"])]
+
+    def __str__(self):
+        return f"{self.template_id}:{self.line_no}"
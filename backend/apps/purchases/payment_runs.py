@@ -0,0 +1,189 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.accounting.fx import FxRateError, rate_for, realized_fx_line, to_base
+from apps.accounting.services import allocate_sequence_block
+from apps.journals.models import JournalEntry, JournalLine, JournalStatus, LedgerEventType
+from apps.journals.outbox import record_ledger_events
+from apps.journals.services import JournalValidationError, assert_period_open
+from apps.purchases.models import Bill, BillStatus, VendorPayment, VendorPaymentAllocation, VendorPaymentStatus
+from apps.purchases.services import PurchasesValidationError
+
+
+def _select_due_bills(*, company, due_by, vendor_ids=None):
+    bills = (
+        Bill.objects.select_for_update(of=("self",))
+        .filter(
+            company=company,
+            status__in=[BillStatus.POSTED, BillStatus.PARTIALLY_PAID],
+            total__gt=F("amount_paid"),
+        )
+        .annotate(effective_due_date=Coalesce("due_date", "bill_date"))
+        .filter(effective_due_date__lte=due_by)
+        .select_related("vendor", "ap_account")
+        .order_by("vendor__name", "vendor_id", "currency_code", "effective_due_date", "bill_no")
+    )
+    if vendor_ids:
+        bills = bills.filter(vendor_id__in=vendor_ids)
+    return bills
+
+
+def _group_by_vendor(bills):
+    groups = defaultdict(list)
+    for bill in bills:
+        bill.open_amount = bill.total - bill.amount_paid
+        groups[(bill.vendor_id, bill.currency_code)].append(bill)
+    return list(groups.values())
+
+
+def _summary_row(*, bills, payment=None):
+    vendor = bills[0].vendor
+    amount = sum((bill.open_amount for bill in bills), Decimal("0"))
+    return {
+        "payment_id": str(payment.id) if payment else None,
+        "payment_no": payment.payment_no if payment else None,
+        "journal_entry_id": str(payment.journal_entry_id) if payment else None,
+        "vendor_id": str(vendor.id),
+        "vendor_name": vendor.name,
+        "vendor_email": vendor.email,
+        "vendor_tax_id": vendor.tax_id,
+        "vendor_address": vendor.address,
+        "currency_code": bills[0].currency_code,
+        "amount": str(amount),
+        "bills": [
+            {
+                "bill_id": str(bill.id),
+                "bill_no": bill.bill_no,
+                "due_date": bill.effective_due_date.isoformat(),
+                "amount": str(bill.open_amount),
+            }
+            for bill in bills
+        ],
+    }
+
+
+def _with_rows(summary, rows):
+    totals = defaultdict(lambda: Decimal("0"))
+    for row in rows:
+        totals[row["currency_code"]] += Decimal(row["amount"])
+    summary["payments"] = rows
+    summary["totals_by_currency"] = {currency: str(amount) for currency, amount in totals.items()}
+    return summary
+
+
+@transaction.atomic
+def run_vendor_payments(*, company, due_by, paid_date, payment_account, actor_user, vendor_ids=None, dry_run=False):
+    if payment_account.company_id != company.id:
+        raise PurchasesValidationError("Payment account must belong to the selected company.")
+    try:
+        return _run_vendor_payments(
+            company=company,
+            due_by=due_by,
+            paid_date=paid_date,
+            payment_account=payment_account,
+            actor_user=actor_user,
+            vendor_ids=vendor_ids,
+            dry_run=dry_run,
+        )
+    except (FxRateError, JournalValidationError) as exc:
+        raise PurchasesValidationError(str(exc)) from exc
+
+
+def _run_vendor_payments(*, company, due_by, paid_date, payment_account, actor_user, vendor_ids, dry_run):
+    assert_period_open(company=company, entry_dates=[paid_date])
+
+    groups = _group_by_vendor(_select_due_bills(company=company, due_by=due_by, vendor_ids=vendor_ids))
+    summary = {
+        "due_by": due_by.isoformat(),
+        "paid_date": paid_date.isoformat(),
+        "payment_account_id": str(payment_account.id),
+        "dry_run": dry_run,
+        "payment_count": len(groups),
+        "totals_by_currency": {},
+        "payments": [],
+    }
+    if dry_run or not groups:
+        return _with_rows(summary, [_summary_row(bills=bills) for bills in groups])
+
+    # One lock per sequence covers the whole run; each payment takes the next value from its block.
+    first_payment_no = allocate_sequence_block(company=company, key="vendor_payment", count=len(groups))
+    first_entry_no = allocate_sequence_block(company=company, key="journal_entry", count=len(groups))
+    now = timezone.now()
+
+    payments = []
+    entries = []
+    journal_lines = []
+    allocations = []
+    paid_bills = []
+    for offset, bills in enumerate(groups):
+        vendor = bills[0].vendor
+        payment_no = first_payment_no + offset
+        total = Decimal("0")
+        debit_by_account = defaultdict(lambda: Decimal("0"))
+        currency_code = bills[0].currency_code
+        payment = VendorPayment(
+            company=company,
+            payment_no=payment_no,
+            status=VendorPaymentStatus.POSTED,
+            vendor=vendor,
+            paid_date=paid_date,
+            amount=Decimal("0"),
+            currency_code=currency_code,
+            exchange_rate=rate_for(company=company, currency_code=currency_code, on_date=paid_date),
+            payment_account=payment_account,
+            notes=f"Payment run due by {due_by}",
+        )
+        for bill in bills:
+            total += bill.open_amount
+            debit_by_account[bill.ap_account] += to_base(bill.open_amount, bill.exchange_rate)
+            allocations.append(
+                VendorPaymentAllocation(company=company, vendor_payment=payment, bill=bill, amount=bill.open_amount)
+            )
+            bill.amount_paid = bill.total
+            bill.status = BillStatus.PAID
+            bill.updated_at = now
+            paid_bills.append(bill)
+        payment.amount = total
+
+        entry = JournalEntry(
+            company=company,
+            entry_no=first_entry_no + offset,
+            status=JournalStatus.POSTED,
+            entry_date=paid_date,
+            description=f"Vendor Payment {payment_no}",
+            reference_type="vendor_payment",
+            reference_id=payment.id,
+            posted_at=now,
+            posted_by_user=actor_user,
+        )
+        payment.journal_entry = entry
+        credit = to_base(total, payment.exchange_rate)
+        payload = [{"account": payment_account, "debit": Decimal("0"), "credit": credit, "description": "Cash/Bank payment"}]
+        for account, amount in debit_by_account.items():
+            payload.append(
+                {"account": account, "debit": amount, "credit": Decimal("0"), "description": "Accounts Payable settlement"}
+            )
+        fx_line = realized_fx_line(company=company, difference=sum(debit_by_account.values()) - credit)
+        if fx_line:
+            payload.append(fx_line)
+        # A small foreign amount can round to nothing in base currency; such a line carries no value
+        # and would break the one-side-only check, so it is left out.
+        payload = [line for line in payload if line["debit"] or line["credit"]]
+        for line_no, line in enumerate(payload, start=1):
+            journal_lines.append(JournalLine(company=company, journal_entry=entry, line_no=line_no, **line))
+        entries.append(entry)
+        payments.append(payment)
+
+    JournalEntry.objects.bulk_create(entries, batch_size=500)
+    JournalLine.objects.bulk_create(journal_lines, batch_size=500)
+    record_ledger_events(event_type=LedgerEventType.POSTED, entries=entries)
+    VendorPayment.objects.bulk_create(payments, batch_size=500)
+    VendorPaymentAllocation.objects.bulk_create(allocations, batch_size=500)
+    Bill.objects.bulk_update(paid_bills, ["amount_paid", "status", "updated_at"], batch_size=500)
+
+    return _with_rows(summary, [_summary_row(bills=bills, payment=payment) for bills, payment in zip(groups, payments)])
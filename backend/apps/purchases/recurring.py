@@ -0,0 +1,104 @@
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from apps.accounting.services import allocate_sequence_block
+from apps.common.schedules import advance_schedule
+from apps.purchases.models import Bill, BillLine, BillStatus, RecurringBillTemplate, RecurringBillTemplateLine
+
+
+def _build_bill(template, period, bill_no):
+    bill = Bill(
+        company_id=template.company_id,
+        bill_no=bill_no,
+        status=BillStatus.DRAFT,
+        vendor_id=template.vendor_id,
+        bill_date=period,
+        due_date=period + timedelta(days=template.due_days),
+        currency_code=template.currency_code,
+        notes=template.notes,
+        ap_account_id=template.ap_account_id,
+        recurring_template=template,
+        recurring_period=period,
+    )
+    lines = []
+    subtotal = Decimal("0")
+    for template_line in template.lines.all():
+        line_total = (template_line.quantity * template_line.unit_cost).quantize(Decimal("0.0001"))
+        subtotal += line_total
+        lines.append(
+            BillLine(
+                company_id=template.company_id,
+                bill=bill,
+                line_no=template_line.line_no,
+                description=template_line.description,
+                quantity=template_line.quantity,
+                unit_cost=template_line.unit_cost,
+                line_total=line_total,
+                expense_account_id=template_line.expense_account_id,
+            )
+        )
+    bill.subtotal = subtotal
+    bill.tax_total = Decimal("0")
+    bill.total = subtotal
+    return bill, lines
+
+
+@transaction.atomic
+def generate_recurring_bills(*, as_of, company=None):
+    templates = RecurringBillTemplate.objects.select_for_update(of=("self",)).filter(
+        is_active=True,
+        next_run_date__lte=as_of,
+    )
+    if company is not None:
+        templates = templates.filter(company=company)
+    templates = list(
+        templates.select_related("company")
+        .prefetch_related(Prefetch("lines", queryset=RecurringBillTemplateLine.objects.order_by("line_no")))
+        .order_by("company_id", "name", "id")
+    )
+    summary = {"templates_processed": len(templates), "bills_created": 0, "lines_created": 0, "periods_skipped": 0}
+    if not templates:
+        return summary
+
+    # Rows already materialized for (template, period) are skipped, so re-running a date is a no-op.
+    existing = set(
+        Bill.objects.filter(
+            recurring_template__in=templates,
+            recurring_period__gte=min(template.next_run_date for template in templates),
+        ).values_list("recurring_template_id", "recurring_period")
+    )
+
+    due_by_company = defaultdict(list)
+    for template in templates:
+        for period in advance_schedule(template, as_of=as_of):
+            if (template.id, period) in existing:
+                summary["periods_skipped"] += 1
+                continue
+            due_by_company[template.company_id].append((template, period))
+
+    bills = []
+    lines = []
+    for due in due_by_company.values():
+        due.sort(key=lambda item: (item[1], item[0].name, str(item[0].id)))
+        next_no = allocate_sequence_block(company=due[0][0].company, key="bill", count=len(due))
+        for offset, (template, period) in enumerate(due):
+            bill, bill_lines = _build_bill(template, period, next_no + offset)
+            bills.append(bill)
+            lines.extend(bill_lines)
+
+    Bill.objects.bulk_create(bills, batch_size=500)
+    BillLine.objects.bulk_create(lines, batch_size=500)
+
+    now = timezone.now()
+    for template in templates:
+        template.updated_at = now
+    RecurringBillTemplate.objects.bulk_update(templates, ["next_run_date", "is_active", "updated_at"], batch_size=500)
+
+    summary["bills_created"] = len(bills)
+    summary["lines_created"] = len(lines)
+    return summary
@@ -1,10 +1,19 @@
 from decimal import Decimal
 
+from django.db import transaction
 from rest_framework import serializers
 
 from apps.accounting.models import Account
+from apps.accounting.tax import TaxCodeError, get_tax_table
 from apps.contacts.models import Contact
-from apps.purchases.models import Bill, BillLine, VendorPayment, VendorPaymentAllocation
+from apps.purchases.models import (
+    Bill,
+    BillLine,
+    RecurringBillTemplate,
+    RecurringBillTemplateLine,
+    VendorPayment,
+    VendorPaymentAllocation,
+)
 
 
 class BillLineSerializer(serializers.ModelSerializer):
@@ -18,10 +27,12 @@ class BillLineSerializer(serializers.ModelSerializer):
             "unit_cost",
             "line_total",
             "expense_account",
+            "tax_code",
+            "tax_amount",
             "created_at",
             "updated_at",
         )
-        read_only_fields = ("id", "line_total", "created_at", "updated_at")
+        read_only_fields = ("id", "line_total", "tax_amount", "created_at", "updated_at")
 
 
 class BillSerializer(serializers.ModelSerializer):
@@ -38,6 +49,7 @@ class BillSerializer(serializers.ModelSerializer):
             "bill_date",
             "due_date",
             "currency_code",
+            "exchange_rate",
             "subtotal",
             "tax_total",
             "total",
@@ -52,6 +64,7 @@ class BillSerializer(serializers.ModelSerializer):
         read_only_fields = (
             "id",
             "bill_no",
+            "exchange_rate",
             "subtotal",
             "tax_total",
             "total",
@@ -80,10 +93,23 @@ class BillSerializer(serializers.ModelSerializer):
 class BillLinesReplaceSerializer(serializers.Serializer):
     lines = serializers.ListField(child=serializers.DictField(), allow_empty=False)
 
+    def validate_lines(self, value):
+        for line in value:
+            if line.get("line_no") in (None, ""):
+                continue
+            try:
+                line["line_no"] = int(line["line_no"])
+            except (TypeError, ValueError) as exc:
+                raise serializers.ValidationError("line_no must be a whole number.") from exc
+            if line["line_no"] < 1:
+                raise serializers.ValidationError("line_no must be at least 1.")
+        return value
+
     def to_service_payload(self, *, company):
         payload = []
         account_ids = [str(line.get("expense_account_id")) for line in self.validated_data["lines"]]
         accounts = {str(account.id): account for account in Account.objects.filter(company=company, id__in=account_ids)}
+        tax_table = get_tax_table(company)
 
         for idx, line in enumerate(self.validated_data["lines"], start=1):
             account_id = str(line.get("expense_account_id"))
@@ -92,6 +118,10 @@ class BillLinesReplaceSerializer(serializers.Serializer):
                 raise serializers.ValidationError("Expense account must belong to the same company.")
             quantity = Decimal(str(line.get("quantity", "1")))
             unit_cost = Decimal(str(line.get("unit_cost", "0")))
+            try:
+                tax_code = tax_table.resolve(line.get("tax_code_id"))
+            except TaxCodeError as exc:
+                raise serializers.ValidationError(str(exc)) from exc
             payload.append(
                 {
                     "line_no": line.get("line_no") or idx,
@@ -99,11 +129,27 @@ class BillLinesReplaceSerializer(serializers.Serializer):
                     "quantity": quantity,
                     "unit_cost": unit_cost,
                     "expense_account": account,
+                    "tax_code": tax_code,
                 }
             )
         return payload
 
 
+class BillLinesUpdateSerializer(BillLinesReplaceSerializer):
+    lines = serializers.ListField(child=serializers.DictField(), default=list)
+    delete_line_nos = serializers.ListField(child=serializers.IntegerField(min_value=1), default=list)
+
+    def validate_lines(self, value):
+        if any(line.get("line_no") in (None, "") for line in value):
+            raise serializers.ValidationError("Every line needs a line_no when editing lines.")
+        return super().validate_lines(value)
+
+    def validate(self, attrs):
+        if not attrs["lines"] and not attrs["delete_line_nos"]:
+            raise serializers.ValidationError("Send lines to upsert or delete_line_nos to remove.")
+        return attrs
+
+
 class VendorPaymentAllocationSerializer(serializers.ModelSerializer):
     class Meta:
         model = VendorPaymentAllocation
@@ -125,6 +171,7 @@ class VendorPaymentSerializer(serializers.ModelSerializer):
             "paid_date",
             "amount",
             "currency_code",
+            "exchange_rate",
             "payment_account",
             "journal_entry",
             "notes",
@@ -135,6 +182,7 @@ class VendorPaymentSerializer(serializers.ModelSerializer):
         read_only_fields = (
             "id",
             "payment_no",
+            "exchange_rate",
             "journal_entry",
             "created_at",
             "updated_at",
@@ -179,5 +227,116 @@ class VendorPaymentAllocationsReplaceSerializer(serializers.Serializer):
         return payload
 
 
+class VendorPaymentAllocationsUpdateSerializer(VendorPaymentAllocationsReplaceSerializer):
+    allocations = serializers.ListField(child=serializers.DictField(), default=list)
+    delete_bill_ids = serializers.ListField(child=serializers.UUIDField(), default=list)
+
+    def validate(self, attrs):
+        if not attrs["allocations"] and not attrs["delete_bill_ids"]:
+            raise serializers.ValidationError("Send allocations to upsert or delete_bill_ids to remove.")
+        return attrs
+
+
+class RecurringBillTemplateLineSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = RecurringBillTemplateLine
+        fields = ("id", "line_no", "description", "quantity", "unit_cost", "expense_account")
+        read_only_fields = ("id",)
+
+
+class RecurringBillTemplateSerializer(serializers.ModelSerializer):
+    lines = RecurringBillTemplateLineSerializer(many=True)
+
+    class Meta:
+        model = RecurringBillTemplate
+        fields = (
+            "id",
+            "company",
+            "name",
+            "vendor",
+            "ap_account",
+            "currency_code",
+            "notes",
+            "frequency",
+            "start_date",
+            "end_date",
+            "next_run_date",
+            "due_days",
+            "is_active",
+            "created_at",
+            "updated_at",
+            "lines",
+        )
+        read_only_fields = ("id", "next_run_date", "created_at", "updated_at")
+        extra_kwargs = {"company": {"required": False}}
+        validators = []
+
+    def validate(self, attrs):
+        company = self.context.get("company") or attrs.get("company") or getattr(self.instance, "company", None)
+        vendor = attrs.get("vendor") or getattr(self.instance, "vendor", None)
+        ap_account = attrs.get("ap_account") or getattr(self.instance, "ap_account", None)
+        start_date = attrs.get("start_date") or getattr(self.instance, "start_date", None)
+        end_date = attrs.get("end_date", getattr(self.instance, "end_date", None))
+        if company and vendor and vendor.company_id != company.id:
+            raise serializers.ValidationError({"vendor": "Vendor must belong to the selected company."})
+        if vendor and vendor.type not in {"vendor", "both"}:
+            raise serializers.ValidationError({"vendor": "Contact type must be vendor or both."})
+        if company and ap_account and ap_account.company_id != company.id:
+            raise serializers.ValidationError({"ap_account": "AP account must belong to the selected company."})
+        if start_date and end_date and start_date > end_date:
+            raise serializers.ValidationError({"end_date": "End date must be greater than or equal to start date."})
+        lines = attrs.get("lines")
+        if lines is not None:
+            if not lines:
+                raise serializers.ValidationError({"lines": "At least one template line is required."})
+            line_nos = [line["line_no"] for line in lines]
+            if len(set(line_nos)) != len(line_nos):
+                raise serializers.ValidationError({"lines": "Line numbers must be unique."})
+            for line in lines:
+                if company and line["expense_account"].company_id != company.id:
+                    raise serializers.ValidationError({"lines": "Expense account must belong to the same company."})
+                if line.get("quantity", Decimal("1")) <= 0:
+                    raise serializers.ValidationError({"lines": "Quantity must be greater than zero."})
+                if line.get("unit_cost", Decimal("0")) < 0:
+                    raise serializers.ValidationError({"lines": "Unit cost cannot be negative."})
+        return attrs
+
+    def _replace_lines(self, template, lines):
+        template.lines.all().delete()
+        RecurringBillTemplateLine.objects.bulk_create(
+            [RecurringBillTemplateLine(company=template.company, template=template, **line) for line in lines]
+        )
+
+    @transaction.atomic
+    def create(self, validated_data):
+        lines = validated_data.pop("lines")
+        validated_data["next_run_date"] = validated_data["start_date"]
+        template = super().create(validated_data)
+        self._replace_lines(template, lines)
+        return template
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        lines = validated_data.pop("lines", None)
+        template = super().update(instance, validated_data)
+        if lines is not None:
+            self._replace_lines(template, lines)
+        return template
+
+
+class PaymentRunSerializer(serializers.Serializer):
+    due_by = serializers.DateField()
+    paid_date = serializers.DateField(required=False)
+    payment_account = serializers.PrimaryKeyRelatedField(queryset=Account.objects.all())
+    vendor_ids = serializers.ListField(child=serializers.UUIDField(), required=False, allow_empty=True)
+    dry_run = serializers.BooleanField(required=False, default=False)
+
+    def validate_payment_account(self, value):
+        company = self.context.get("company")
+        if company and value.company_id != company.id:
+            raise serializers.ValidationError("Payment account must belong to the selected company.")
+        return value
+
+
 class APAgingQuerySerializer(serializers.Serializer):
     as_of = serializers.DateField(required=False)
@@ -2,9 +2,17 @@ from decimal import Decimal
 
 from django.db import transaction
 
+from apps.accounting.fx import FxRateError, rate_for, realized_fx_line, to_base
 from apps.accounting.services import get_next_sequence_value
+from apps.common.line_sync import LineSyncError, sync_rows
 from apps.journals.models import JournalStatus
-from apps.journals.services import post_journal_entry, replace_journal_lines, void_journal_entry
+from apps.journals.services import (
+    JournalValidationError,
+    assert_period_open,
+    post_journal_entry,
+    replace_journal_lines,
+    void_journal_entry,
+)
 from apps.purchases.models import Bill, BillLine, BillStatus, VendorPayment, VendorPaymentAllocation, VendorPaymentStatus
 
 
@@ -16,23 +24,41 @@ def _bill_open_amount(bill: Bill) -> Decimal:
     return (bill.total or Decimal("0")) - (bill.amount_paid or Decimal("0"))
 
 
-@transaction.atomic
-def replace_bill_lines(*, bill: Bill, lines: list[dict]):
+def _assert_period_open(*, company, on_date):
+    try:
+        assert_period_open(company=company, entry_dates=[on_date])
+    except JournalValidationError as exc:
+        raise PurchasesValidationError(str(exc)) from exc
+
+
+def _exchange_rate(*, company, currency_code, on_date) -> Decimal:
+    try:
+        return rate_for(company=company, currency_code=currency_code, on_date=on_date)
+    except FxRateError as exc:
+        raise PurchasesValidationError(str(exc)) from exc
+
+
+def _fx_difference_line(*, company, difference):
+    try:
+        return realized_fx_line(company=company, difference=difference)
+    except FxRateError as exc:
+        raise PurchasesValidationError(str(exc)) from exc
+
+
+BILL_LINE_FIELDS = ("description", "quantity", "unit_cost", "line_total", "expense_account", "tax_code", "tax_amount")
+
+
+def _sync_bill_lines(*, bill: Bill, lines: list[dict], delete_missing: bool, delete_line_nos=()):
     if bill.status != BillStatus.DRAFT:
         raise PurchasesValidationError("Only draft bills can be edited.")
-    if not lines:
-        raise PurchasesValidationError("At least one bill line is required.")
-
-    bill.lines.all().delete()
-    created_lines = []
-    subtotal = Decimal("0")
 
+    incoming = []
     for line in lines:
         quantity = line["quantity"]
         unit_cost = line["unit_cost"]
+        tax_code = line.get("tax_code")
         line_total = (quantity * unit_cost).quantize(Decimal("0.0001"))
-        subtotal += line_total
-        created_lines.append(
+        incoming.append(
             BillLine(
                 company=bill.company,
                 bill=bill,
@@ -42,17 +68,44 @@ def replace_bill_lines(*, bill: Bill, lines: list[dict]):
                 unit_cost=unit_cost,
                 line_total=line_total,
                 expense_account=line["expense_account"],
+                tax_code_id=tax_code.id if tax_code else None,
+                tax_amount=tax_code.tax_for(line_total) if tax_code else Decimal("0"),
             )
         )
 
-    BillLine.objects.bulk_create(created_lines)
-    bill.subtotal = subtotal
-    bill.tax_total = Decimal("0")
-    bill.total = subtotal
+    try:
+        rows = sync_rows(
+            queryset=bill.lines.select_for_update(),
+            incoming=incoming,
+            key="line_no",
+            fields=BILL_LINE_FIELDS,
+            delete_missing=delete_missing,
+            delete_keys=delete_line_nos,
+        )
+    except LineSyncError as exc:
+        raise PurchasesValidationError(str(exc)) from exc
+    if not rows:
+        raise PurchasesValidationError("At least one bill line is required.")
+
+    bill.subtotal = sum((row.line_total for row in rows), Decimal("0"))
+    bill.tax_total = sum((row.tax_amount for row in rows), Decimal("0"))
+    bill.total = bill.subtotal + bill.tax_total
     bill.save(update_fields=["subtotal", "tax_total", "total", "updated_at"])
     return bill
 
 
+@transaction.atomic
+def replace_bill_lines(*, bill: Bill, lines: list[dict]):
+    if not lines:
+        raise PurchasesValidationError("At least one bill line is required.")
+    return _sync_bill_lines(bill=bill, lines=lines, delete_missing=True)
+
+
+@transaction.atomic
+def update_bill_lines(*, bill: Bill, lines: list[dict], delete_line_nos=()):
+    return _sync_bill_lines(bill=bill, lines=lines, delete_missing=False, delete_line_nos=delete_line_nos)
+
+
 @transaction.atomic
 def post_bill(*, bill: Bill, actor_user):
     bill = Bill.objects.select_for_update().get(id=bill.id)
@@ -62,27 +115,45 @@ def post_bill(*, bill: Bill, actor_user):
         raise PurchasesValidationError("Bill must have at least one line.")
     if bill.total <= 0:
         raise PurchasesValidationError("Bill total must be greater than zero.")
+    _assert_period_open(company=bill.company, on_date=bill.bill_date)
 
     if not bill.bill_no:
         bill.bill_no = get_next_sequence_value(company=bill.company, key="bill")
+    rate = _exchange_rate(company=bill.company, currency_code=bill.currency_code, on_date=bill.bill_date)
+    bill.exchange_rate = rate
 
     line_payload = [
         {
             "account": bill.ap_account,
             "debit": Decimal("0"),
-            "credit": bill.total,
+            "credit": Decimal("0"),
             "description": "Accounts Payable",
         }
     ]
-    for bill_line in bill.lines.select_related("expense_account").all().order_by("line_no"):
+    tax_by_account = {}
+    for bill_line in bill.lines.select_related("expense_account", "tax_code__tax_account").all().order_by("line_no"):
         line_payload.append(
             {
                 "account": bill_line.expense_account,
-                "debit": bill_line.line_total,
+                "debit": to_base(bill_line.line_total, rate),
                 "credit": Decimal("0"),
                 "description": f"Expense: {bill_line.description}",
             }
         )
+        if bill_line.tax_code_id and bill_line.tax_amount:
+            tax_account = bill_line.tax_code.tax_account
+            tax_by_account.setdefault(tax_account.id, [tax_account, Decimal("0")])[1] += bill_line.tax_amount
+    for tax_account, amount in tax_by_account.values():
+        line_payload.append(
+            {
+                "account": tax_account,
+                "debit": to_base(amount, rate),
+                "credit": Decimal("0"),
+                "description": f"Input tax: {tax_account.name}",
+            }
+        )
+    # Payable is the sum of converted debits so per-line rounding never unbalances the entry.
+    line_payload[0]["credit"] = sum((line["debit"] for line in line_payload[1:]), Decimal("0"))
 
     if bill.journal_entry_id:
         journal_entry = bill.journal_entry
@@ -103,7 +174,7 @@ def post_bill(*, bill: Bill, actor_user):
     post_journal_entry(entry=journal_entry, actor_user=actor_user)
 
     bill.status = BillStatus.POSTED
-    bill.save(update_fields=["bill_no", "status", "journal_entry", "updated_at"])
+    bill.save(update_fields=["bill_no", "status", "exchange_rate", "journal_entry", "updated_at"])
     return bill
 
 
@@ -116,6 +187,7 @@ def void_bill(*, bill: Bill, actor_user):
         raise PurchasesValidationError("Cannot void bill with recorded payments.")
     if not bill.journal_entry_id:
         raise PurchasesValidationError("Bill has no journal entry to void.")
+    _assert_period_open(company=bill.company, on_date=bill.journal_entry.entry_date)
 
     void_journal_entry(entry=bill.journal_entry, actor_user=actor_user)
     bill.status = BillStatus.VOID
@@ -123,43 +195,68 @@ def void_bill(*, bill: Bill, actor_user):
     return bill
 
 
-@transaction.atomic
-def replace_vendor_payment_allocations(*, vendor_payment: VendorPayment, allocations: list[dict]):
+def _sync_vendor_payment_allocations(
+    *, vendor_payment: VendorPayment, allocations: list[dict], delete_missing: bool, delete_bill_ids=()
+):
     if vendor_payment.status != VendorPaymentStatus.DRAFT:
         raise PurchasesValidationError("Only draft vendor payments can be edited.")
-    if not allocations:
-        raise PurchasesValidationError("At least one allocation is required.")
 
-    total_allocation = Decimal("0")
+    incoming = []
     for item in allocations:
         bill = item["bill"]
         if bill.vendor_id != vendor_payment.vendor_id:
             raise PurchasesValidationError("Vendor payment allocation bill vendor mismatch.")
+        if bill.currency_code != vendor_payment.currency_code:
+            raise PurchasesValidationError("Vendor payment currency must match the allocated bill currency.")
         open_amount = _bill_open_amount(bill)
         if item["amount"] <= 0:
             raise PurchasesValidationError("Allocation amount must be positive.")
         if item["amount"] > open_amount:
             raise PurchasesValidationError("Allocation exceeds bill open balance.")
-        total_allocation += item["amount"]
-
-    if total_allocation > vendor_payment.amount:
-        raise PurchasesValidationError("Total allocation exceeds vendor payment amount.")
-
-    vendor_payment.allocations.all().delete()
-    VendorPaymentAllocation.objects.bulk_create(
-        [
+        incoming.append(
             VendorPaymentAllocation(
                 company=vendor_payment.company,
                 vendor_payment=vendor_payment,
-                bill=item["bill"],
+                bill=bill,
                 amount=item["amount"],
             )
-            for item in allocations
-        ]
-    )
+        )
+
+    try:
+        rows = sync_rows(
+            queryset=vendor_payment.allocations.select_for_update(),
+            incoming=incoming,
+            key="bill_id",
+            fields=("amount",),
+            delete_missing=delete_missing,
+            delete_keys=delete_bill_ids,
+        )
+    except LineSyncError as exc:
+        raise PurchasesValidationError(str(exc)) from exc
+    if not rows:
+        raise PurchasesValidationError("At least one allocation is required.")
+    if sum(row.amount for row in rows) > vendor_payment.amount:
+        raise PurchasesValidationError("Total allocation exceeds vendor payment amount.")
     return vendor_payment
 
 
+@transaction.atomic
+def replace_vendor_payment_allocations(*, vendor_payment: VendorPayment, allocations: list[dict]):
+    if not allocations:
+        raise PurchasesValidationError("At least one allocation is required.")
+    return _sync_vendor_payment_allocations(vendor_payment=vendor_payment, allocations=allocations, delete_missing=True)
+
+
+@transaction.atomic
+def update_vendor_payment_allocations(*, vendor_payment: VendorPayment, allocations: list[dict], delete_bill_ids=()):
+    return _sync_vendor_payment_allocations(
+        vendor_payment=vendor_payment,
+        allocations=allocations,
+        delete_missing=False,
+        delete_bill_ids=delete_bill_ids,
+    )
+
+
 def _refresh_bill_payment_status(bill: Bill):
     if bill.amount_paid <= 0:
         bill.status = BillStatus.POSTED
@@ -178,17 +275,21 @@ def post_vendor_payment(*, vendor_payment: VendorPayment, actor_user):
     allocations = list(vendor_payment.allocations.select_related("bill", "bill__ap_account").all())
     if not allocations:
         raise PurchasesValidationError("Vendor payment must include at least one allocation.")
+    _assert_period_open(company=vendor_payment.company, on_date=vendor_payment.paid_date)
 
     total_allocation = Decimal("0")
     debit_by_account = {}
     account_lookup = {}
     for allocation in allocations:
+        if allocation.bill.currency_code != vendor_payment.currency_code:
+            raise PurchasesValidationError("Vendor payment currency must match the allocated bill currency.")
         open_amount = _bill_open_amount(allocation.bill)
         if allocation.amount > open_amount:
             raise PurchasesValidationError("Allocation exceeds bill open balance.")
         total_allocation += allocation.amount
         debit_by_account.setdefault(allocation.bill.ap_account_id, Decimal("0"))
-        debit_by_account[allocation.bill.ap_account_id] += allocation.amount
+        # Payables are relieved at the bill's carrying rate; any gap to today's rate is realized FX.
+        debit_by_account[allocation.bill.ap_account_id] += to_base(allocation.amount, allocation.bill.exchange_rate)
         account_lookup[allocation.bill.ap_account_id] = allocation.bill.ap_account
 
     if total_allocation > vendor_payment.amount:
@@ -196,6 +297,11 @@ def post_vendor_payment(*, vendor_payment: VendorPayment, actor_user):
 
     if not vendor_payment.payment_no:
         vendor_payment.payment_no = get_next_sequence_value(company=vendor_payment.company, key="vendor_payment")
+    vendor_payment.exchange_rate = _exchange_rate(
+        company=vendor_payment.company,
+        currency_code=vendor_payment.currency_code,
+        on_date=vendor_payment.paid_date,
+    )
 
     if vendor_payment.journal_entry_id:
         journal_entry = vendor_payment.journal_entry
@@ -216,7 +322,7 @@ def post_vendor_payment(*, vendor_payment: VendorPayment, actor_user):
         {
             "account": vendor_payment.payment_account,
             "debit": Decimal("0"),
-            "credit": total_allocation,
+            "credit": to_base(total_allocation, vendor_payment.exchange_rate),
             "description": "Cash/Bank payment",
         }
     ]
@@ -230,6 +336,10 @@ def post_vendor_payment(*, vendor_payment: VendorPayment, actor_user):
                 "description": "Accounts Payable settlement",
             }
         )
+    difference = sum((line["debit"] for line in lines[1:]), Decimal("0")) - lines[0]["credit"]
+    fx_line = _fx_difference_line(company=vendor_payment.company, difference=difference)
+    if fx_line:
+        lines.append(fx_line)
 
     replace_journal_lines(entry=journal_entry, lines=lines)
     post_journal_entry(entry=journal_entry, actor_user=actor_user)
@@ -239,7 +349,7 @@ def post_vendor_payment(*, vendor_payment: VendorPayment, actor_user):
         _refresh_bill_payment_status(allocation.bill)
 
     vendor_payment.status = VendorPaymentStatus.POSTED
-    vendor_payment.save(update_fields=["payment_no", "status", "journal_entry", "updated_at"])
+    vendor_payment.save(update_fields=["payment_no", "status", "exchange_rate", "journal_entry", "updated_at"])
     return vendor_payment
 
 
@@ -250,6 +360,7 @@ def void_vendor_payment(*, vendor_payment: VendorPayment, actor_user):
         raise PurchasesValidationError("Only posted vendor payments can be voided.")
     if not vendor_payment.journal_entry_id:
         raise PurchasesValidationError("Vendor payment has no journal entry to void.")
+    _assert_period_open(company=vendor_payment.company, on_date=vendor_payment.journal_entry.entry_date)
 
     void_journal_entry(entry=vendor_payment.journal_entry, actor_user=actor_user)
 
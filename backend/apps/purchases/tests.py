@@ -1,11 +1,16 @@
+from datetime import date
+from decimal import Decimal
+
+from django.db.models import Sum
 from rest_framework import status
 from rest_framework.test import APITestCase
 
-from apps.accounting.models import Account
+from apps.accounting.models import Account, ExchangeRate
 from apps.companies.services import create_company_for_user
 from apps.contacts.models import Contact
 from apps.journals.models import JournalEntry, JournalStatus
-from apps.purchases.models import Bill
+from apps.purchases.models import Bill, RecurringBillTemplate, RecurringBillTemplateLine, VendorPayment
+from apps.purchases.recurring import generate_recurring_bills
 from apps.users.models import User
 
 
@@ -173,6 +178,41 @@ class PurchasesApiTests(APITestCase):
         )
         self.assertEqual(alloc_res.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_vendor_payment_currency_must_match_bill_currency(self):
+        bill_id = self._create_bill_with_lines()
+        self.client.post(f"/api/v1/purchases/companies/{self.company.id}/bills/{bill_id}/post/", {}, format="json")
+
+        payment_res = self.client.post(
+            f"/api/v1/purchases/companies/{self.company.id}/vendor-payments/",
+            {
+                "vendor": str(self.vendor.id),
+                "paid_date": "2026-02-20",
+                "amount": "100.00",
+                "currency_code": "EUR",
+                "payment_account": str(self.cash_account.id),
+            },
+            format="json",
+            HTTP_IDEMPOTENCY_KEY="vendor-payment-create-fx",
+        )
+        payment_id = payment_res.data["id"]
+        alloc_url = f"/api/v1/purchases/companies/{self.company.id}/vendor-payments/{payment_id}/allocations/"
+
+        alloc_res = self.client.put(alloc_url, {"allocations": [{"bill_id": str(bill_id), "amount": "100.00"}]}, format="json")
+        self.assertEqual(alloc_res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        VendorPayment.objects.filter(id=payment_id).update(currency_code="USD")
+        alloc_res = self.client.put(alloc_url, {"allocations": [{"bill_id": str(bill_id), "amount": "100.00"}]}, format="json")
+        self.assertEqual(alloc_res.status_code, status.HTTP_200_OK)
+        VendorPayment.objects.filter(id=payment_id).update(currency_code="EUR")
+        post_res = self.client.post(
+            f"/api/v1/purchases/companies/{self.company.id}/vendor-payments/{payment_id}/post/",
+            {},
+            format="json",
+            HTTP_IDEMPOTENCY_KEY="vendor-payment-post-fx",
+        )
+        self.assertEqual(post_res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Bill.objects.get(id=bill_id).amount_paid, Decimal("0"))
+
     def test_vendor_payment_post_idempotency_prevents_double_apply(self):
         bill_id = self._create_bill_with_lines()
         self.client.post(f"/api/v1/purchases/companies/{self.company.id}/bills/{bill_id}/post/", {}, format="json")
@@ -227,3 +267,100 @@ class PurchasesApiTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["count"], 2)
         self.assertEqual(len(response.data["results"]), 1)
+
+    def test_recurring_bill_generation_stops_at_end_date(self):
+        template = RecurringBillTemplate.objects.create(
+            company=self.company,
+            name="Office rent",
+            vendor=self.vendor,
+            ap_account=self.ap_account,
+            frequency="monthly",
+            start_date=date(2026, 1, 1),
+            end_date=date(2026, 2, 1),
+            next_run_date=date(2026, 1, 1),
+        )
+        RecurringBillTemplateLine.objects.create(
+            company=self.company,
+            template=template,
+            line_no=1,
+            description="Rent",
+            quantity="1",
+            unit_cost="1000.00",
+            expense_account=self.expense_account,
+        )
+
+        first = generate_recurring_bills(as_of=date(2026, 6, 1), company=self.company)
+        second = generate_recurring_bills(as_of=date(2026, 6, 1), company=self.company)
+
+        self.assertEqual(first["bills_created"], 2)
+        self.assertEqual(second["templates_processed"], 0)
+        self.assertEqual(Bill.objects.filter(recurring_template=template).count(), 2)
+        template.refresh_from_db()
+        self.assertFalse(template.is_active)
+
+    def test_payment_run_pays_due_bills_with_one_payment_per_vendor(self):
+        first_bill_id = self._create_bill_with_lines()
+        second_bill_id = self._create_bill_with_lines()
+        for bill_id in (first_bill_id, second_bill_id):
+            self.client.post(f"/api/v1/purchases/companies/{self.company.id}/bills/{bill_id}/post/", {}, format="json")
+        url = f"/api/v1/purchases/companies/{self.company.id}/payment-runs/"
+        body = {"due_by": "2026-03-31", "paid_date": "2026-03-20", "payment_account": str(self.cash_account.id)}
+
+        preview = self.client.post(url, {**body, "dry_run": True}, format="json")
+        self.assertEqual(preview.status_code, status.HTTP_200_OK)
+        self.assertEqual(preview.data["payment_count"], 1)
+        self.assertEqual(preview.data["totals_by_currency"], {"USD": "240.0000"})
+        self.assertEqual(Bill.objects.filter(status="paid").count(), 0)
+
+        missing_key = self.client.post(url, body, format="json")
+        self.assertEqual(missing_key.status_code, status.HTTP_400_BAD_REQUEST)
+
+        run = self.client.post(url, body, format="json", HTTP_IDEMPOTENCY_KEY="payment-run-1")
+        replay = self.client.post(url, body, format="json", HTTP_IDEMPOTENCY_KEY="payment-run-1")
+        self.assertEqual(run.status_code, status.HTTP_200_OK)
+        self.assertEqual(replay.data, run.data)
+
+        payment = VendorPayment.objects.get(company=self.company)
+        self.assertEqual(payment.amount, Decimal("240.0000"))
+        self.assertEqual(payment.allocations.count(), 2)
+        self.assertEqual(set(Bill.objects.values_list("status", flat=True)), {"paid"})
+        journal = JournalEntry.objects.get(id=payment.journal_entry_id)
+        self.assertEqual(journal.status, JournalStatus.POSTED)
+        totals = journal.lines.aggregate(debit=Sum("debit"), credit=Sum("credit"))
+        self.assertEqual(totals["debit"], totals["credit"])
+
+    def test_payment_run_leaves_out_lines_that_round_to_zero(self):
+        fx_account = Account.objects.create(
+            company=self.company, code="7900", name="FX Gain/Loss", type="expense", normal_balance="debit"
+        )
+        self.company.fx_gain_loss_account = fx_account
+        self.company.save(update_fields=["fx_gain_loss_account", "updated_at"])
+        ExchangeRate.objects.create(company=self.company, currency_code="JPY", rate_date=date(2026, 3, 1), rate=Decimal("0.0001"))
+        Bill.objects.create(
+            company=self.company,
+            bill_no=900,
+            status="posted",
+            vendor=self.vendor,
+            bill_date=date(2026, 2, 1),
+            due_date=date(2026, 3, 1),
+            currency_code="JPY",
+            subtotal=Decimal("1"),
+            total=Decimal("1"),
+            exchange_rate=Decimal("0.00004"),
+            ap_account=self.ap_account,
+        )
+        self.client.force_authenticate(user=self.owner)
+
+        run = self.client.post(
+            f"/api/v1/purchases/companies/{self.company.id}/payment-runs/",
+            {"due_by": "2026-03-31", "paid_date": "2026-03-20", "payment_account": str(self.cash_account.id)},
+            format="json",
+            HTTP_IDEMPOTENCY_KEY="payment-run-rounding",
+        )
+
+        self.assertEqual(run.status_code, status.HTTP_200_OK)
+        journal = JournalEntry.objects.get(id=VendorPayment.objects.get(company=self.company).journal_entry_id)
+        self.assertEqual(
+            sorted((line.account_id, line.debit, line.credit) for line in journal.lines.all()),
+            sorted([(self.cash_account.id, Decimal("0"), Decimal("0.0001")), (fx_account.id, Decimal("0.0001"), Decimal("0"))]),
+        )
@@ -7,10 +7,13 @@ from apps.purchases.views import (
     BillListCreateView,
     BillPostView,
     BillVoidView,
+    RecurringBillTemplateDetailUpdateView,
+    RecurringBillTemplateListCreateView,
     VendorPaymentAllocationsReplaceView,
     VendorPaymentDetailUpdateView,
     VendorPaymentListCreateView,
     VendorPaymentPostView,
+    VendorPaymentRunView,
     VendorPaymentVoidView,
 )
 
@@ -49,5 +52,20 @@ urlpatterns = [
         VendorPaymentVoidView.as_view(),
         name="vendor_payment_void",
     ),
+    path(
+        "companies/<uuid:company_id>/payment-runs/",
+        VendorPaymentRunView.as_view(),
+        name="vendor_payment_run",
+    ),
+    path(
+        "companies/<uuid:company_id>/recurring-bills/",
+        RecurringBillTemplateListCreateView.as_view(),
+        name="recurring_bill_list_create",
+    ),
+    path(
+        "companies/<uuid:company_id>/recurring-bills/<uuid:template_id>/",
+        RecurringBillTemplateDetailUpdateView.as_view(),
+        name="recurring_bill_detail",
+    ),
     path("companies/<uuid:company_id>/reports/ap-aging/", APAgingView.as_view(), name="ap_aging"),
 ]
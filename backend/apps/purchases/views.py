@@ -2,6 +2,7 @@ import hashlib
 import json
 from datetime import timedelta
 
+from django.db.models import Prefetch
 from django.utils import timezone
 from rest_framework import generics, permissions, response, status, views
 
@@ -10,12 +11,17 @@ from apps.common.pagination import DefaultListPagination
 from apps.common.tenant import get_company_for_user_or_404, user_has_permission_in_company
 from apps.idempotency.models import IdempotencyStatus
 from apps.idempotency.services import create_or_update_idempotency_record, get_valid_idempotency_record
-from apps.purchases.models import Bill, VendorPayment
+from apps.purchases.models import Bill, RecurringBillTemplate, RecurringBillTemplateLine, VendorPayment
+from apps.purchases.payment_runs import run_vendor_payments
 from apps.purchases.serializers import (
     APAgingQuerySerializer,
     BillLinesReplaceSerializer,
+    BillLinesUpdateSerializer,
     BillSerializer,
+    PaymentRunSerializer,
+    RecurringBillTemplateSerializer,
     VendorPaymentAllocationsReplaceSerializer,
+    VendorPaymentAllocationsUpdateSerializer,
     VendorPaymentSerializer,
 )
 from apps.purchases.services import (
@@ -25,6 +31,8 @@ from apps.purchases.services import (
     post_vendor_payment,
     replace_bill_lines,
     replace_vendor_payment_allocations,
+    update_bill_lines,
+    update_vendor_payment_allocations,
     void_bill,
     void_vendor_payment,
 )
@@ -151,6 +159,29 @@ class BillLinesReplaceView(views.APIView):
             return response.Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
         return response.Response(BillSerializer(bill).data)
 
+    def patch(self, request, company_id, bill_id):
+        company = get_company_for_user_or_404(user=request.user, company_id=company_id)
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_POST,
+        ):
+            return response.Response({"detail": "Insufficient permission."}, status=status.HTTP_403_FORBIDDEN)
+
+        bill = generics.get_object_or_404(Bill, company=company, id=bill_id)
+        serializer = BillLinesUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            payload = serializer.to_service_payload(company=company)
+            update_bill_lines(
+                bill=bill,
+                lines=payload,
+                delete_line_nos=serializer.validated_data["delete_line_nos"],
+            )
+        except PurchasesValidationError as exc:
+            return response.Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return response.Response(BillSerializer(bill).data)
+
 
 class BillPostView(views.APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -335,6 +366,29 @@ class VendorPaymentAllocationsReplaceView(views.APIView):
             return response.Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
         return response.Response(VendorPaymentSerializer(vendor_payment).data)
 
+    def patch(self, request, company_id, vendor_payment_id):
+        company = get_company_for_user_or_404(user=request.user, company_id=company_id)
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_POST,
+        ):
+            return response.Response({"detail": "Insufficient permission."}, status=status.HTTP_403_FORBIDDEN)
+        vendor_payment = generics.get_object_or_404(VendorPayment, company=company, id=vendor_payment_id)
+
+        serializer = VendorPaymentAllocationsUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            payload = serializer.to_service_payload(company=company)
+            update_vendor_payment_allocations(
+                vendor_payment=vendor_payment,
+                allocations=payload,
+                delete_bill_ids=serializer.validated_data["delete_bill_ids"],
+            )
+        except PurchasesValidationError as exc:
+            return response.Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return response.Response(VendorPaymentSerializer(vendor_payment).data)
+
 
 class VendorPaymentPostView(views.APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -416,6 +470,156 @@ class VendorPaymentVoidView(views.APIView):
         return response.Response(VendorPaymentSerializer(voided).data)
 
 
+class VendorPaymentRunView(views.APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, company_id):
+        company = get_company_for_user_or_404(user=request.user, company_id=company_id)
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_POST,
+        ):
+            return response.Response({"detail": "Insufficient permission."}, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = PaymentRunSerializer(data=request.data, context={"company": company})
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        dry_run = data["dry_run"]
+
+        idem_key = _get_idempotency_key(request)
+        if not dry_run and not idem_key:
+            return response.Response({"detail": "Idempotency-Key header required."}, status=status.HTTP_400_BAD_REQUEST)
+        scope = _idempotency_scope("vendor-payments.run", company.id)
+        if not dry_run:
+            existing = get_valid_idempotency_record(company=company, scope=scope, idempotency_key=idem_key)
+            if existing and existing.status == IdempotencyStatus.COMPLETED and existing.response_body:
+                return response.Response(existing.response_body, status=status.HTTP_200_OK)
+
+        try:
+            payload = run_vendor_payments(
+                company=company,
+                due_by=data["due_by"],
+                paid_date=data.get("paid_date") or timezone.now().date(),
+                payment_account=data["payment_account"],
+                actor_user=request.user,
+                vendor_ids=data.get("vendor_ids"),
+                dry_run=dry_run,
+            )
+        except PurchasesValidationError as exc:
+            return response.Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if dry_run:
+            return response.Response(payload)
+
+        create_or_update_idempotency_record(
+            company=company,
+            scope=scope,
+            idempotency_key=idem_key,
+            request_hash=_request_hash(request.data),
+            expires_at=timezone.now() + timedelta(hours=24),
+            status=IdempotencyStatus.COMPLETED,
+            response_body=payload,
+        )
+        log_audit_event(
+            company=company,
+            actor_user=request.user,
+            action="vendor_payment.run",
+            entity_type="company",
+            entity_id=company.id,
+            metadata={
+                "due_by": payload["due_by"],
+                "payment_count": payload["payment_count"],
+                "totals_by_currency": payload["totals_by_currency"],
+            },
+            ip_address=request.META.get("REMOTE_ADDR"),
+            user_agent=request.headers.get("User-Agent", ""),
+        )
+        return response.Response(payload)
+
+
+class RecurringBillTemplateListCreateView(generics.ListCreateAPIView):
+    serializer_class = RecurringBillTemplateSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = DefaultListPagination
+
+    def _company(self):
+        return get_company_for_user_or_404(user=self.request.user, company_id=self.kwargs["company_id"])
+
+    def get_queryset(self):
+        company = self._company()
+        queryset = RecurringBillTemplate.objects.filter(company=company).prefetch_related(
+            Prefetch("lines", queryset=RecurringBillTemplateLine.objects.order_by("line_no"))
+        )
+        is_active = self.request.query_params.get("is_active")
+        if is_active:
+            queryset = queryset.filter(is_active=is_active.lower() in {"1", "true", "yes"})
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        company = self._company()
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_VIEW,
+        ):
+            return response.Response({"detail": "Insufficient permission."}, status=status.HTTP_403_FORBIDDEN)
+        return super().list(request, *args, **kwargs)
+
+    def create(self, request, *args, **kwargs):
+        company = self._company()
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_POST,
+        ):
+            return response.Response({"detail": "Insufficient permission."}, status=status.HTTP_403_FORBIDDEN)
+        serializer = self.get_serializer(data=request.data, context={"company": company})
+        serializer.is_valid(raise_exception=True)
+        template = serializer.save(company=company)
+        return response.Response(self.get_serializer(template).data, status=status.HTTP_201_CREATED)
+
+
+class RecurringBillTemplateDetailUpdateView(generics.RetrieveUpdateAPIView):
+    serializer_class = RecurringBillTemplateSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def _company(self):
+        return get_company_for_user_or_404(user=self.request.user, company_id=self.kwargs["company_id"])
+
+    def get_object(self):
+        company = self._company()
+        return generics.get_object_or_404(RecurringBillTemplate, company=company, id=self.kwargs["template_id"])
+
+    def retrieve(self, request, *args, **kwargs):
+        company = self._company()
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_VIEW,
+        ):
+            return response.Response({"detail": "Insufficient permission."}, status=status.HTTP_403_FORBIDDEN)
+        return super().retrieve(request, *args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        company = self._company()
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_POST,
+        ):
+            return response.Response({"detail": "Insufficient permission."}, status=status.HTTP_403_FORBIDDEN)
+        serializer = self.get_serializer(
+            self.get_object(),
+            data=request.data,
+            partial=kwargs.pop("partial", False),
+            context={"company": company},
+        )
+        serializer.is_valid(raise_exception=True)
+        template = serializer.save()
+        return response.Response(self.get_serializer(template).data)
+
+
 class APAgingView(views.APIView):
     permission_classes = [permissions.IsAuthenticated]
 
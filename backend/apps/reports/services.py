@@ -1,8 +1,11 @@
 from collections import defaultdict
 from decimal import Decimal
+from heapq import nlargest
+from itertools import chain
 
 from apps.accounting.models import AccountType
 from apps.banking.models import BankAccount
+from apps.journals.archive import iter_archived_balances, iter_archived_lines
 from apps.journals.models import JournalLine, JournalStatus
 
 
@@ -18,8 +21,20 @@ def _posted_lines(company, *, start_date=None, end_date=None):
     return queryset
 
 
+def _ledger_lines(company, *, start_date=None, end_date=None):
+    # Archived fiscal years are read back from their archive files.
+    archived = iter_archived_lines(company=company, start_date=start_date, end_date=end_date)
+    return chain(archived, _posted_lines(company, start_date=start_date, end_date=end_date))
+
+
+def _ledger_balances(company, *, start_date=None, end_date=None):
+    # Like _ledger_lines, but whole archived years contribute their stored per-account totals.
+    archived = iter_archived_balances(company=company, start_date=start_date, end_date=end_date)
+    return chain(archived, _posted_lines(company, start_date=start_date, end_date=end_date))
+
+
 def build_profit_and_loss(*, company, start_date, end_date):
-    lines = _posted_lines(company, start_date=start_date, end_date=end_date)
+    lines = _ledger_balances(company, start_date=start_date, end_date=end_date)
     by_account = defaultdict(lambda: {"code": "", "name": "", "type": "", "debit": Decimal("0"), "credit": Decimal("0")})
     for line in lines:
         if line.account.type not in {AccountType.INCOME, AccountType.EXPENSE}:
@@ -63,7 +78,7 @@ def build_profit_and_loss(*, company, start_date, end_date):
 
 
 def build_balance_sheet(*, company, as_of):
-    lines = _posted_lines(company, end_date=as_of)
+    lines = _ledger_balances(company, end_date=as_of)
     by_account = defaultdict(lambda: {"code": "", "name": "", "type": "", "debit": Decimal("0"), "credit": Decimal("0")})
     for line in lines:
         item = by_account[str(line.account_id)]
@@ -114,7 +129,7 @@ def build_balance_sheet(*, company, as_of):
 
 
 def build_cash_flow(*, company, start_date, end_date):
-    lines = _posted_lines(company, start_date=start_date, end_date=end_date)
+    lines = _ledger_lines(company, start_date=start_date, end_date=end_date)
 
     configured_cash_accounts = set(BankAccount.objects.filter(company=company).values_list("ledger_account_id", flat=True))
     inflow = Decimal("0")
@@ -142,7 +157,7 @@ def build_cash_flow(*, company, start_date, end_date):
 
 
 def build_trial_balance(*, company, start_date, end_date):
-    lines = _posted_lines(company, start_date=start_date, end_date=end_date)
+    lines = _ledger_balances(company, start_date=start_date, end_date=end_date)
     by_account = defaultdict(lambda: {"code": "", "name": "", "debit": Decimal("0"), "credit": Decimal("0")})
     for line in lines:
         item = by_account[str(line.account_id)]
@@ -170,7 +185,11 @@ def build_general_ledger(*, company, start_date, end_date, account_id=None, limi
     lines = _posted_lines(company, start_date=start_date, end_date=end_date)
     if account_id:
         lines = lines.filter(account_id=account_id)
-    lines = lines.order_by("-journal_entry__entry_date", "-created_at")[:limit]
+    lines = list(lines.order_by("-journal_entry__entry_date", "-created_at")[:limit])
+    if len(lines) < limit:
+        # Archived years are all older than anything still in journal_line, so they only fill the tail.
+        archived = iter_archived_lines(company=company, start_date=start_date, end_date=end_date, account_id=account_id)
+        lines.extend(nlargest(limit - len(lines), archived, key=lambda line: (line.journal_entry.entry_date, line.created_at)))
 
     rows = [
         {
@@ -1,15 +1,21 @@
+import tempfile
+from datetime import date
 from decimal import Decimal
 from time import perf_counter
+from unittest.mock import patch
 
-from django.db import connection
+from django.db import connection, transaction
+from django.test import override_settings
 from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.test import APITestCase
 
 from apps.accounting.models import Account
 from apps.companies.services import create_company_for_user
-from apps.journals.models import JournalEntry, JournalStatus
-from apps.journals.services import post_journal_entry, replace_journal_lines
+from apps.journals import archive as archive_module
+from apps.journals.archive import archive_fiscal_year
+from apps.journals.models import JournalEntry, JournalLine, JournalStatus
+from apps.journals.services import JournalValidationError, post_journal_entry, replace_journal_lines, void_journal_entry
 from apps.users.models import User
 
 
@@ -130,6 +136,99 @@ class ReportsApiTests(APITestCase):
         self.assertEqual(general_ledger.status_code, status.HTTP_200_OK)
         self.assertEqual(len(general_ledger.data["rows"]), 1)
 
+    def test_reports_read_archived_fiscal_years_transparently(self):
+        def cash_in(entry_date, amount, account):
+            return self._post_entry(
+                entry_date,
+                [
+                    {"account": self.cash_account, "debit": Decimal(amount), "credit": Decimal("0"), "description": ""},
+                    {"account": account, "debit": Decimal("0"), "credit": Decimal(amount), "description": ""},
+                ],
+            )
+
+        cash_in("2024-03-01", "500", self.equity_account)
+        cash_in("2024-06-10", "300", self.revenue_account)
+        void_journal_entry(entry=cash_in("2024-06-11", "70", self.revenue_account), actor_user=self.owner)
+        cash_in("2026-02-01", "40", self.revenue_account)
+        base = f"/api/v1/reports/companies/{self.company.id}"
+        urls = (
+            f"{base}/balance-sheet/?as_of=2026-12-31",
+            f"{base}/profit-loss/?start_date=2024-06-01&end_date=2024-06-30",
+            f"{base}/trial-balance/?start_date=2024-01-01&end_date=2024-12-31",
+            f"{base}/general-ledger/?start_date=2024-03-01&end_date=2025-02-28&limit=50",
+            f"/api/v1/journals/companies/{self.company.id}/ledger/general/?page_size=3",
+            f"/api/v1/journals/companies/{self.company.id}/ledger/general/?page_size=3&page=2",
+            f"/api/v1/journals/companies/{self.company.id}/ledger/general/?page_size=3&page=3",
+            f"/api/v1/journals/companies/{self.company.id}/ledger/accounts/{self.cash_account.id}/",
+        )
+        self.maxDiff = None
+        before = [self.client.get(url).data for url in urls]
+
+        with tempfile.TemporaryDirectory() as archive_dir, override_settings(LEDGER_ARCHIVE_DIR=archive_dir):
+            with self.captureOnCommitCallbacks(execute=True):
+                archive = archive_fiscal_year(company=self.company, fiscal_year=2024, today=date(2026, 6, 1))
+            self.assertEqual((archive.entry_count, archive.line_count), (3, 6))
+            self.assertFalse(JournalLine.objects.filter(journal_entry__entry_date__year=2024).exists())
+
+            after = [self.client.get(url).data for url in urls]
+            self.assertEqual(after, before)
+            self.assertEqual(after[0]["asset_total"], "770.0000")
+            self.assertEqual(after[1]["income_total"], "300.0000")
+            self.assertEqual(len(after[3]["rows"]), 4)
+            self.assertEqual(after[4]["count"], 8)
+            self.assertEqual(len(after[5]["results"]) + len(after[6]["results"]), 5)
+            self.assertEqual([row["debit"] for row in after[7]["results"]], ["500.0000", "300.0000", "40.0000", "0.0000"])
+
+            with self.assertRaises(JournalValidationError):
+                cash_in("2024-12-31", "10", self.revenue_account)
+
+    def test_archive_removes_only_the_lines_it_wrote(self):
+        entry = self._post_entry(
+            "2024-03-01",
+            [
+                {"account": self.cash_account, "debit": Decimal("500"), "credit": Decimal("0"), "description": ""},
+                {"account": self.equity_account, "debit": Decimal("0"), "credit": Decimal("500"), "description": ""},
+            ],
+        )
+        write_archive_file = archive_module._write_archive_file
+
+        def write_then_add_line(path, rows):
+            checksum = write_archive_file(path, rows)
+            # A line that lands in the year after the scan must not be deleted unarchived.
+            JournalLine.objects.create(
+                company=self.company, journal_entry=entry, line_no=3, account=self.cash_account, debit=Decimal("1")
+            )
+            return checksum
+
+        with tempfile.TemporaryDirectory() as archive_dir, override_settings(LEDGER_ARCHIVE_DIR=archive_dir):
+            with patch.object(archive_module, "_write_archive_file", write_then_add_line):
+                with self.captureOnCommitCallbacks(execute=True):
+                    archive = archive_fiscal_year(company=self.company, fiscal_year=2024, today=date(2026, 6, 1))
+        self.assertEqual(archive.line_count, 2)
+        self.assertEqual(list(JournalLine.objects.filter(journal_entry=entry).values_list("line_no", flat=True)), [3])
+
+    def test_rolled_back_archive_leaves_no_file_behind(self):
+        self._post_entry(
+            "2024-03-01",
+            [
+                {"account": self.cash_account, "debit": Decimal("500"), "credit": Decimal("0"), "description": ""},
+                {"account": self.equity_account, "debit": Decimal("0"), "credit": Decimal("500"), "description": ""},
+            ],
+        )
+
+        with tempfile.TemporaryDirectory() as archive_dir, override_settings(LEDGER_ARCHIVE_DIR=archive_dir):
+            with self.captureOnCommitCallbacks(execute=True):
+                with self.assertRaises(RuntimeError), transaction.atomic():
+                    archive = archive_fiscal_year(company=self.company, fiscal_year=2024, today=date(2026, 6, 1))
+                    raise RuntimeError("commit failed")
+            self.assertFalse(archive_module.archive_path(archive).exists())
+            self.assertEqual(JournalLine.objects.filter(journal_entry__entry_date__year=2024).count(), 2)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                archive = archive_fiscal_year(company=self.company, fiscal_year=2024, today=date(2026, 6, 1))
+            self.assertTrue(archive_module.archive_path(archive).exists())
+            self.assertFalse(JournalLine.objects.filter(journal_entry__entry_date__year=2024).exists())
+
     def test_cross_tenant_reports_access_denied(self):
         self.client.force_authenticate(user=self.other_owner)
         response = self.client.get(f"/api/v1/reports/companies/{self.company.id}/profit-loss/")
@@ -1,6 +1,13 @@
 from django.contrib import admin
 
-from apps.sales.models import Invoice, InvoiceLine, Receipt, ReceiptAllocation
+from apps.sales.models import (
+    Invoice,
+    InvoiceLine,
+    Receipt,
+    ReceiptAllocation,
+    RecurringInvoiceTemplate,
+    RecurringInvoiceTemplateLine,
+)
 
 
 class InvoiceLineInline(admin.TabularInline):
@@ -35,3 +42,15 @@ class ReceiptAdmin(admin.ModelAdmin):
 @admin.register(ReceiptAllocation)
 class ReceiptAllocationAdmin(admin.ModelAdmin):
     list_display = ("receipt", "invoice", "amount")
+
+
+class RecurringInvoiceTemplateLineInline(admin.TabularInline):
+    model = RecurringInvoiceTemplateLine
+    extra = 0
+
+
+@admin.register(RecurringInvoiceTemplate)
+class RecurringInvoiceTemplateAdmin(admin.ModelAdmin):
+    list_display = ("company", "name", "customer", "frequency", "next_run_date", "is_active")
+    list_filter = ("frequency", "is_active")
+    inlines = [RecurringInvoiceTemplateLineInline]
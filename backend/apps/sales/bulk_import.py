@@ -0,0 +1,261 @@
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+
+from apps.accounting.models import Account
+from apps.accounting.tax import get_tax_table
+from apps.common.decimals import check_amount_precision, parse_amount
+from apps.common.streaming import iter_records
+from apps.contacts.models import Contact, ContactType
+from apps.sales.models import Invoice, InvoiceLine, InvoiceStatus
+from apps.sales.services import SalesValidationError
+
+IMPORT_CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 500
+MAX_LINE_NO = 2147483647
+
+_AMBIGUOUS = object()
+
+CSV_HEADER_FIELDS = ("customer", "issue_date", "due_date", "currency_code", "notes", "ar_account")
+
+
+def _build_customer_lookup(company):
+    lookup = {}
+    customers = Contact.objects.filter(company=company, type__in=[ContactType.CUSTOMER, ContactType.BOTH]).only(
+        "id", "company_id", "name"
+    )
+    for customer in customers:
+        lookup[str(customer.id)] = customer
+        name_key = customer.name.strip().lower()
+        lookup[name_key] = _AMBIGUOUS if name_key in lookup else customer
+    return lookup
+
+
+def _build_account_lookup(company):
+    lookup = {}
+    for account in Account.objects.filter(company=company).only("id", "company_id", "code"):
+        lookup[str(account.id)] = account
+        lookup[account.code.strip().lower()] = account
+    return lookup
+
+
+def _resolve(lookup, value, *, label):
+    key = str(value or "").strip().lower()
+    if not key:
+        raise SalesValidationError(f"{label} is required.")
+    resolved = lookup.get(key)
+    if resolved is _AMBIGUOUS:
+        raise SalesValidationError(f"{label} '{value}' matches more than one record; use its id.")
+    if resolved is None:
+        raise SalesValidationError(f"{label} '{value}' was not found in this company.")
+    return resolved
+
+
+def _parse_date(value, *, label, required=True):
+    raw = str(value or "").strip()
+    if not raw:
+        if required:
+            raise SalesValidationError(f"{label} is required.")
+        return None
+    try:
+        return date.fromisoformat(raw)
+    except ValueError as exc:
+        raise SalesValidationError(f"Invalid {label} '{raw}'. Expected YYYY-MM-DD.") from exc
+
+
+def _parse_decimal(value, *, label, default):
+    raw = str(value).strip() if value not in (None, "") else default
+    return parse_amount(raw, label=label)
+
+
+def _parse_line_no(value, *, default):
+    raw = str(value).strip() if value not in (None, "") else ""
+    if not raw:
+        return default
+    try:
+        line_no = int(raw)
+    except ValueError as exc:
+        raise SalesValidationError(f"Invalid line_no '{raw}'. Expected a whole number.") from exc
+    if not 1 <= line_no <= MAX_LINE_NO:
+        raise SalesValidationError(f"Invalid line_no '{raw}'. Line numbers start at 1.")
+    return line_no
+
+
+def _parse_currency_code(value, *, default):
+    raw = str(value or "").strip().upper()
+    if not raw:
+        return default
+    if len(raw) != 3 or not raw.isascii() or not raw.isalpha():
+        raise SalesValidationError(f"Invalid currency_code '{value}'. Expected a 3-letter ISO code.")
+    return raw
+
+
+def _iter_csv_invoices(records):
+    # CSV carries one invoice line per row; consecutive rows sharing an invoice_ref form one invoice.
+    current = None
+    for row_no, record in records:
+        ref = record.get("invoice_ref", "")
+        if current is not None and (not ref or ref != current["ref"]):
+            yield current["row_no"], current
+            current = None
+        if current is None:
+            current = {"row_no": row_no, "ref": ref, "lines": []}
+            current.update({field: record.get(field, "") for field in CSV_HEADER_FIELDS})
+        current["lines"].append(
+            {
+                "line_no": record.get("line_no"),
+                "description": record.get("description", ""),
+                "quantity": record.get("quantity"),
+                "unit_price": record.get("unit_price"),
+                "revenue_account": record.get("revenue_account"),
+                "tax_code": record.get("tax_code"),
+            }
+        )
+    if current is not None:
+        yield current["row_no"], current
+
+
+def _iter_ndjson_invoices(records):
+    for row_no, record in records:
+        if record is not None:
+            record.setdefault("ref", record.get("invoice_ref", ""))
+        yield row_no, record
+
+
+def iter_invoice_records(text_stream, *, record_format):
+    records = iter_records(text_stream, record_format=record_format)
+    if record_format == "csv":
+        return _iter_csv_invoices(records)
+    return _iter_ndjson_invoices(records)
+
+
+def build_invoice_from_record(*, company, record, customers, accounts, tax_table, default_ar_account=None):
+    customer = _resolve(customers, record.get("customer"), label="Customer")
+    if record.get("ar_account"):
+        ar_account = _resolve(accounts, record.get("ar_account"), label="AR account")
+    elif default_ar_account is not None:
+        ar_account = default_ar_account
+    else:
+        raise SalesValidationError("AR account is required.")
+
+    invoice = Invoice(
+        company=company,
+        status=InvoiceStatus.DRAFT,
+        customer=customer,
+        issue_date=_parse_date(record.get("issue_date"), label="issue_date"),
+        due_date=_parse_date(record.get("due_date"), label="due_date", required=False),
+        currency_code=_parse_currency_code(record.get("currency_code"), default=company.base_currency),
+        notes=str(record.get("notes") or ""),
+        ar_account=ar_account,
+    )
+
+    raw_lines = record.get("lines")
+    if not isinstance(raw_lines, list) or not raw_lines:
+        raise SalesValidationError("At least one invoice line is required.")
+
+    lines = []
+    seen_line_nos = set()
+    subtotal = Decimal("0")
+    tax_total = Decimal("0")
+    for idx, raw_line in enumerate(raw_lines, start=1):
+        if not isinstance(raw_line, dict):
+            raise SalesValidationError(f"Line {idx} must be an object.")
+        line_no = _parse_line_no(raw_line.get("line_no"), default=idx)
+        if line_no in seen_line_nos:
+            raise SalesValidationError(f"Duplicate line_no {line_no}.")
+        seen_line_nos.add(line_no)
+        quantity = _parse_decimal(raw_line.get("quantity"), label="quantity", default="1")
+        unit_price = _parse_decimal(raw_line.get("unit_price"), label="unit_price", default="0")
+        if quantity <= 0:
+            raise SalesValidationError(f"Line {line_no} quantity must be greater than zero.")
+        if unit_price < 0:
+            raise SalesValidationError(f"Line {line_no} unit_price cannot be negative.")
+        line_total = check_amount_precision(
+            (quantity * unit_price).quantize(Decimal("0.0001")),
+            label=f"line {line_no} total",
+        )
+        tax_code = tax_table.resolve(raw_line.get("tax_code"))
+        tax_amount = tax_code.tax_for(line_total) if tax_code else Decimal("0")
+        subtotal += line_total
+        tax_total += tax_amount
+        lines.append(
+            InvoiceLine(
+                company=company,
+                invoice=invoice,
+                line_no=line_no,
+                description=str(raw_line.get("description") or ""),
+                quantity=quantity,
+                unit_price=unit_price,
+                line_total=line_total,
+                revenue_account=_resolve(accounts, raw_line.get("revenue_account"), label="Revenue account"),
+                tax_code_id=tax_code.id if tax_code else None,
+                tax_amount=tax_amount,
+            )
+        )
+
+    invoice.subtotal = subtotal
+    invoice.tax_total = tax_total
+    invoice.total = check_amount_precision(subtotal + tax_total, label="invoice total")
+    return invoice, lines
+
+
+@transaction.atomic
+def _flush_invoice_chunk(invoices, lines):
+    Invoice.objects.bulk_create(invoices, batch_size=IMPORT_CHUNK_SIZE)
+    InvoiceLine.objects.bulk_create(lines, batch_size=IMPORT_CHUNK_SIZE)
+
+
+def import_invoices(*, company, text_stream, record_format, default_ar_account=None, chunk_size=IMPORT_CHUNK_SIZE):
+    customers = _build_customer_lookup(company)
+    accounts = _build_account_lookup(company)
+    tax_table = get_tax_table(company)
+
+    summary = {
+        "invoices_created": 0,
+        "lines_created": 0,
+        "invoices_failed": 0,
+        "errors": [],
+        "errors_truncated": False,
+    }
+    pending_invoices = []
+    pending_lines = []
+
+    def flush():
+        if not pending_invoices:
+            return
+        _flush_invoice_chunk(pending_invoices, pending_lines)
+        summary["invoices_created"] += len(pending_invoices)
+        summary["lines_created"] += len(pending_lines)
+        pending_invoices.clear()
+        pending_lines.clear()
+
+    for row_no, record in iter_invoice_records(text_stream, record_format=record_format):
+        try:
+            if record is None:
+                raise SalesValidationError("Row is not a valid JSON object.")
+            invoice, lines = build_invoice_from_record(
+                company=company,
+                record=record,
+                customers=customers,
+                accounts=accounts,
+                tax_table=tax_table,
+                default_ar_account=default_ar_account,
+            )
+        except (TypeError, ValueError) as exc:
+            summary["invoices_failed"] += 1
+            if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+                summary["errors"].append(
+                    {"row": row_no, "ref": (record or {}).get("ref", ""), "detail": str(exc)}
+                )
+            else:
+                summary["errors_truncated"] = True
+            continue
+
+        pending_invoices.append(invoice)
+        pending_lines.extend(lines)
+        if len(pending_invoices) >= chunk_size:
+            flush()
+
+    flush()
+    return summary
@@ -0,0 +1,74 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from apps.companies.models import Company
+from apps.purchases.recurring import generate_recurring_bills
+from apps.sales.recurring import generate_recurring_invoices
+
+
+class Command(BaseCommand):
+    help = "Materialize due recurring invoices and bills as draft documents."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--as-of",
+            type=str,
+            default="",
+            help="Generate every period due on or before this date (YYYY-MM-DD). Defaults to today.",
+        )
+        parser.add_argument(
+            "--company",
+            type=str,
+            default="",
+            help="Restrict generation to one company id.",
+        )
+        parser.add_argument(
+            "--only",
+            choices=("invoices", "bills"),
+            default=None,
+            help="Generate only invoices or only bills.",
+        )
+
+    def handle(self, *args, **options):
+        as_of = self._resolve_as_of(options["as_of"])
+        company = self._resolve_company(options["company"])
+        only = options["only"]
+
+        with transaction.atomic():
+            if only in (None, "invoices"):
+                summary = generate_recurring_invoices(as_of=as_of, company=company)
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Invoices as of {as_of}: templates={summary['templates_processed']} "
+                        f"created={summary['invoices_created']} lines={summary['lines_created']} "
+                        f"skipped={summary['periods_skipped']}"
+                    )
+                )
+            if only in (None, "bills"):
+                summary = generate_recurring_bills(as_of=as_of, company=company)
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Bills as of {as_of}: templates={summary['templates_processed']} "
+                        f"created={summary['bills_created']} lines={summary['lines_created']} "
+                        f"skipped={summary['periods_skipped']}"
+                    )
+                )
+
+    def _resolve_as_of(self, raw: str) -> date:
+        if not raw:
+            return timezone.now().date()
+        try:
+            return date.fromisoformat(raw)
+        except ValueError as exc:
+            raise CommandError(f"Invalid --as-of value '{raw}'. Expected YYYY-MM-DD.") from exc
+
+    def _resolve_company(self, company_id: str):
+        if not company_id:
+            return None
+        company = Company.objects.filter(id=company_id).first()
+        if company is None:
+            raise CommandError(f"Company not found: {company_id}")
+        return company
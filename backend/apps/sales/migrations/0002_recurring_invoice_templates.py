@@ -0,0 +1,111 @@
+# Generated by Django 5.2.11 on 2026-10-19 01:36
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0001_initial'),
+        ('companies', '0002_initial'),
+        ('contacts', '0001_initial'),
+        ('journals', '0001_initial'),
+        ('sales', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecurringInvoiceTemplateLine',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('line_no', models.PositiveIntegerField()),
+                ('description', models.TextField()),
+                ('quantity', models.DecimalField(decimal_places=4, default=1, max_digits=19)),
+                ('unit_price', models.DecimalField(decimal_places=4, default=0, max_digits=19)),
+            ],
+            options={
+                'db_table': 'recurring_invoice_template_line',
+            },
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='recurring_period',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='RecurringInvoiceTemplate',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(max_length=255)),
+                ('currency_code', models.CharField(default='USD', max_length=3)),
+                ('notes', models.TextField(blank=True)),
+                ('frequency', models.CharField(choices=[('weekly', 'Weekly'), ('monthly', 'Monthly'), ('quarterly', 'Quarterly'), ('yearly', 'Yearly')], default='monthly', max_length=20)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('next_run_date', models.DateField()),
+                ('due_days', models.PositiveIntegerField(default=30)),
+                ('is_active', models.BooleanField(default=True)),
+                ('ar_account', models.ForeignKey(on_delete=django.db.models.deletion.RESTRICT, related_name='recurring_invoice_templates', to='accounting.account')),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recurring_invoice_templates', to='companies.company')),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.RESTRICT, related_name='recurring_invoice_templates', to='contacts.contact')),
+            ],
+            options={
+                'db_table': 'recurring_invoice_template',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='recurring_template',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='invoices', to='sales.recurringinvoicetemplate'),
+        ),
+        migrations.AddConstraint(
+            model_name='invoice',
+            constraint=models.UniqueConstraint(fields=('recurring_template', 'recurring_period'), name='invoice_recurring_period_unique'),
+        ),
+        migrations.AddField(
+            model_name='recurringinvoicetemplateline',
+            name='company',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recurring_invoice_template_lines', to='companies.company'),
+        ),
+        migrations.AddField(
+            model_name='recurringinvoicetemplateline',
+            name='revenue_account',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.RESTRICT, related_name='recurring_invoice_template_lines', to='accounting.account'),
+        ),
+        migrations.AddField(
+            model_name='recurringinvoicetemplateline',
+            name='template',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='sales.recurringinvoicetemplate'),
+        ),
+        migrations.AddIndex(
+            model_name='recurringinvoicetemplate',
+            index=models.Index(fields=['company', 'is_active'], name='recurring_i_company_aafed4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recurringinvoicetemplate',
+            index=models.Index(fields=['is_active', 'next_run_date'], name='recurring_i_is_acti_d86b68_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recurringinvoicetemplateline',
+            index=models.Index(fields=['template'], name='recurring_i_templat_7436b8_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='recurringinvoicetemplateline',
+            constraint=models.CheckConstraint(condition=models.Q(('quantity__gt', 0)), name='recurring_invoice_line_quantity_positive'),
+        ),
+        migrations.AddConstraint(
+            model_name='recurringinvoicetemplateline',
+            constraint=models.CheckConstraint(condition=models.Q(('unit_price__gte', 0)), name='recurring_invoice_line_unit_price_non_negative'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='recurringinvoicetemplateline',
+            unique_together={('company', 'template', 'line_no')},
+        ),
+    ]
@@ -1,10 +1,21 @@
 from decimal import Decimal
 
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
 
 from apps.accounting.models import Account
+from apps.accounting.tax import TaxCodeError, get_tax_table
+from apps.common.streaming import SUPPORTED_RECORD_FORMATS
 from apps.contacts.models import Contact
-from apps.sales.models import Invoice, InvoiceLine, Receipt, ReceiptAllocation
+from apps.sales.models import (
+    Invoice,
+    InvoiceLine,
+    Receipt,
+    ReceiptAllocation,
+    RecurringInvoiceTemplate,
+    RecurringInvoiceTemplateLine,
+)
 
 
 class InvoiceLineSerializer(serializers.ModelSerializer):
@@ -18,10 +29,12 @@ class InvoiceLineSerializer(serializers.ModelSerializer):
             "unit_price",
             "line_total",
             "revenue_account",
+            "tax_code",
+            "tax_amount",
             "created_at",
             "updated_at",
         )
-        read_only_fields = ("id", "line_total", "created_at", "updated_at")
+        read_only_fields = ("id", "line_total", "tax_amount", "created_at", "updated_at")
 
 
 class InvoiceSerializer(serializers.ModelSerializer):
@@ -38,6 +51,7 @@ class InvoiceSerializer(serializers.ModelSerializer):
             "issue_date",
             "due_date",
             "currency_code",
+            "exchange_rate",
             "subtotal",
             "tax_total",
             "total",
@@ -52,6 +66,7 @@ class InvoiceSerializer(serializers.ModelSerializer):
         read_only_fields = (
             "id",
             "invoice_no",
+            "exchange_rate",
             "subtotal",
             "tax_total",
             "total",
@@ -77,13 +92,52 @@ class InvoiceSerializer(serializers.ModelSerializer):
         return attrs
 
 
+class InvoiceSummarySerializer(serializers.ModelSerializer):
+    customer_name = serializers.CharField(source="customer.name", read_only=True)
+    line_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Invoice
+        fields = (
+            "id",
+            "invoice_no",
+            "status",
+            "customer",
+            "customer_name",
+            "issue_date",
+            "due_date",
+            "currency_code",
+            "subtotal",
+            "tax_total",
+            "total",
+            "amount_paid",
+            "line_count",
+            "created_at",
+            "updated_at",
+        )
+        read_only_fields = fields
+
+
 class InvoiceLinesReplaceSerializer(serializers.Serializer):
     lines = serializers.ListField(child=serializers.DictField(), allow_empty=False)
 
+    def validate_lines(self, value):
+        for line in value:
+            if line.get("line_no") in (None, ""):
+                continue
+            try:
+                line["line_no"] = int(line["line_no"])
+            except (TypeError, ValueError) as exc:
+                raise serializers.ValidationError("line_no must be a whole number.") from exc
+            if line["line_no"] < 1:
+                raise serializers.ValidationError("line_no must be at least 1.")
+        return value
+
     def to_service_payload(self, *, company):
         payload = []
         account_ids = [str(line.get("revenue_account_id")) for line in self.validated_data["lines"]]
         accounts = {str(account.id): account for account in Account.objects.filter(company=company, id__in=account_ids)}
+        tax_table = get_tax_table(company)
 
         for idx, line in enumerate(self.validated_data["lines"], start=1):
             account_id = str(line.get("revenue_account_id"))
@@ -92,6 +146,10 @@ class InvoiceLinesReplaceSerializer(serializers.Serializer):
                 raise serializers.ValidationError("Revenue account must belong to the same company.")
             quantity = Decimal(str(line.get("quantity", "1")))
             unit_price = Decimal(str(line.get("unit_price", "0")))
+            try:
+                tax_code = tax_table.resolve(line.get("tax_code_id"))
+            except TaxCodeError as exc:
+                raise serializers.ValidationError(str(exc)) from exc
             payload.append(
                 {
                     "line_no": line.get("line_no") or idx,
@@ -99,11 +157,27 @@ class InvoiceLinesReplaceSerializer(serializers.Serializer):
                     "quantity": quantity,
                     "unit_price": unit_price,
                     "revenue_account": account,
+                    "tax_code": tax_code,
                 }
             )
         return payload
 
 
+class InvoiceLinesUpdateSerializer(InvoiceLinesReplaceSerializer):
+    lines = serializers.ListField(child=serializers.DictField(), default=list)
+    delete_line_nos = serializers.ListField(child=serializers.IntegerField(min_value=1), default=list)
+
+    def validate_lines(self, value):
+        if any(line.get("line_no") in (None, "") for line in value):
+            raise serializers.ValidationError("Every line needs a line_no when editing lines.")
+        return super().validate_lines(value)
+
+    def validate(self, attrs):
+        if not attrs["lines"] and not attrs["delete_line_nos"]:
+            raise serializers.ValidationError("Send lines to upsert or delete_line_nos to remove.")
+        return attrs
+
+
 class ReceiptAllocationSerializer(serializers.ModelSerializer):
     class Meta:
         model = ReceiptAllocation
@@ -125,6 +199,7 @@ class ReceiptSerializer(serializers.ModelSerializer):
             "received_date",
             "amount",
             "currency_code",
+            "exchange_rate",
             "deposit_account",
             "journal_entry",
             "notes",
@@ -135,6 +210,7 @@ class ReceiptSerializer(serializers.ModelSerializer):
         read_only_fields = (
             "id",
             "receipt_no",
+            "exchange_rate",
             "journal_entry",
             "created_at",
             "updated_at",
@@ -177,5 +253,131 @@ class ReceiptAllocationsReplaceSerializer(serializers.Serializer):
         return payload
 
 
+class ReceiptAllocationsUpdateSerializer(ReceiptAllocationsReplaceSerializer):
+    allocations = serializers.ListField(child=serializers.DictField(), default=list)
+    delete_invoice_ids = serializers.ListField(child=serializers.UUIDField(), default=list)
+
+    def validate(self, attrs):
+        if not attrs["allocations"] and not attrs["delete_invoice_ids"]:
+            raise serializers.ValidationError("Send allocations to upsert or delete_invoice_ids to remove.")
+        return attrs
+
+
+class InvoiceImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    file_format = serializers.ChoiceField(choices=SUPPORTED_RECORD_FORMATS, required=False)
+    ar_account_id = serializers.UUIDField(required=False)
+
+    def validate_ar_account_id(self, value):
+        company = self.context["company"]
+        try:
+            account = Account.objects.get(id=value, company=company)
+        except Account.DoesNotExist as exc:
+            raise serializers.ValidationError("AR account must belong to the selected company.") from exc
+        self.context["default_ar_account"] = account
+        return value
+
+
+class RecurringInvoiceTemplateLineSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = RecurringInvoiceTemplateLine
+        fields = ("id", "line_no", "description", "quantity", "unit_price", "revenue_account")
+        read_only_fields = ("id",)
+
+
+class RecurringInvoiceTemplateSerializer(serializers.ModelSerializer):
+    lines = RecurringInvoiceTemplateLineSerializer(many=True)
+
+    class Meta:
+        model = RecurringInvoiceTemplate
+        fields = (
+            "id",
+            "company",
+            "name",
+            "customer",
+            "ar_account",
+            "currency_code",
+            "notes",
+            "frequency",
+            "start_date",
+            "end_date",
+            "next_run_date",
+            "due_days",
+            "is_active",
+            "created_at",
+            "updated_at",
+            "lines",
+        )
+        read_only_fields = ("id", "next_run_date", "created_at", "updated_at")
+        extra_kwargs = {"company": {"required": False}}
+        validators = []
+
+    def validate(self, attrs):
+        company = self.context.get("company") or attrs.get("company") or getattr(self.instance, "company", None)
+        customer = attrs.get("customer") or getattr(self.instance, "customer", None)
+        ar_account = attrs.get("ar_account") or getattr(self.instance, "ar_account", None)
+        start_date = attrs.get("start_date") or getattr(self.instance, "start_date", None)
+        end_date = attrs.get("end_date", getattr(self.instance, "end_date", None))
+        if company and customer and customer.company_id != company.id:
+            raise serializers.ValidationError({"customer": "Customer must belong to the selected company."})
+        if customer and customer.type not in {"customer", "both"}:
+            raise serializers.ValidationError({"customer": "Contact type must be customer or both."})
+        if company and ar_account and ar_account.company_id != company.id:
+            raise serializers.ValidationError({"ar_account": "AR account must belong to the selected company."})
+        if start_date and end_date and start_date > end_date:
+            raise serializers.ValidationError({"end_date": "End date must be greater than or equal to start date."})
+        lines = attrs.get("lines")
+        if lines is not None:
+            if not lines:
+                raise serializers.ValidationError({"lines": "At least one template line is required."})
+            line_nos = [line["line_no"] for line in lines]
+            if len(set(line_nos)) != len(line_nos):
+                raise serializers.ValidationError({"lines": "Line numbers must be unique."})
+            for line in lines:
+                if company and line["revenue_account"].company_id != company.id:
+                    raise serializers.ValidationError({"lines": "Revenue account must belong to the same company."})
+                if line.get("quantity", Decimal("1")) <= 0:
+                    raise serializers.ValidationError({"lines": "Quantity must be greater than zero."})
+                if line.get("unit_price", Decimal("0")) < 0:
+                    raise serializers.ValidationError({"lines": "Unit price cannot be negative."})
+        return attrs
+
+    def _replace_lines(self, template, lines):
+        template.lines.all().delete()
+        RecurringInvoiceTemplateLine.objects.bulk_create(
+            [RecurringInvoiceTemplateLine(company=template.company, template=template, **line) for line in lines]
+        )
+
+    @transaction.atomic
+    def create(self, validated_data):
+        lines = validated_data.pop("lines")
+        validated_data["next_run_date"] = validated_data["start_date"]
+        template = super().create(validated_data)
+        self._replace_lines(template, lines)
+        return template
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        lines = validated_data.pop("lines", None)
+        template = super().update(instance, validated_data)
+        if lines is not None:
+            self._replace_lines(template, lines)
+        return template
+
+
 class ARAgingQuerySerializer(serializers.Serializer):
     as_of = serializers.DateField(required=False)
+
+
+class CustomerStatementQuerySerializer(serializers.Serializer):
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        end_date = attrs.get("end_date") or timezone.now().date()
+        start_date = attrs.get("start_date") or end_date.replace(day=1)
+        if start_date > end_date:
+            raise serializers.ValidationError({"end_date": "end_date must be greater than or equal to start_date."})
+        attrs["start_date"] = start_date
+        attrs["end_date"] = end_date
+        return attrs
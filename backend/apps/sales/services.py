@@ -4,9 +4,17 @@ from django.db import transaction
 from django.db.models import Sum
 from django.utils import timezone
 
+from apps.accounting.fx import FxRateError, rate_for, realized_fx_line, to_base
 from apps.accounting.services import get_next_sequence_value
+from apps.common.line_sync import LineSyncError, sync_rows
 from apps.journals.models import JournalStatus
-from apps.journals.services import post_journal_entry, replace_journal_lines, void_journal_entry
+from apps.journals.services import (
+    JournalValidationError,
+    assert_period_open,
+    post_journal_entry,
+    replace_journal_lines,
+    void_journal_entry,
+)
 from apps.sales.models import Invoice, InvoiceLine, InvoiceStatus, Receipt, ReceiptAllocation, ReceiptStatus
 
 
@@ -18,23 +26,41 @@ def _invoice_open_amount(invoice: Invoice) -> Decimal:
     return (invoice.total or Decimal("0")) - (invoice.amount_paid or Decimal("0"))
 
 
-@transaction.atomic
-def replace_invoice_lines(*, invoice: Invoice, lines: list[dict]):
+def _assert_period_open(*, company, on_date):
+    try:
+        assert_period_open(company=company, entry_dates=[on_date])
+    except JournalValidationError as exc:
+        raise SalesValidationError(str(exc)) from exc
+
+
+def _exchange_rate(*, company, currency_code, on_date) -> Decimal:
+    try:
+        return rate_for(company=company, currency_code=currency_code, on_date=on_date)
+    except FxRateError as exc:
+        raise SalesValidationError(str(exc)) from exc
+
+
+def _fx_difference_line(*, company, difference):
+    try:
+        return realized_fx_line(company=company, difference=difference)
+    except FxRateError as exc:
+        raise SalesValidationError(str(exc)) from exc
+
+
+INVOICE_LINE_FIELDS = ("description", "quantity", "unit_price", "line_total", "revenue_account", "tax_code", "tax_amount")
+
+
+def _sync_invoice_lines(*, invoice: Invoice, lines: list[dict], delete_missing: bool, delete_line_nos=()):
     if invoice.status != InvoiceStatus.DRAFT:
         raise SalesValidationError("Only draft invoices can be edited.")
-    if not lines:
-        raise SalesValidationError("At least one invoice line is required.")
-
-    invoice.lines.all().delete()
-    created_lines = []
-    subtotal = Decimal("0")
 
+    incoming = []
     for line in lines:
         quantity = line["quantity"]
         unit_price = line["unit_price"]
+        tax_code = line.get("tax_code")
         line_total = (quantity * unit_price).quantize(Decimal("0.0001"))
-        subtotal += line_total
-        created_lines.append(
+        incoming.append(
             InvoiceLine(
                 company=invoice.company,
                 invoice=invoice,
@@ -44,17 +70,44 @@ def replace_invoice_lines(*, invoice: Invoice, lines: list[dict]):
                 unit_price=unit_price,
                 line_total=line_total,
                 revenue_account=line["revenue_account"],
+                tax_code_id=tax_code.id if tax_code else None,
+                tax_amount=tax_code.tax_for(line_total) if tax_code else Decimal("0"),
             )
         )
 
-    InvoiceLine.objects.bulk_create(created_lines)
-    invoice.subtotal = subtotal
-    invoice.tax_total = Decimal("0")
-    invoice.total = subtotal
+    try:
+        rows = sync_rows(
+            queryset=invoice.lines.select_for_update(),
+            incoming=incoming,
+            key="line_no",
+            fields=INVOICE_LINE_FIELDS,
+            delete_missing=delete_missing,
+            delete_keys=delete_line_nos,
+        )
+    except LineSyncError as exc:
+        raise SalesValidationError(str(exc)) from exc
+    if not rows:
+        raise SalesValidationError("At least one invoice line is required.")
+
+    invoice.subtotal = sum((row.line_total for row in rows), Decimal("0"))
+    invoice.tax_total = sum((row.tax_amount for row in rows), Decimal("0"))
+    invoice.total = invoice.subtotal + invoice.tax_total
     invoice.save(update_fields=["subtotal", "tax_total", "total", "updated_at"])
     return invoice
 
 
+@transaction.atomic
+def replace_invoice_lines(*, invoice: Invoice, lines: list[dict]):
+    if not lines:
+        raise SalesValidationError("At least one invoice line is required.")
+    return _sync_invoice_lines(invoice=invoice, lines=lines, delete_missing=True)
+
+
+@transaction.atomic
+def update_invoice_lines(*, invoice: Invoice, lines: list[dict], delete_line_nos=()):
+    return _sync_invoice_lines(invoice=invoice, lines=lines, delete_missing=False, delete_line_nos=delete_line_nos)
+
+
 @transaction.atomic
 def post_invoice(*, invoice: Invoice, actor_user):
     invoice = Invoice.objects.select_for_update().get(id=invoice.id)
@@ -64,27 +117,45 @@ def post_invoice(*, invoice: Invoice, actor_user):
         raise SalesValidationError("Invoice must have at least one line.")
     if invoice.total <= 0:
         raise SalesValidationError("Invoice total must be greater than zero.")
+    _assert_period_open(company=invoice.company, on_date=invoice.issue_date)
 
     if not invoice.invoice_no:
         invoice.invoice_no = get_next_sequence_value(company=invoice.company, key="invoice")
+    rate = _exchange_rate(company=invoice.company, currency_code=invoice.currency_code, on_date=invoice.issue_date)
+    invoice.exchange_rate = rate
 
     line_payload = [
         {
             "account": invoice.ar_account,
-            "debit": invoice.total,
+            "debit": Decimal("0"),
             "credit": Decimal("0"),
             "description": "Accounts Receivable",
         }
     ]
-    for inv_line in invoice.lines.select_related("revenue_account").all().order_by("line_no"):
+    tax_by_account = {}
+    for inv_line in invoice.lines.select_related("revenue_account", "tax_code__tax_account").all().order_by("line_no"):
         line_payload.append(
             {
                 "account": inv_line.revenue_account,
                 "debit": Decimal("0"),
-                "credit": inv_line.line_total,
+                "credit": to_base(inv_line.line_total, rate),
                 "description": f"Revenue: {inv_line.description}",
             }
         )
+        if inv_line.tax_code_id and inv_line.tax_amount:
+            tax_account = inv_line.tax_code.tax_account
+            tax_by_account.setdefault(tax_account.id, [tax_account, Decimal("0")])[1] += inv_line.tax_amount
+    for tax_account, amount in tax_by_account.values():
+        line_payload.append(
+            {
+                "account": tax_account,
+                "debit": Decimal("0"),
+                "credit": to_base(amount, rate),
+                "description": f"Tax payable: {tax_account.name}",
+            }
+        )
+    # Receivable is the sum of converted credits so per-line rounding never unbalances the entry.
+    line_payload[0]["debit"] = sum((line["credit"] for line in line_payload[1:]), Decimal("0"))
 
     if invoice.journal_entry_id:
         journal_entry = invoice.journal_entry
@@ -105,7 +176,7 @@ def post_invoice(*, invoice: Invoice, actor_user):
     post_journal_entry(entry=journal_entry, actor_user=actor_user)
 
     invoice.status = InvoiceStatus.POSTED
-    invoice.save(update_fields=["invoice_no", "status", "journal_entry", "updated_at"])
+    invoice.save(update_fields=["invoice_no", "status", "exchange_rate", "journal_entry", "updated_at"])
     return invoice
 
 
@@ -118,6 +189,7 @@ def void_invoice(*, invoice: Invoice, actor_user):
         raise SalesValidationError("Cannot void invoice with recorded payments.")
     if not invoice.journal_entry_id:
         raise SalesValidationError("Invoice has no journal entry to void.")
+    _assert_period_open(company=invoice.company, on_date=invoice.journal_entry.entry_date)
 
     void_journal_entry(entry=invoice.journal_entry, actor_user=actor_user)
     invoice.status = InvoiceStatus.VOID
@@ -125,41 +197,57 @@ def void_invoice(*, invoice: Invoice, actor_user):
     return invoice
 
 
-@transaction.atomic
-def replace_receipt_allocations(*, receipt: Receipt, allocations: list[dict]):
+def _sync_receipt_allocations(*, receipt: Receipt, allocations: list[dict], delete_missing: bool, delete_invoice_ids=()):
     if receipt.status != ReceiptStatus.DRAFT:
         raise SalesValidationError("Only draft receipts can be edited.")
-    if not allocations:
-        raise SalesValidationError("At least one allocation is required.")
 
-    total_allocation = Decimal("0")
+    incoming = []
     for item in allocations:
         invoice = item["invoice"]
         if invoice.customer_id != receipt.customer_id:
             raise SalesValidationError("Receipt allocation invoice customer mismatch.")
+        if invoice.currency_code != receipt.currency_code:
+            raise SalesValidationError("Receipt currency must match the allocated invoice currency.")
         open_amount = _invoice_open_amount(invoice)
         if item["amount"] <= 0:
             raise SalesValidationError("Allocation amount must be positive.")
         if item["amount"] > open_amount:
             raise SalesValidationError("Allocation exceeds invoice open balance.")
-        total_allocation += item["amount"]
-
-    if total_allocation > receipt.amount:
+        incoming.append(ReceiptAllocation(company=receipt.company, receipt=receipt, invoice=invoice, amount=item["amount"]))
+
+    try:
+        rows = sync_rows(
+            queryset=receipt.allocations.select_for_update(),
+            incoming=incoming,
+            key="invoice_id",
+            fields=("amount",),
+            delete_missing=delete_missing,
+            delete_keys=delete_invoice_ids,
+        )
+    except LineSyncError as exc:
+        raise SalesValidationError(str(exc)) from exc
+    if not rows:
+        raise SalesValidationError("At least one allocation is required.")
+    if sum(row.amount for row in rows) > receipt.amount:
         raise SalesValidationError("Total allocation exceeds receipt amount.")
+    return receipt
 
-    receipt.allocations.all().delete()
-    ReceiptAllocation.objects.bulk_create(
-        [
-            ReceiptAllocation(
-                company=receipt.company,
-                receipt=receipt,
-                invoice=item["invoice"],
-                amount=item["amount"],
-            )
-            for item in allocations
-        ]
+
+@transaction.atomic
+def replace_receipt_allocations(*, receipt: Receipt, allocations: list[dict]):
+    if not allocations:
+        raise SalesValidationError("At least one allocation is required.")
+    return _sync_receipt_allocations(receipt=receipt, allocations=allocations, delete_missing=True)
+
+
+@transaction.atomic
+def update_receipt_allocations(*, receipt: Receipt, allocations: list[dict], delete_invoice_ids=()):
+    return _sync_receipt_allocations(
+        receipt=receipt,
+        allocations=allocations,
+        delete_missing=False,
+        delete_invoice_ids=delete_invoice_ids,
     )
-    return receipt
 
 
 def _refresh_invoice_payment_status(invoice: Invoice):
@@ -180,17 +268,21 @@ def post_receipt(*, receipt: Receipt, actor_user):
     allocations = list(receipt.allocations.select_related("invoice", "invoice__ar_account").all())
     if not allocations:
         raise SalesValidationError("Receipt must include at least one allocation.")
+    _assert_period_open(company=receipt.company, on_date=receipt.received_date)
 
     total_allocation = Decimal("0")
     credit_by_account = {}
     account_lookup = {}
     for allocation in allocations:
+        if allocation.invoice.currency_code != receipt.currency_code:
+            raise SalesValidationError("Receipt currency must match the allocated invoice currency.")
         open_amount = _invoice_open_amount(allocation.invoice)
         if allocation.amount > open_amount:
             raise SalesValidationError("Allocation exceeds invoice open balance.")
         total_allocation += allocation.amount
         credit_by_account.setdefault(allocation.invoice.ar_account_id, Decimal("0"))
-        credit_by_account[allocation.invoice.ar_account_id] += allocation.amount
+        # Receivables are relieved at the invoice's carrying rate; any gap to today's rate is realized FX.
+        credit_by_account[allocation.invoice.ar_account_id] += to_base(allocation.amount, allocation.invoice.exchange_rate)
         account_lookup[allocation.invoice.ar_account_id] = allocation.invoice.ar_account
 
     if total_allocation > receipt.amount:
@@ -198,6 +290,11 @@ def post_receipt(*, receipt: Receipt, actor_user):
 
     if not receipt.receipt_no:
         receipt.receipt_no = get_next_sequence_value(company=receipt.company, key="receipt")
+    receipt.exchange_rate = _exchange_rate(
+        company=receipt.company,
+        currency_code=receipt.currency_code,
+        on_date=receipt.received_date,
+    )
 
     if receipt.journal_entry_id:
         journal_entry = receipt.journal_entry
@@ -217,7 +314,7 @@ def post_receipt(*, receipt: Receipt, actor_user):
     lines = [
         {
             "account": receipt.deposit_account,
-            "debit": total_allocation,
+            "debit": to_base(total_allocation, receipt.exchange_rate),
             "credit": Decimal("0"),
             "description": "Cash/Bank receipt",
         }
@@ -232,6 +329,10 @@ def post_receipt(*, receipt: Receipt, actor_user):
                 "description": "Accounts Receivable settlement",
             }
         )
+    difference = lines[0]["debit"] - sum((line["credit"] for line in lines[1:]), Decimal("0"))
+    fx_line = _fx_difference_line(company=receipt.company, difference=difference)
+    if fx_line:
+        lines.append(fx_line)
 
     replace_journal_lines(entry=journal_entry, lines=lines)
     post_journal_entry(entry=journal_entry, actor_user=actor_user)
@@ -241,7 +342,7 @@ def post_receipt(*, receipt: Receipt, actor_user):
         _refresh_invoice_payment_status(allocation.invoice)
 
     receipt.status = ReceiptStatus.POSTED
-    receipt.save(update_fields=["receipt_no", "status", "journal_entry", "updated_at"])
+    receipt.save(update_fields=["receipt_no", "status", "exchange_rate", "journal_entry", "updated_at"])
     return receipt
 
 
@@ -252,6 +353,7 @@ def void_receipt(*, receipt: Receipt, actor_user):
         raise SalesValidationError("Only posted receipts can be voided.")
     if not receipt.journal_entry_id:
         raise SalesValidationError("Receipt has no journal entry to void.")
+    _assert_period_open(company=receipt.company, on_date=receipt.journal_entry.entry_date)
 
     void_journal_entry(entry=receipt.journal_entry, actor_user=actor_user)
 
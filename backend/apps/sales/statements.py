@@ -0,0 +1,137 @@
+from decimal import Decimal
+from itertools import groupby
+
+from django.db.models import CharField, DecimalField, F, IntegerField, Value
+from django.db.models.functions import TruncDate
+
+from apps.common.streaming import chunked
+from apps.contacts.models import Contact, ContactType
+from apps.sales.models import Invoice, InvoiceStatus, Receipt, ReceiptStatus
+from apps.sales.services import SalesValidationError
+
+STATEMENT_CUSTOMER_BATCH_SIZE = 200
+STATEMENT_ROW_CHUNK_SIZE = 2000
+
+_MONEY = DecimalField(max_digits=19, decimal_places=4)
+_ZERO = Value(Decimal("0"), output_field=_MONEY)
+_COLUMNS = ("s_customer", "s_date", "s_rank", "s_kind", "s_document", "s_number", "s_debit", "s_credit")
+
+
+def _project(queryset, *, kind, rank, doc_date, number, debit, credit):
+    return (
+        queryset.order_by()
+        .annotate(
+            s_customer=F("customer_id"),
+            s_date=doc_date,
+            s_rank=Value(rank, output_field=IntegerField()),
+            s_kind=Value(kind, output_field=CharField()),
+            s_document=F("id"),
+            s_number=F(number),
+            s_debit=debit,
+            s_credit=credit,
+        )
+        .values(*_COLUMNS)
+    )
+
+
+def _statement_rows(*, company, customer_ids, end_date):
+    # Documents and their voids are projected onto one column layout so the database returns a
+    # single stream already ordered by customer and date.
+    invoices = Invoice.objects.filter(
+        company=company,
+        customer_id__in=customer_ids,
+        invoice_no__isnull=False,
+        status__in=[InvoiceStatus.POSTED, InvoiceStatus.PARTIALLY_PAID, InvoiceStatus.PAID, InvoiceStatus.VOID],
+        issue_date__lte=end_date,
+    )
+    voided_invoices = Invoice.objects.filter(
+        company=company,
+        customer_id__in=customer_ids,
+        status=InvoiceStatus.VOID,
+        journal_entry__voided_at__isnull=False,
+    )
+    receipts = Receipt.objects.filter(
+        company=company,
+        customer_id__in=customer_ids,
+        receipt_no__isnull=False,
+        status__in=[ReceiptStatus.POSTED, ReceiptStatus.VOID],
+        received_date__lte=end_date,
+    )
+    voided_receipts = Receipt.objects.filter(
+        company=company,
+        customer_id__in=customer_ids,
+        status=ReceiptStatus.VOID,
+        journal_entry__voided_at__isnull=False,
+    )
+    voided_on = TruncDate("journal_entry__voided_at")
+
+    parts = [
+        _project(invoices, kind="invoice", rank=0, doc_date=F("issue_date"), number="invoice_no", debit=F("total"), credit=_ZERO),
+        _project(receipts, kind="receipt", rank=1, doc_date=F("received_date"), number="receipt_no", debit=_ZERO, credit=F("amount")),
+        _project(
+            voided_invoices, kind="invoice_void", rank=2, doc_date=voided_on, number="invoice_no", debit=_ZERO, credit=F("total")
+        ).filter(s_date__lte=end_date),
+        _project(
+            voided_receipts, kind="receipt_void", rank=3, doc_date=voided_on, number="receipt_no", debit=F("amount"), credit=_ZERO
+        ).filter(s_date__lte=end_date),
+    ]
+    combined = parts[0].union(*parts[1:], all=True).order_by("s_customer", "s_date", "s_rank", "s_number")
+    return combined.iterator(chunk_size=STATEMENT_ROW_CHUNK_SIZE)
+
+
+def _build_statement(*, customer, rows, start_date, end_date):
+    opening = Decimal("0")
+    balance = Decimal("0")
+    lines = []
+    for row in rows:
+        debit = row["s_debit"] or Decimal("0")
+        credit = row["s_credit"] or Decimal("0")
+        balance += debit - credit
+        if row["s_date"] < start_date:
+            opening = balance
+            continue
+        lines.append(
+            {
+                "date": row["s_date"].isoformat(),
+                "type": row["s_kind"],
+                "document_id": str(row["s_document"]),
+                "number": row["s_number"],
+                "debit": str(debit),
+                "credit": str(credit),
+                "balance": str(balance),
+            }
+        )
+    return {
+        "customer_id": str(customer.id),
+        "customer_name": customer.name,
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "opening_balance": str(opening),
+        "closing_balance": str(balance),
+        "lines": lines,
+    }
+
+
+def build_customer_statement(*, company, customer, start_date, end_date):
+    if customer.company_id != company.id:
+        raise SalesValidationError("Customer must belong to the selected company.")
+    rows = _statement_rows(company=company, customer_ids=[customer.id], end_date=end_date)
+    return _build_statement(customer=customer, rows=rows, start_date=start_date, end_date=end_date)
+
+
+def iter_customer_statements(*, company, start_date, end_date, batch_size=STATEMENT_CUSTOMER_BATCH_SIZE):
+    """Yield one statement per customer with activity, issuing one union query per customer batch."""
+    customers = (
+        Contact.objects.filter(company=company, type__in=[ContactType.CUSTOMER, ContactType.BOTH])
+        .order_by("id")
+        .only("id", "company_id", "name")
+    )
+    for batch in chunked(customers.iterator(chunk_size=batch_size), batch_size):
+        by_id = {customer.id: customer for customer in batch}
+        rows = _statement_rows(company=company, customer_ids=list(by_id), end_date=end_date)
+        for customer_id, customer_rows in groupby(rows, key=lambda row: row["s_customer"]):
+            statement = _build_statement(
+                customer=by_id[customer_id], rows=customer_rows, start_date=start_date, end_date=end_date
+            )
+            if statement["lines"] or Decimal(statement["closing_balance"]):
+                yield statement
@@ -1,11 +1,21 @@
+import io
+import json
+from datetime import date
+from decimal import Decimal
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.test import APITestCase
 
-from apps.accounting.models import Account
+from apps.accounting.models import Account, TaxCode
+from apps.accounting.revaluation import revalue_foreign_balances
 from apps.companies.services import create_company_for_user
 from apps.contacts.models import Contact
 from apps.journals.models import JournalEntry, JournalStatus
-from apps.sales.models import Invoice
+from apps.sales.models import Invoice, InvoiceLine, Receipt, RecurringInvoiceTemplate
 from apps.users.models import User
 
 
@@ -173,6 +183,41 @@ class SalesApiTests(APITestCase):
         )
         self.assertEqual(alloc_res.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_receipt_currency_must_match_invoice_currency(self):
+        invoice_id = self._create_invoice_with_lines()
+        self.client.post(f"/api/v1/sales/companies/{self.company.id}/invoices/{invoice_id}/post/", {}, format="json")
+
+        receipt_res = self.client.post(
+            f"/api/v1/sales/companies/{self.company.id}/receipts/",
+            {
+                "customer": str(self.customer.id),
+                "received_date": "2026-02-20",
+                "amount": "100.00",
+                "currency_code": "EUR",
+                "deposit_account": str(self.cash_account.id),
+            },
+            format="json",
+            HTTP_IDEMPOTENCY_KEY="receipt-create-fx",
+        )
+        receipt_id = receipt_res.data["id"]
+        alloc_url = f"/api/v1/sales/companies/{self.company.id}/receipts/{receipt_id}/allocations/"
+
+        alloc_res = self.client.put(alloc_url, {"allocations": [{"invoice_id": str(invoice_id), "amount": "100.00"}]}, format="json")
+        self.assertEqual(alloc_res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        Receipt.objects.filter(id=receipt_id).update(currency_code="USD")
+        alloc_res = self.client.put(alloc_url, {"allocations": [{"invoice_id": str(invoice_id), "amount": "100.00"}]}, format="json")
+        self.assertEqual(alloc_res.status_code, status.HTTP_200_OK)
+        Receipt.objects.filter(id=receipt_id).update(currency_code="EUR")
+        post_res = self.client.post(
+            f"/api/v1/sales/companies/{self.company.id}/receipts/{receipt_id}/post/",
+            {},
+            format="json",
+            HTTP_IDEMPOTENCY_KEY="receipt-post-fx",
+        )
+        self.assertEqual(post_res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Invoice.objects.get(id=invoice_id).amount_paid, Decimal("0"))
+
     def test_receipt_post_idempotency_prevents_double_apply(self):
         invoice_id = self._create_invoice_with_lines()
         self.client.post(f"/api/v1/sales/companies/{self.company.id}/invoices/{invoice_id}/post/", {}, format="json")
@@ -227,3 +272,336 @@ class SalesApiTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["count"], 2)
         self.assertEqual(len(response.data["results"]), 1)
+
+    def test_invoice_csv_import_creates_drafts_and_reports_row_errors(self):
+        self.client.force_authenticate(user=self.owner)
+        content = (
+            "invoice_ref,customer,issue_date,description,quantity,unit_price,revenue_account\n"
+            "INV-1,Customer One,2026-02-01,Consulting,2,50.00,4000\n"
+            "INV-1,Customer One,2026-02-01,Support,1,25.00,4000\n"
+            "INV-2,Unknown Customer,2026-02-02,Consulting,1,10.00,4000\n"
+            "INV-3,customer one,2026-02-03,Licence,1,99.99,4000\n"
+            "INV-4,Customer One,2026-02-04,Licence,1,NaN,4000\n"
+            "INV-5,Customer One,2026-02-05,Licence,1,1e30,4000\n"
+            "INV-6,Customer One,2026-02-06,Licence,1,0.00001,4000\n"
+        )
+        upload = SimpleUploadedFile("invoices.csv", content.encode("utf-8"), content_type="text/csv")
+        response = self.client.post(
+            f"/api/v1/sales/companies/{self.company.id}/invoices/import/",
+            {"file": upload, "ar_account_id": str(self.ar_account.id)},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["invoices_created"], 2)
+        self.assertEqual(response.data["lines_created"], 3)
+        self.assertEqual(response.data["invoices_failed"], 4)
+        self.assertEqual(response.data["errors"][0]["row"], 4)
+        self.assertEqual(response.data["errors"][0]["ref"], "INV-2")
+        self.assertEqual([error["ref"] for error in response.data["errors"][1:]], ["INV-4", "INV-5", "INV-6"])
+
+        first = Invoice.objects.get(company=self.company, issue_date="2026-02-01")
+        self.assertEqual(str(first.total), "125.0000")
+        self.assertEqual(first.status, "draft")
+        self.assertEqual(InvoiceLine.objects.filter(invoice=first).count(), 2)
+
+    def test_invoice_import_rejects_malformed_csv(self):
+        self.client.force_authenticate(user=self.owner)
+        content = "invoice_ref,customer,issue_date,description\nINV-1,Customer One,2026-02-01," + "x" * 200000 + "\n"
+        upload = SimpleUploadedFile("invoices.csv", content.encode("utf-8"), content_type="text/csv")
+        response = self.client.post(
+            f"/api/v1/sales/companies/{self.company.id}/invoices/import/",
+            {"file": upload, "ar_account_id": str(self.ar_account.id)},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("field larger than field limit", response.data["error"]["message"])
+
+    def test_invoice_ndjson_import_resolves_accounts_by_code(self):
+        self.client.force_authenticate(user=self.owner)
+        records = [
+            {
+                "ref": "A",
+                "customer": str(self.customer.id),
+                "issue_date": "2026-03-01",
+                "ar_account": "1100",
+                "lines": [{"description": "Plan", "quantity": "3", "unit_price": "10", "revenue_account": "4000"}],
+            },
+            {"ref": "B", "customer": "Customer One", "issue_date": "2026-03-02", "lines": []},
+            {
+                "ref": "C",
+                "customer": "Customer One",
+                "issue_date": "2026-03-03",
+                "ar_account": "1100",
+                "lines": [{"line_no": -1, "quantity": "1", "unit_price": "10", "revenue_account": "4000"}],
+            },
+            {
+                "ref": "D",
+                "customer": "Customer One",
+                "issue_date": "2026-03-04",
+                "ar_account": "1100",
+                "lines": [{"line_no": "first", "quantity": "1", "unit_price": "10", "revenue_account": "4000"}],
+            },
+            {
+                "ref": "E",
+                "customer": "Customer One",
+                "issue_date": "2026-03-05",
+                "ar_account": "1100",
+                "currency_code": "EURO",
+                "lines": [{"quantity": "1", "unit_price": "10", "revenue_account": "4000"}],
+            },
+        ]
+        content = "\n".join(json.dumps(record) for record in records) + "\nnot-json\n"
+        upload = SimpleUploadedFile("invoices.ndjson", content.encode("utf-8"))
+        response = self.client.post(
+            f"/api/v1/sales/companies/{self.company.id}/invoices/import/",
+            {"file": upload},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["invoices_created"], 1)
+        self.assertEqual([error["row"] for error in response.data["errors"]], [2, 3, 4, 5, 6])
+        self.assertIn("Line numbers start at 1", response.data["errors"][1]["detail"])
+        self.assertIn("Expected a whole number", response.data["errors"][2]["detail"])
+        self.assertIn("3-letter ISO code", response.data["errors"][3]["detail"])
+        invoice = Invoice.objects.get(company=self.company)
+        self.assertEqual(invoice.ar_account_id, self.ar_account.id)
+        self.assertEqual(str(invoice.total), "30.0000")
+
+    def _list_query_count(self, query):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(f"/api/v1/sales/companies/{self.company.id}/invoices/{query}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, len(captured)
+
+    def test_invoice_list_query_count_is_constant(self):
+        self._create_invoice_with_lines()
+        _, baseline_full = self._list_query_count("?page_size=200")
+        _, baseline_summary = self._list_query_count("?page_size=200&view=summary")
+
+        for _ in range(4):
+            self._create_invoice_with_lines()
+        full_response, full_queries = self._list_query_count("?page_size=200")
+        summary_response, summary_queries = self._list_query_count("?page_size=200&view=summary")
+
+        self.assertEqual(full_queries, baseline_full)
+        self.assertEqual(summary_queries, baseline_summary)
+        self.assertEqual(len(full_response.data["results"][0]["lines"]), 1)
+        self.assertNotIn("lines", summary_response.data["results"][0])
+        self.assertEqual(summary_response.data["results"][0]["line_count"], 1)
+        self.assertEqual(summary_response.data["results"][0]["customer_name"], "Customer One")
+
+    def test_recurring_invoice_generation_is_idempotent_per_period(self):
+        self.client.force_authenticate(user=self.owner)
+        template_res = self.client.post(
+            f"/api/v1/sales/companies/{self.company.id}/recurring-invoices/",
+            {
+                "name": "Monthly subscription",
+                "customer": str(self.customer.id),
+                "ar_account": str(self.ar_account.id),
+                "frequency": "monthly",
+                "start_date": "2026-01-31",
+                "due_days": 15,
+                "lines": [
+                    {
+                        "line_no": 1,
+                        "description": "Subscription",
+                        "quantity": "1",
+                        "unit_price": "49.00",
+                        "revenue_account": str(self.revenue_account.id),
+                    }
+                ],
+            },
+            format="json",
+        )
+        self.assertEqual(template_res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(template_res.data["next_run_date"], "2026-01-31")
+
+        call_command("generate_recurring_documents", "--as-of", "2026-03-31", "--only", "invoices", stdout=io.StringIO())
+        call_command("generate_recurring_documents", "--as-of", "2026-03-31", "--only", "invoices", stdout=io.StringIO())
+
+        invoices = list(Invoice.objects.filter(company=self.company).order_by("issue_date"))
+        self.assertEqual(
+            [str(invoice.issue_date) for invoice in invoices],
+            ["2026-01-31", "2026-02-28", "2026-03-31"],
+        )
+        self.assertEqual([invoice.invoice_no for invoice in invoices], [1, 2, 3])
+        self.assertEqual(str(invoices[1].due_date), "2026-03-15")
+        self.assertEqual(str(invoices[0].total), "49.0000")
+        template = RecurringInvoiceTemplate.objects.get(id=template_res.data["id"])
+        self.assertEqual(str(template.next_run_date), "2026-04-30")
+
+    def test_customer_statement_running_balance_and_stream(self):
+        first_invoice_id = self._create_invoice_with_lines()
+        second_invoice_id = self._create_invoice_with_lines()
+        for invoice_id in (first_invoice_id, second_invoice_id):
+            self.client.post(f"/api/v1/sales/companies/{self.company.id}/invoices/{invoice_id}/post/", {}, format="json")
+        receipt_res = self.client.post(
+            f"/api/v1/sales/companies/{self.company.id}/receipts/",
+            {
+                "customer": str(self.customer.id),
+                "received_date": "2026-02-20",
+                "amount": "50.00",
+                "currency_code": "USD",
+                "deposit_account": str(self.cash_account.id),
+            },
+            format="json",
+            HTTP_IDEMPOTENCY_KEY="statement-receipt-create",
+        )
+        receipt_id = receipt_res.data["id"]
+        self.client.put(
+            f"/api/v1/sales/companies/{self.company.id}/receipts/{receipt_id}/allocations/",
+            {"allocations": [{"invoice_id": str(first_invoice_id), "amount": "50.00"}]},
+            format="json",
+        )
+        self.client.post(
+            f"/api/v1/sales/companies/{self.company.id}/receipts/{receipt_id}/post/",
+            {},
+            format="json",
+            HTTP_IDEMPOTENCY_KEY="statement-receipt-post",
+        )
+        void_res = self.client.post(
+            f"/api/v1/sales/companies/{self.company.id}/invoices/{second_invoice_id}/void/", {}, format="json"
+        )
+        self.assertEqual(void_res.status_code, status.HTTP_200_OK)
+
+        params = {"start_date": "2026-02-20", "end_date": "2099-12-31"}
+        res = self.client.get(
+            f"/api/v1/sales/companies/{self.company.id}/customers/{self.customer.id}/statement/", params
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["opening_balance"], "240.0000")
+        self.assertEqual([line["type"] for line in res.data["lines"]], ["receipt", "invoice_void"])
+        self.assertEqual([line["balance"] for line in res.data["lines"]], ["190.0000", "70.0000"])
+        self.assertEqual(res.data["closing_balance"], "70.0000")
+
+        stream_res = self.client.get(f"/api/v1/sales/companies/{self.company.id}/reports/customer-statements/", params)
+        self.assertEqual(stream_res.status_code, status.HTTP_200_OK)
+        statements = [json.loads(line) for line in b"".join(stream_res.streaming_content).splitlines()]
+        self.assertEqual(len(statements), 1)
+        self.assertEqual(statements[0], json.loads(json.dumps(res.data)))
+
+    def test_invoice_lines_compute_tax_and_post_tax_liability(self):
+        tax_account = Account.objects.create(
+            company=self.company, code="2200", name="Sales Tax Payable", type="liability", normal_balance="credit"
+        )
+        tax_code = TaxCode.objects.create(
+            company=self.company, code="GST", name="GST", rate=Decimal("7.5"), tax_account=tax_account
+        )
+        invoice_id = self._create_invoice_with_lines()
+        url = f"/api/v1/sales/companies/{self.company.id}/invoices/{invoice_id}/lines/"
+
+        def replace_lines(count):
+            line = {
+                "description": "Taxed service",
+                "quantity": "1",
+                "unit_price": "10.00",
+                "revenue_account_id": str(self.revenue_account.id),
+                "tax_code_id": str(tax_code.id),
+            }
+            with CaptureQueriesContext(connection) as ctx:
+                res = self.client.put(url, {"lines": [line] * count}, format="json")
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            return res, len(ctx.captured_queries)
+
+        _, small_query_count = replace_lines(1)
+        res, large_query_count = replace_lines(40)
+        self.assertEqual(small_query_count, large_query_count)
+        self.assertEqual(res.data["subtotal"], "400.0000")
+        self.assertEqual(res.data["tax_total"], "30.0000")
+        self.assertEqual(res.data["total"], "430.0000")
+
+        self.client.post(f"/api/v1/sales/companies/{self.company.id}/invoices/{invoice_id}/post/", {}, format="json")
+        journal = JournalEntry.objects.get(id=Invoice.objects.get(id=invoice_id).journal_entry_id)
+        tax_line = journal.lines.get(account=tax_account)
+        self.assertEqual(tax_line.credit, Decimal("30.0000"))
+        self.assertEqual(journal.lines.count(), 42)
+
+    def test_invoice_line_patch_writes_only_changed_lines(self):
+        invoice_id = self._create_invoice_with_lines()
+        url = f"/api/v1/sales/companies/{self.company.id}/invoices/{invoice_id}/lines/"
+        lines = [
+            {
+                "line_no": line_no,
+                "description": f"Item {line_no}",
+                "quantity": "1",
+                "unit_price": "10.00",
+                "revenue_account_id": str(self.revenue_account.id),
+            }
+            for line_no in (1, 2, 3)
+        ]
+        self.assertEqual(self.client.put(url, {"lines": lines}, format="json").status_code, status.HTTP_200_OK)
+        before = {line.line_no: line for line in InvoiceLine.objects.filter(invoice_id=invoice_id)}
+
+        res = self.client.patch(
+            url,
+            {"lines": [{**lines[1], "quantity": "3"}, {**lines[0], "line_no": 4}], "delete_line_nos": [3]},
+            format="json",
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["total"], "50.0000")
+        after = {line.line_no: line for line in InvoiceLine.objects.filter(invoice_id=invoice_id)}
+        self.assertEqual(sorted(after), [1, 2, 4])
+        self.assertEqual(after[1].updated_at, before[1].updated_at)
+        self.assertEqual(after[2].id, before[2].id)
+        self.assertEqual(after[2].quantity, Decimal("3"))
+
+        res = self.client.patch(url, {"delete_line_nos": [9]}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_foreign_invoice_posts_in_base_currency_and_revalues(self):
+        fx_account = Account.objects.create(
+            company=self.company, code="7900", name="FX Gain/Loss", type="expense", normal_balance="debit"
+        )
+        self.company.fx_gain_loss_account = fx_account
+        self.company.save(update_fields=["fx_gain_loss_account", "updated_at"])
+        self.client.force_authenticate(user=self.owner)
+        for rate_date, rate in (("2026-02-01", "1.10"), ("2026-02-28", "1.20"), ("2026-03-05", "1.25")):
+            rate_res = self.client.post(
+                f"/api/v1/accounting/companies/{self.company.id}/exchange-rates/",
+                {"currency_code": "eur", "rate_date": rate_date, "rate": rate},
+                format="json",
+            )
+            self.assertEqual(rate_res.status_code, status.HTTP_201_CREATED)
+
+        invoice_id = self._create_invoice_with_lines()
+        Invoice.objects.filter(id=invoice_id).update(currency_code="EUR")
+        self.client.post(f"/api/v1/sales/companies/{self.company.id}/invoices/{invoice_id}/post/", {}, format="json")
+        invoice = Invoice.objects.get(id=invoice_id)
+        self.assertEqual(invoice.journal_entry.lines.get(account=self.ar_account).debit, Decimal("132.0000"))
+
+        revaluation = revalue_foreign_balances(company=self.company, as_of=date(2026, 2, 28), actor_user=self.owner)
+        entry = JournalEntry.objects.get(id=revaluation["journal_entry_id"])
+        self.assertEqual(entry.lines.get(account=self.ar_account).debit, Decimal("12.0000"))
+        self.assertEqual(entry.lines.get(account=fx_account).credit, Decimal("12.0000"))
+        rerun = revalue_foreign_balances(company=self.company, as_of=date(2026, 2, 28), actor_user=self.owner)
+        self.assertIsNone(rerun["journal_entry_id"])
+
+        receipt_res = self.client.post(
+            f"/api/v1/sales/companies/{self.company.id}/receipts/",
+            {
+                "customer": str(self.customer.id),
+                "received_date": "2026-03-05",
+                "amount": "120.00",
+                "currency_code": "EUR",
+                "deposit_account": str(self.cash_account.id),
+            },
+            format="json",
+            HTTP_IDEMPOTENCY_KEY="fx-receipt-create",
+        )
+        receipt_id = receipt_res.data["id"]
+        self.client.put(
+            f"/api/v1/sales/companies/{self.company.id}/receipts/{receipt_id}/allocations/",
+            {"allocations": [{"invoice_id": str(invoice_id), "amount": "120.00"}]},
+            format="json",
+        )
+        post_res = self.client.post(
+            f"/api/v1/sales/companies/{self.company.id}/receipts/{receipt_id}/post/",
+            {},
+            format="json",
+            HTTP_IDEMPOTENCY_KEY="fx-receipt-post",
+        )
+        self.assertEqual(post_res.status_code, status.HTTP_200_OK)
+        receipt_entry = JournalEntry.objects.get(id=post_res.data["journal_entry"])
+        self.assertEqual(receipt_entry.lines.get(account=self.cash_account).debit, Decimal("150.0000"))
+        self.assertEqual(receipt_entry.lines.get(account=self.ar_account).credit, Decimal("144.0000"))
+        self.assertEqual(receipt_entry.lines.get(account=fx_account).credit, Decimal("6.0000"))
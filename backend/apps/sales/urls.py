@@ -2,7 +2,10 @@ from django.urls import path
 
 from apps.sales.views import (
     ARAgingView,
+    CustomerStatementStreamView,
+    CustomerStatementView,
     InvoiceDetailUpdateView,
+    InvoiceImportView,
     InvoiceLinesReplaceView,
     InvoiceListCreateView,
     InvoicePostView,
@@ -12,10 +15,13 @@ from apps.sales.views import (
     ReceiptListCreateView,
     ReceiptPostView,
     ReceiptVoidView,
+    RecurringInvoiceTemplateDetailUpdateView,
+    RecurringInvoiceTemplateListCreateView,
 )
 
 urlpatterns = [
     path("companies/<uuid:company_id>/invoices/", InvoiceListCreateView.as_view(), name="invoice_list_create"),
+    path("companies/<uuid:company_id>/invoices/import/", InvoiceImportView.as_view(), name="invoice_import"),
     path("companies/<uuid:company_id>/invoices/<uuid:invoice_id>/", InvoiceDetailUpdateView.as_view(), name="invoice_detail"),
     path(
         "companies/<uuid:company_id>/invoices/<uuid:invoice_id>/lines/",
@@ -33,5 +39,25 @@ urlpatterns = [
     ),
     path("companies/<uuid:company_id>/receipts/<uuid:receipt_id>/post/", ReceiptPostView.as_view(), name="receipt_post"),
     path("companies/<uuid:company_id>/receipts/<uuid:receipt_id>/void/", ReceiptVoidView.as_view(), name="receipt_void"),
+    path(
+        "companies/<uuid:company_id>/recurring-invoices/",
+        RecurringInvoiceTemplateListCreateView.as_view(),
+        name="recurring_invoice_list_create",
+    ),
+    path(
+        "companies/<uuid:company_id>/recurring-invoices/<uuid:template_id>/",
+        RecurringInvoiceTemplateDetailUpdateView.as_view(),
+        name="recurring_invoice_detail",
+    ),
+    path(
+        "companies/<uuid:company_id>/customers/<uuid:customer_id>/statement/",
+        CustomerStatementView.as_view(),
+        name="customer_statement",
+    ),
     path("companies/<uuid:company_id>/reports/ar-aging/", ARAgingView.as_view(), name="ar_aging"),
+    path(
+        "companies/<uuid:company_id>/reports/customer-statements/",
+        CustomerStatementStreamView.as_view(),
+        name="customer_statements_stream",
+    ),
 ]
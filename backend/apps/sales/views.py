@@ -1,23 +1,35 @@
+import csv
 import hashlib
 import json
 from datetime import timedelta
 
+from django.db.models import Count, Prefetch
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from rest_framework import generics, permissions, response, status, views
 
 from apps.audit.services import log_audit_event
 from apps.common.pagination import DefaultListPagination
+from apps.common.streaming import RecordFormatError, detect_record_format, open_text_stream
 from apps.common.tenant import get_company_for_user_or_404, user_has_permission_in_company
+from apps.contacts.models import Contact, ContactType
 from apps.idempotency.models import IdempotencyStatus
 from apps.idempotency.services import create_or_update_idempotency_record, get_valid_idempotency_record
 from apps.rbac.constants import PERMISSION_ACCOUNTING_POST, PERMISSION_ACCOUNTING_VIEW
-from apps.sales.models import Invoice, Receipt
+from apps.sales.bulk_import import import_invoices
+from apps.sales.models import Invoice, InvoiceLine, Receipt, RecurringInvoiceTemplate, RecurringInvoiceTemplateLine
 from apps.sales.serializers import (
     ARAgingQuerySerializer,
+    CustomerStatementQuerySerializer,
+    InvoiceImportSerializer,
     InvoiceLinesReplaceSerializer,
+    InvoiceLinesUpdateSerializer,
     InvoiceSerializer,
+    InvoiceSummarySerializer,
     ReceiptAllocationsReplaceSerializer,
+    ReceiptAllocationsUpdateSerializer,
     ReceiptSerializer,
+    RecurringInvoiceTemplateSerializer,
 )
 from apps.sales.services import (
     SalesValidationError,
@@ -26,9 +38,12 @@ from apps.sales.services import (
     post_receipt,
     replace_invoice_lines,
     replace_receipt_allocations,
+    update_invoice_lines,
+    update_receipt_allocations,
     void_invoice,
     void_receipt,
 )
+from apps.sales.statements import build_customer_statement, iter_customer_statements
 
 
 def _request_hash(data):
@@ -44,6 +59,10 @@ def _get_idempotency_key(request):
     return request.headers.get("Idempotency-Key")
 
 
+def _summary_view_requested(request):
+    return request.method == "GET" and request.query_params.get("view", "").lower() == "summary"
+
+
 class InvoiceListCreateView(generics.ListCreateAPIView):
     serializer_class = InvoiceSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -52,9 +71,21 @@ class InvoiceListCreateView(generics.ListCreateAPIView):
     def _company(self):
         return get_company_for_user_or_404(user=self.request.user, company_id=self.kwargs["company_id"])
 
+    def get_serializer_class(self):
+        if _summary_view_requested(self.request):
+            return InvoiceSummarySerializer
+        return InvoiceSerializer
+
     def get_queryset(self):
         company = self._company()
         queryset = Invoice.objects.filter(company=company).select_related("customer", "ar_account")
+        if _summary_view_requested(self.request):
+            # Aggregation drops Meta.ordering, so restate it to keep pagination stable.
+            queryset = queryset.annotate(line_count=Count("lines")).order_by(*Invoice._meta.ordering)
+        else:
+            queryset = queryset.prefetch_related(
+                Prefetch("lines", queryset=InvoiceLine.objects.order_by("line_no"))
+            )
         status_filter = self.request.query_params.get("status")
         if status_filter:
             queryset = queryset.filter(status=status_filter)
@@ -87,6 +118,51 @@ class InvoiceListCreateView(generics.ListCreateAPIView):
         return response.Response(self.get_serializer(invoice).data, status=status.HTTP_201_CREATED)
 
 
+class InvoiceImportView(views.APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, company_id):
+        company = get_company_for_user_or_404(user=request.user, company_id=company_id)
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_POST,
+        ):
+            return response.Response({"detail": "Insufficient permission."}, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = InvoiceImportSerializer(data=request.data, context={"company": company})
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.validated_data["file"]
+        try:
+            record_format = detect_record_format(
+                file_name=upload.name,
+                requested=serializer.validated_data.get("file_format", ""),
+            )
+            summary = import_invoices(
+                company=company,
+                text_stream=open_text_stream(upload.file),
+                record_format=record_format,
+                default_ar_account=serializer.context.get("default_ar_account"),
+            )
+        except (RecordFormatError, csv.Error, UnicodeDecodeError) as exc:
+            return response.Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        log_audit_event(
+            company=company,
+            actor_user=request.user,
+            action="invoice.import",
+            entity_type="invoice",
+            metadata={
+                "file_name": upload.name,
+                "invoices_created": summary["invoices_created"],
+                "invoices_failed": summary["invoices_failed"],
+            },
+            ip_address=request.META.get("REMOTE_ADDR"),
+            user_agent=request.headers.get("User-Agent", ""),
+        )
+        return response.Response(summary)
+
+
 class InvoiceDetailUpdateView(generics.RetrieveUpdateAPIView):
     serializer_class = InvoiceSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -144,6 +220,29 @@ class InvoiceLinesReplaceView(views.APIView):
             return response.Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
         return response.Response(InvoiceSerializer(invoice).data)
 
+    def patch(self, request, company_id, invoice_id):
+        company = get_company_for_user_or_404(user=request.user, company_id=company_id)
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_POST,
+        ):
+            return response.Response({"detail": "Insufficient permission."}, status=status.HTTP_403_FORBIDDEN)
+
+        invoice = generics.get_object_or_404(Invoice, company=company, id=invoice_id)
+        serializer = InvoiceLinesUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            payload = serializer.to_service_payload(company=company)
+            update_invoice_lines(
+                invoice=invoice,
+                lines=payload,
+                delete_line_nos=serializer.validated_data["delete_line_nos"],
+            )
+        except SalesValidationError as exc:
+            return response.Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return response.Response(InvoiceSerializer(invoice).data)
+
 
 class InvoicePostView(views.APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -318,6 +417,29 @@ class ReceiptAllocationsReplaceView(views.APIView):
             return response.Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
         return response.Response(ReceiptSerializer(receipt).data)
 
+    def patch(self, request, company_id, receipt_id):
+        company = get_company_for_user_or_404(user=request.user, company_id=company_id)
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_POST,
+        ):
+            return response.Response({"detail": "Insufficient permission."}, status=status.HTTP_403_FORBIDDEN)
+        receipt = generics.get_object_or_404(Receipt, company=company, id=receipt_id)
+
+        serializer = ReceiptAllocationsUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            payload = serializer.to_service_payload(company=company)
+            update_receipt_allocations(
+                receipt=receipt,
+                allocations=payload,
+                delete_invoice_ids=serializer.validated_data["delete_invoice_ids"],
+            )
+        except SalesValidationError as exc:
+            return response.Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return response.Response(ReceiptSerializer(receipt).data)
+
 
 class ReceiptPostView(views.APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -399,6 +521,88 @@ class ReceiptVoidView(views.APIView):
         return response.Response(ReceiptSerializer(voided).data)
 
 
+class RecurringInvoiceTemplateListCreateView(generics.ListCreateAPIView):
+    serializer_class = RecurringInvoiceTemplateSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = DefaultListPagination
+
+    def _company(self):
+        return get_company_for_user_or_404(user=self.request.user, company_id=self.kwargs["company_id"])
+
+    def get_queryset(self):
+        company = self._company()
+        queryset = RecurringInvoiceTemplate.objects.filter(company=company).prefetch_related(
+            Prefetch("lines", queryset=RecurringInvoiceTemplateLine.objects.order_by("line_no"))
+        )
+        is_active = self.request.query_params.get("is_active")
+        if is_active:
+            queryset = queryset.filter(is_active=is_active.lower() in {"1", "true", "yes"})
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        company = self._company()
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_VIEW,
+        ):
+            return response.Response({"detail": "Insufficient permission."}, status=status.HTTP_403_FORBIDDEN)
+        return super().list(request, *args, **kwargs)
+
+    def create(self, request, *args, **kwargs):
+        company = self._company()
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_POST,
+        ):
+            return response.Response({"detail": "Insufficient permission."}, status=status.HTTP_403_FORBIDDEN)
+        serializer = self.get_serializer(data=request.data, context={"company": company})
+        serializer.is_valid(raise_exception=True)
+        template = serializer.save(company=company)
+        return response.Response(self.get_serializer(template).data, status=status.HTTP_201_CREATED)
+
+
+class RecurringInvoiceTemplateDetailUpdateView(generics.RetrieveUpdateAPIView):
+    serializer_class = RecurringInvoiceTemplateSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def _company(self):
+        return get_company_for_user_or_404(user=self.request.user, company_id=self.kwargs["company_id"])
+
+    def get_object(self):
+        company = self._company()
+        return generics.get_object_or_404(RecurringInvoiceTemplate, company=company, id=self.kwargs["template_id"])
+
+    def retrieve(self, request, *args, **kwargs):
+        company = self._company()
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_VIEW,
+        ):
+            return response.Response({"detail": "Insufficient permission."}, status=status.HTTP_403_FORBIDDEN)
+        return super().retrieve(request, *args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        company = self._company()
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_POST,
+        ):
+            return response.Response({"detail": "Insufficient permission."}, status=status.HTTP_403_FORBIDDEN)
+        serializer = self.get_serializer(
+            self.get_object(),
+            data=request.data,
+            partial=kwargs.pop("partial", False),
+            context={"company": company},
+        )
+        serializer.is_valid(raise_exception=True)
+        template = serializer.save()
+        return response.Response(self.get_serializer(template).data)
+
+
 class ARAgingView(views.APIView):
     permission_classes = [permissions.IsAuthenticated]
 
@@ -417,3 +621,58 @@ class ARAgingView(views.APIView):
         rows = build_ar_aging(company=company, as_of_date=as_of)
         return response.Response(rows)
 
+
+class CustomerStatementView(views.APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, company_id, customer_id):
+        company = get_company_for_user_or_404(user=request.user, company_id=company_id)
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_VIEW,
+        ):
+            return response.Response({"detail": "Insufficient permission."}, status=status.HTTP_403_FORBIDDEN)
+
+        query = CustomerStatementQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        customer = generics.get_object_or_404(
+            Contact,
+            company=company,
+            id=customer_id,
+            type__in=[ContactType.CUSTOMER, ContactType.BOTH],
+        )
+        payload = build_customer_statement(
+            company=company,
+            customer=customer,
+            start_date=query.validated_data["start_date"],
+            end_date=query.validated_data["end_date"],
+        )
+        return response.Response(payload)
+
+
+class CustomerStatementStreamView(views.APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, company_id):
+        company = get_company_for_user_or_404(user=request.user, company_id=company_id)
+        if not user_has_permission_in_company(
+            user=request.user,
+            company=company,
+            permission_code=PERMISSION_ACCOUNTING_VIEW,
+        ):
+            return response.Response({"detail": "Insufficient permission."}, status=status.HTTP_403_FORBIDDEN)
+
+        query = CustomerStatementQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        statements = iter_customer_statements(
+            company=company,
+            start_date=query.validated_data["start_date"],
+            end_date=query.validated_data["end_date"],
+        )
+        stream = StreamingHttpResponse(
+            (json.dumps(statement) + "\n" for statement in statements),
+            content_type="application/x-ndjson",
+        )
+        stream["Content-Disposition"] = 'attachment; filename="customer-statements.ndjson"'
+        return stream
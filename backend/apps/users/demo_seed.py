@@ -10,6 +10,7 @@ from apps.banking.services import finalize_reconciliation, match_bank_transactio
 from apps.companies.models import Company, CompanyMember, CompanyMemberStatus
 from apps.companies.services import create_company_for_user
 from apps.contacts.models import Contact, ContactType
+from apps.documents.blobs import store_blob
 from apps.journals.models import JournalEntry, JournalStatus
 from apps.purchases.models import Bill, BillStatus, VendorPayment, VendorPaymentStatus
 from apps.purchases.services import post_bill, post_vendor_payment, replace_bill_lines, replace_vendor_payment_allocations
@@ -346,10 +347,13 @@ def _seed_banking(
             company=company,
             bank_account=bank_account,
             file_name=DEMO_STATEMENT_FILE_NAME,
-            raw_content=(
-                "date,description,amount,reference\n"
-                f"{today.isoformat()},Customer receipt,750.00,SEED-DEP-001\n"
-                f"{today.isoformat()},Bank fee,-20.00,SEED-FEE-001"
+            blob=store_blob(
+                [
+                    "date,description,amount,reference\n"
+                    f"{today.isoformat()},Customer receipt,750.00,SEED-DEP-001\n"
+                    f"{today.isoformat()},Bank fee,-20.00,SEED-FEE-001"
+                ],
+                content_type="text/csv",
             ),
             imported_by_user=actor_user,
         )
@@ -398,8 +402,9 @@ def _seed_banking(
             closing_balance=Decimal("730.0000"),
         )
 
-    if deposit_tx and reconciliation.status == ReconciliationStatus.DRAFT:
-        replace_reconciliation_lines(reconciliation=reconciliation, transactions=[deposit_tx])
+    fee_tx = statement_import.transactions.filter(reference="SEED-FEE-001").order_by("created_at").first()
+    if deposit_tx and fee_tx and reconciliation.status == ReconciliationStatus.DRAFT:
+        replace_reconciliation_lines(reconciliation=reconciliation, transactions=[deposit_tx, fee_tx])
         reconciliation = finalize_reconciliation(reconciliation=reconciliation, actor_user=actor_user)
 
     return bank_account, reconciliation
@@ -1,5 +1,8 @@
+from tempfile import TemporaryDirectory
+
+from django.conf import settings
 from django.core.management import call_command
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from rest_framework import status
 from rest_framework.test import APITestCase
 
@@ -71,8 +74,11 @@ class AuthApiTests(APITestCase):
 
 class DemoSeedCommandTests(TestCase):
     def test_seed_demo_accounts_command_is_idempotent(self):
-        call_command("seed_demo_accounts")
-        call_command("seed_demo_accounts")
+        with TemporaryDirectory() as blob_dir, override_settings(
+            STORAGES={**settings.STORAGES, "blobs": {**settings.STORAGES["blobs"], "OPTIONS": {"location": blob_dir}}}
+        ):
+            call_command("seed_demo_accounts")
+            call_command("seed_demo_accounts")
 
         company = Company.objects.get(slug="demo-company")
         self.assertEqual(Account.objects.filter(company=company).count(), 6)
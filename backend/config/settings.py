@@ -111,6 +111,10 @@ SYSTEM_ADMIN_ENABLED = env_bool("SYSTEM_ADMIN_ENABLED", False)
 AI_ENABLED = env_bool("AI_ENABLED", False)
 SUBSCRIPTION_ENABLED = env_bool("SUBSCRIPTION_ENABLED", False)
 PROTECTED_SYSTEM_USER_EMAILS = env_list("PROTECTED_SYSTEM_USER_EMAILS", default=[])
+LEDGER_ARCHIVE_DIR = Path(os.getenv("LEDGER_ARCHIVE_DIR", "").strip() or BASE_DIR / "ledger_archive")
+BLOB_STORAGE_DIR = Path(os.getenv("BLOB_STORAGE_DIR", "").strip() or BASE_DIR / "blobs")
+# Serverless deployments (Vercel) cannot keep threads alive after a response, so the pool is opt-in.
+BANK_IMPORT_WORKERS = env_int("BANK_IMPORT_WORKERS", 0)
 
 
 # Application definition
@@ -248,6 +252,16 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+# "blobs" holds apps.documents content; point it at any Django storage backend (e.g. object storage) in production.
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    "blobs": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+        "OPTIONS": {"location": BLOB_STORAGE_DIR},
+    },
+}
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "apps.users.authentication.PasswordVersionJWTAuthentication",
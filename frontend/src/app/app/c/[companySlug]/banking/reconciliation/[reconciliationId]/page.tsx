@@ -46,6 +46,8 @@ export default function ReconciliationDetailPage() {
   const [transactions, setTransactions] = useState<BankTransaction[]>([]);
   const [selectedIds, setSelectedIds] = useState<string[]>([]);
   const [loadingData, setLoadingData] = useState(false);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [actionError, setActionError] = useState("");
   const [infoMessage, setInfoMessage] = useState("");
   const [saving, setSaving] = useState(false);
@@ -64,7 +66,8 @@ export default function ReconciliationDetailPage() {
         fetchBankTransactions(companyId, { limit: 500 }),
       ]);
       setReconciliation(reconciliationData);
-      setTransactions(transactionData);
+      setTransactions(transactionData.results);
+      setNextCursor(transactionData.next_cursor);
       const lineIds = reconciliationData.lines?.map((line) => line.bank_transaction_id) || [];
       setSelectedIds(lineIds);
     } finally {
@@ -77,6 +80,18 @@ export default function ReconciliationDetailPage() {
     void loadData(activeCompany.id);
   }, [activeCompany, loadData]);
 
+  async function handleLoadMore() {
+    if (!activeCompany || !nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const data = await fetchBankTransactions(activeCompany.id, { limit: 500, cursor: nextCursor });
+      setTransactions((prev) => [...prev, ...data.results]);
+      setNextCursor(data.next_cursor);
+    } finally {
+      setLoadingMore(false);
+    }
+  }
+
   async function handleSaveLines() {
     if (!activeCompany || !canEditDraft) return;
     setActionError("");
@@ -235,6 +250,14 @@ export default function ReconciliationDetailPage() {
           </Table>
         </div>
       )}
+
+      {nextCursor && !loadingData && (
+        <div className="mt-4 flex justify-center">
+          <Button size="sm" variant="outline" disabled={loadingMore} onClick={() => void handleLoadMore()}>
+            {loadingMore && <Loader2 className="mr-1.5 h-3.5 w-3.5 animate-spin" />} Load more
+          </Button>
+        </div>
+      )}
     </AppShell>
   );
 }
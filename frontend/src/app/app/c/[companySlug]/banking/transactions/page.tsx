@@ -44,6 +44,8 @@ export default function BankingTransactionsPage() {
 
   const [transactions, setTransactions] = useState<BankTransaction[]>([]);
   const [loadingTransactions, setLoadingTransactions] = useState(false);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [statusFilter, setStatusFilter] = useState("all");
   const [matchJournalId, setMatchJournalId] = useState<Record<string, string>>({});
   const [actionError, setActionError] = useState("");
@@ -56,12 +58,28 @@ export default function BankingTransactionsPage() {
       const data = await fetchBankTransactions(companyId, {
         status: status === "all" ? undefined : status,
       });
-      setTransactions(data);
+      setTransactions(data.results);
+      setNextCursor(data.next_cursor);
     } finally {
       setLoadingTransactions(false);
     }
   }, []);
 
+  async function handleLoadMore() {
+    if (!activeCompany || !nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const data = await fetchBankTransactions(activeCompany.id, {
+        status: statusFilter === "all" ? undefined : statusFilter,
+        cursor: nextCursor,
+      });
+      setTransactions((prev) => [...prev, ...data.results]);
+      setNextCursor(data.next_cursor);
+    } finally {
+      setLoadingMore(false);
+    }
+  }
+
   useEffect(() => {
     if (!activeCompany) return;
     void loadTransactions(activeCompany.id, statusFilter);
@@ -212,6 +230,14 @@ export default function BankingTransactionsPage() {
           </TableBody>
         </Table>
       </div>
+
+      {nextCursor && !loadingTransactions && (
+        <div className="mt-4 flex justify-center">
+          <Button size="sm" variant="outline" disabled={loadingMore} onClick={() => void handleLoadMore()}>
+            {loadingMore && <Loader2 className="mr-1.5 h-3.5 w-3.5 animate-spin" />} Load more
+          </Button>
+        </div>
+      )}
     </AppShell>
   );
 }
@@ -42,6 +42,12 @@ type PaginatedResponse<T> = {
   results: T[];
 };
 
+type CursorPaginatedResponse<T> = {
+  next: string | null;
+  next_cursor: string | null;
+  results: T[];
+};
+
 class ApiError extends Error {
   status: number;
   payload: unknown;
@@ -725,17 +731,20 @@ export async function fetchBankTransactions(
     date_from?: string;
     date_to?: string;
     limit?: number;
+    cursor?: string;
   } = {}
 ) {
-  return apiRequest<BankTransaction[]>(
+  const payload = await apiRequest<CursorPaginatedResponse<BankTransaction>>(
     withQuery(`/banking/companies/${companyId}/transactions/`, {
       bank_account_id: options.bank_account_id,
       status: options.status,
       date_from: options.date_from,
       date_to: options.date_to,
       limit: options.limit ? String(options.limit) : undefined,
+      cursor: options.cursor,
     })
   );
+  return { results: payload.results, next_cursor: payload.next_cursor };
 }
 
 export async function matchBankTransaction(companyId: string, transactionId: string, journalEntryId: string) {